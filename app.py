@@ -1,19 +1,33 @@
+import os
 from flask import Flask, render_template
 from flask_cors import CORS
-from config import Config
+from config import config_by_name, DevelopmentConfig
+from backend.logging_config import configure_logging
+from backend.state_store import create_state_store
+from backend.spectrum_cache import SpectrumCache
 
-def create_app():
+def create_app(config_name=None):
+    """Build the app; config_name (or MOIRE_CONFIG) picks 'development' or 'production'."""
+    config_name = config_name or os.environ.get('MOIRE_CONFIG', 'development')
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_by_name.get(config_name, DevelopmentConfig))
+    configure_logging(app.config)
+    spectrum_cache = SpectrumCache.get_instance()
+    spectrum_cache.set_max_bytes(app.config['SPECTRUM_CACHE_MB'] * 1024 * 1024)
+    spectrum_cache.set_disk_dir(app.config['SPECTRUM_CACHE_DIR'])
+    spectrum_cache.set_max_disk_bytes(app.config['SPECTRUM_CACHE_DISK_MB'] * 1024 * 1024)
     CORS(app)
     
     # Import and register the blueprint from backend package
-    from backend.routes import bp
+    from backend.routes import bp, bind_state_store, beam_cache
+    beam_cache.set_max_bytes(app.config['BEAM_CACHE_MB'] * 1024 * 1024)
     app.register_blueprint(bp)
+    bind_state_store(create_state_store(app.config))
     
     return app
 
 if __name__ == '__main__':
     app = create_app()
     # threaded=True is essential for simultaneous requests (like mixing while uploading)
-    app.run(debug=True, port=5000, threaded=True)
\ No newline at end of file
+    app.run(debug=app.config['DEBUG'], use_reloader=app.config['USE_RELOADER'],
+            port=5000, threaded=True)
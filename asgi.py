@@ -0,0 +1,16 @@
+"""
+ASGI entry point, for uvicorn/hypercorn deployments.
+
+    uvicorn asgi:app --workers 4
+
+Flask is a WSGI app; it is wrapped with asgiref's WsgiToAsgi adapter
+(pip install asgiref), which runs requests on a thread pool.
+"""
+from wsgi import app as wsgi_app
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError as e:
+    raise ImportError("The ASGI entry point needs asgiref: pip install asgiref") from e
+
+app = WsgiToAsgi(wsgi_app)
@@ -0,0 +1,379 @@
+"""
+Headless batch mixing on top of ImageModel and UnifiedMixer.
+
+Library use:
+    from backend.batch import MixJob, mix_images, run_batch
+
+    result_array, png_bytes = mix_images(
+        {'1': ImageModel.from_file('a.png'), '2': ImageModel.from_file('b.png')},
+        weights_a={'1': 10, '2': 0}, weights_b={'1': 0, '2': 10})
+
+CLI (from the repository root):
+    python -m backend.batch jobs.json --output-dir out/
+    python -m backend.batch mix.yaml --sets images/ --output-dir out/ --workers 8
+
+A spec is a JSON (or, with PyYAML installed, YAML) object:
+
+    {
+      "defaults": {"mode": "magnitude_phase", "mixing_mode": "basic",
+                   "weights_a": {"1": 10, "2": 0}, "weights_b": {"1": 0, "2": 10}},
+      "jobs": [
+        {"name": "swap", "images": {"1": "a.png", "2": "b.png"}},
+        {"name": "lowpass", "images": {"1": "a.png"}, "mixing_mode": "region",
+         "regions": {"1": {"shape": "circle", "radius": 20}}, "output": "lp/a.npy"}
+      ],
+      "sets": "images/"
+    }
+
+Every job field falls back to "defaults". Weights use the UI slider scale
+(0-10) and may also be given as the flat 'wa1'..'wb4' fields /mix accepts;
+regions use the /mix region format.
+Each subdirectory of "sets" (or --sets) becomes one job whose image files,
+sorted by name, fill slots 1-4. Relative paths resolve against the spec's
+directory; outputs are written under --output-dir as <name>.png unless the
+job gives "output" (a .npy output keeps the unnormalized float result).
+
+Jobs are generated lazily and run on a process pool with a bounded number in
+flight. Workers read their own inputs and write their own outputs, so only
+small per-job summaries cross process boundaries; one JSON line per job is
+printed as jobs finish.
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .imagemodel import ImageModel
+from .logging_config import configure_logging
+from .manager import ImageManager
+from .mixer import UnifiedMixer
+from .spectrum_cache import SpectrumCache
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+SLOT_IDS = ('1', '2', '3', '4')
+
+
+def mix_images(images: Dict[str, ImageModel], weights_a: Dict, weights_b: Dict,
+               mode: str = 'magnitude_phase', mixing_mode: str = 'basic',
+               regions: Optional[Dict] = None, encode: bool = True) -> Tuple[np.ndarray, Optional[bytes]]:
+    """
+    Mix up to four images without the Flask app or the global ImageManager.
+
+    Images are resized to their smallest common size, as in the web UI.
+
+    Returns:
+        (result_array, png_bytes) for the real-valued result and its
+        normalized 8-bit PNG encoding; png_bytes is None with encode=False
+    """
+    # A private manager gives the same slot validation and size unification
+    manager = ImageManager()
+    for slot_id, image in images.items():
+        manager.set_input_image(str(slot_id), image)
+    valid_images = manager.get_valid_inputs()
+    if not valid_images:
+        raise ValueError("No images to mix")
+
+    mixer = UnifiedMixer()
+    mixer.set_images_dict(valid_images)
+    mixer.set_weights_a(_normalize_weights(weights_a))
+    mixer.set_weights_b(_normalize_weights(weights_b))
+    mixer.set_mode(mode)
+    mixer.set_region_config(UnifiedMixer.build_region_config(mixing_mode, regions))
+    mixer.set_encode_result(encode)
+    result_array, result_b64 = mixer.mix()
+    if result_array is None:
+        raise RuntimeError("Mixing produced no result")
+    return result_array, base64.b64decode(result_b64) if result_b64 is not None else None
+
+
+class MixJob:
+    """One batch mix: input paths, mixing parameters and an output path."""
+
+    def __init__(self, name: str, images: Dict[str, str], output: str,
+                 weights_a: Optional[Dict] = None, weights_b: Optional[Dict] = None,
+                 mode: str = 'magnitude_phase', mixing_mode: str = 'basic',
+                 regions: Optional[Dict] = None, color: bool = False):
+        self._name = name
+        self._images = {str(k): v for k, v in images.items()}
+        self._output = output
+        self._weights_a = weights_a or {}
+        self._weights_b = weights_b or {}
+        self._mode = mode
+        self._mixing_mode = mixing_mode
+        self._regions = regions or {}
+        self._color = bool(color)
+
+    # Getter methods
+    def get_name(self) -> str:
+        return self._name
+
+    def get_images(self) -> Dict[str, str]:
+        return self._images.copy()
+
+    def get_output(self) -> str:
+        return self._output
+
+    def get_weights_a(self) -> Dict:
+        return self._weights_a
+
+    def get_weights_b(self) -> Dict:
+        return self._weights_b
+
+    def get_mode(self) -> str:
+        return self._mode
+
+    def get_mixing_mode(self) -> str:
+        return self._mixing_mode
+
+    def get_regions(self) -> Dict:
+        return self._regions
+
+    def is_color(self) -> bool:
+        return self._color
+
+    @classmethod
+    def from_dict(cls, data: Dict, defaults: Optional[Dict] = None, base_dir: str = '.',
+                  output_dir: str = '.', index: int = 0) -> 'MixJob':
+        """
+        Build a job from a spec entry, falling back to the spec defaults.
+
+        Raises:
+            ValueError: If the entry has no images or uses unknown slots
+        """
+        merged = dict(defaults or {})
+        merged.update(data)
+
+        images = merged.get('images') or {}
+        if not images:
+            raise ValueError(f"Job {data.get('name', index)} has no images")
+        unknown = set(map(str, images)) - set(SLOT_IDS)
+        if unknown:
+            raise ValueError(f"Invalid slot IDs {sorted(unknown)}. Must be '1', '2', '3', or '4'")
+
+        # Nested weights, overridden by any flat wa1..wb4 fields
+        flat_a, flat_b = UnifiedMixer.parse_weight_fields(
+            {k: v for k, v in merged.items() if k[:2] in ('wa', 'wb') and len(k) == 3}
+        )
+        weights_a = dict(merged.get('weights_a') or {}, **flat_a)
+        weights_b = dict(merged.get('weights_b') or {}, **flat_b)
+
+        name = str(merged.get('name') or f'job_{index:05d}')
+        output = merged.get('output') or f'{name}.png'
+        return cls(
+            name=name,
+            images={k: _resolve(base_dir, v) for k, v in images.items()},
+            output=_resolve(output_dir, output),
+            weights_a=weights_a,
+            weights_b=weights_b,
+            mode=merged.get('mode', 'magnitude_phase'),
+            mixing_mode=merged.get('mixing_mode', 'basic'),
+            regions=merged.get('regions'),
+            color=merged.get('color', False),
+        )
+
+    def run(self) -> Dict:
+        """Read the inputs, mix and write the output; returns a JSON-able summary."""
+        start = time.perf_counter()
+        images = {slot: ImageModel.from_file(path, color=self._color)
+                  for slot, path in self._images.items()}
+        # Array outputs are saved unnormalized; skip the PNG encoding for them
+        result_array, png_bytes = mix_images(
+            images, self._weights_a, self._weights_b,
+            self._mode, self._mixing_mode, self._regions,
+            encode=not self._writes_array()
+        )
+        self._write_output(result_array, png_bytes)
+        return {
+            "name": self._name,
+            "status": "ok",
+            "output": self._output,
+            "shape": list(result_array.shape),
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+
+    def _writes_array(self) -> bool:
+        return self._output.lower().endswith('.npy')
+
+    def _write_output(self, result_array: np.ndarray, png_bytes: Optional[bytes]) -> None:
+        """Write atomically so an interrupted run never leaves partial files."""
+        directory = os.path.dirname(self._output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self._output}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            if self._writes_array():
+                np.save(f, result_array)
+            else:
+                f.write(png_bytes)
+        os.replace(tmp_path, self._output)
+
+
+def load_spec(path: str) -> Dict:
+    """
+    Read a JSON or YAML job spec.
+
+    Raises:
+        RuntimeError: If the spec is YAML and PyYAML is not installed
+    """
+    with open(path, 'r') as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("YAML specs need PyYAML (pip install pyyaml); or use JSON")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError(f"{path}: spec must be an object with 'jobs', 'defaults' and/or 'sets'")
+    return spec
+
+
+def iter_image_sets(directory: str) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Yield (set name, {slot: path}) for each subdirectory of image files."""
+    with os.scandir(directory) as entries:
+        subdirs = sorted((e for e in entries if e.is_dir()), key=lambda e: e.name)
+    for subdir in subdirs:
+        files = sorted(
+            e.path for e in os.scandir(subdir.path)
+            if e.is_file() and e.name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not files:
+            continue
+        if len(files) > len(SLOT_IDS):
+            logger.warning("Image set %s has %d images; using the first %d",
+                           subdir.name, len(files), len(SLOT_IDS))
+        yield subdir.name, dict(zip(SLOT_IDS, files))
+
+
+def iter_jobs(spec: Dict, base_dir: str = '.', output_dir: str = '.',
+              sets_dir: Optional[str] = None) -> Iterator[MixJob]:
+    """Lazily expand a spec's explicit jobs and image sets into MixJobs."""
+    defaults = spec.get('defaults') or {}
+    index = 0
+    for entry in spec.get('jobs') or []:
+        yield MixJob.from_dict(entry, defaults, base_dir, output_dir, index)
+        index += 1
+
+    sets_dir = sets_dir or (spec.get('sets') and _resolve(base_dir, spec['sets']))
+    if sets_dir:
+        for name, images in iter_image_sets(sets_dir):
+            entry = {'name': name, 'images': images}
+            yield MixJob.from_dict(entry, defaults, base_dir, output_dir, index)
+            index += 1
+
+
+def run_batch(jobs: Iterable[MixJob], workers: Optional[int] = None,
+              max_pending: Optional[int] = None, cache_dir: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Run jobs on a process pool and yield their summaries as they complete.
+
+    At most max_pending jobs (default 2 per worker) are queued at a time, so
+    memory stays flat however many jobs the iterable produces. workers=1 runs
+    in-process. A failing job yields an error summary instead of stopping the
+    batch.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(cache_dir)
+        for job in jobs:
+            yield _run_job(job)
+        return
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_dir,)) as executor:
+        pending = set()
+        for job in jobs:
+            pending.add(executor.submit(_run_job, job))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in _as_completed(pending):
+            yield future.result()
+
+
+# ---------------------- INTERNAL HELPERS ----------------------
+def _init_worker(cache_dir: Optional[str]) -> None:
+    """Share decoded spectra between workers through the on-disk cache tier."""
+    if cache_dir:
+        SpectrumCache.get_instance().set_disk_dir(cache_dir)
+
+
+def _run_job(job: MixJob) -> Dict:
+    try:
+        return job.run()
+    except Exception as e:
+        logger.debug("Job %s failed", job.get_name(), exc_info=True)
+        return {"name": job.get_name(), "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+def _as_completed(futures):
+    while futures:
+        done, futures = wait(futures, return_when=FIRST_COMPLETED)
+        yield from done
+
+
+def _normalize_weights(weights: Dict) -> Dict[str, float]:
+    return {str(k): float(v) for k, v in (weights or {}).items()}
+
+
+def _resolve(base_dir: str, path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+
+# ---------------------- CLI ----------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m backend.batch', description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('spec', help='JSON or YAML job spec')
+    parser.add_argument('--sets', help='directory whose subdirectories are image sets (overrides the spec)')
+    parser.add_argument('-o', '--output-dir', default='.', help='directory for outputs (default: .)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='worker processes (default: CPU count; 1 runs in-process)')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='jobs queued at once (default: 2 per worker)')
+    parser.add_argument('--cache-dir', default=None,
+                        help='on-disk spectrum cache shared by the workers')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    configure_logging({'LOG_LEVEL': args.log_level})
+    try:
+        spec = load_spec(args.spec)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    base_dir = os.path.dirname(os.path.abspath(args.spec))
+    jobs = iter_jobs(spec, base_dir, args.output_dir, args.sets)
+
+    start = time.perf_counter()
+    counts = {"ok": 0, "error": 0}
+    try:
+        for summary in run_batch(jobs, args.workers, args.max_pending, args.cache_dir):
+            counts[summary["status"]] += 1
+            print(json.dumps(summary), flush=True)
+    except ValueError as e:
+        # Invalid job entries stop the batch; finished outputs are kept
+        logger.error("Invalid spec: %s", e)
+        return 2
+
+    logger.info("Finished %d jobs (%d failed) in %.2fs",
+                counts["ok"] + counts["error"], counts["error"], time.perf_counter() - start)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+# cancellation.py
+import threading
+from typing import Optional
+
+
+class MixCancelled(Exception):
+    """Raised inside a job whose CancellationToken has been cancelled."""
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag for one mixing job. The scheduler cancels
+    it when a newer request supersedes the job; the job checks it between
+    stages and stops early.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise MixCancelled()
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Sleep up to timeout seconds; returns True (early) if cancelled."""
+        return self._event.wait(timeout)
@@ -1,16 +1,31 @@
 import numpy as np
 import cv2
 import base64
+import weakref
 from typing import Optional, Tuple, Any
+from .metrics import time_stage
+from .spectrum_cache import SpectrumCache
 
 class ImageModel:
-    def __init__(self, file_bytes: Optional[bytes] = None):
-        self._raw_data = None  # Spatial Domain (Grayscale)
-        self._fft_data = None  # Frequency Domain (Complex)
-        self._shape = (0, 0)
+    # Spectrum precision; part of the spectrum cache key
+    PRECISION = 'complex128'
+
+    def __init__(self, file_bytes: Optional[bytes] = None, color: bool = False):
+        self._raw_data = None  # Spatial Domain (Grayscale, or BGR (H, W, 3) in color mode)
+        self._fft_data = None  # Frequency Domain (Complex, per channel)
+        self._shape = (0, 0)   # (height, width); channels are not included
+        # Content hash of the uploaded file; while known, decode/resize/FFT
+        # results come from the shared SpectrumCache
+        self._content_hash = None
+        self._cache_key = None
+        self._cache_ref = None
+        # True while _fft_data is the transform of _raw_data, so pickles can skip it
+        self._fft_from_raw = False
+        # Read-only magnitude/phase derived from _fft_data, computed on first use
+        self._spectrum_components = {}
         
         if file_bytes:
-            self.load_from_bytes(file_bytes)
+            self.load_from_bytes(file_bytes, color)
 
     # Getter and setter methods
     def get_raw_data(self) -> Optional[np.ndarray]:
@@ -18,9 +33,14 @@ class ImageModel:
         return self._raw_data
     
     def set_raw_data(self, raw_data: np.ndarray) -> None:
-        """Set raw image data and update FFT."""
-        self._raw_data = raw_data
-        self._shape = raw_data.shape
+        """
+        Set raw image data and update FFT. The model takes ownership: it keeps
+        a read-only view, and the caller must not write into raw_data afterwards.
+        """
+        self._release_cache_entry()
+        self._content_hash = None
+        self._raw_data = _read_only(raw_data)
+        self._shape = raw_data.shape[:2]
         self._update_fft()
     
     def get_fft_data(self) -> Optional[np.ndarray]:
@@ -28,11 +48,15 @@ class ImageModel:
         return self._fft_data
     
     def set_fft_data(self, fft_data: np.ndarray) -> None:
-        """Set FFT data directly (use with caution)."""
-        self._fft_data = fft_data
+        """Set FFT data directly (use with caution); ownership passes as in set_raw_data."""
+        self._release_cache_entry()
+        self._content_hash = None
+        self._fft_data = _read_only(fft_data)
+        self._fft_from_raw = False
+        self._spectrum_components = {}
         # Update shape from FFT data if raw data doesn't exist
         if self._raw_data is None and fft_data is not None:
-            self._shape = fft_data.shape
+            self._shape = fft_data.shape[:2]
     
     def get_shape(self) -> Tuple[int, int]:
         """Get the image shape."""
@@ -54,12 +78,12 @@ class ImageModel:
         return self._shape[1] if self._shape else 0
     
     def get_magnitude(self) -> Optional[np.ndarray]:
-        """Get the magnitude spectrum."""
-        return np.abs(self._fft_data) if self._fft_data is not None else None
+        """Get the magnitude spectrum (cached, read-only)."""
+        return self._spectrum_component('magnitude', np.abs)
     
     def get_phase(self) -> Optional[np.ndarray]:
-        """Get the phase spectrum."""
-        return np.angle(self._fft_data) if self._fft_data is not None else None
+        """Get the phase spectrum (cached, read-only)."""
+        return self._spectrum_component('phase', np.angle)
     
     def get_real(self) -> Optional[np.ndarray]:
         """Get the real part of FFT."""
@@ -95,11 +119,38 @@ class ImageModel:
         return self._raw_data is not None and self._fft_data is not None
 
     # Public methods
-    def load_from_bytes(self, file_bytes: bytes) -> None:
-        """Load image from bytes and calculate FFT."""
-        nparr = np.frombuffer(file_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
-        self.set_raw_data(img)
+    def get_content_hash(self) -> Optional[str]:
+        """SHA-256 of the source file, or None once the data was set directly."""
+        return self._content_hash
+
+    def is_color(self) -> bool:
+        """True for (H, W, C) multi-channel data."""
+        data = self._raw_data if self._raw_data is not None else self._fft_data
+        return data is not None and data.ndim == 3
+
+    def get_channel_count(self) -> int:
+        """Number of channels (1 for grayscale), read from the same array as is_color()."""
+        data = self._raw_data if self._raw_data is not None else self._fft_data
+        return data.shape[2] if data is not None and data.ndim == 3 else 1
+
+    def load_from_bytes(self, file_bytes: bytes, color: bool = False) -> None:
+        """
+        Load image from bytes and calculate FFT (skipped for cached content).
+        color=True keeps the BGR channels instead of converting to grayscale.
+        """
+        cache = SpectrumCache.get_instance()
+        digest = cache.hash_bytes(file_bytes)
+        key = cache.make_key(digest, None, self._cache_precision(color))
+        cached = cache.get(key)
+        if cached is None:
+            with time_stage('decode'):
+                nparr = np.frombuffer(file_bytes, np.uint8)
+                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR if color else cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                raise ValueError("Could not decode image data")
+            cached = cache.put(key, img, self._compute_fft(img))
+        self._use_cache_entry(key, *cached)
+        self._content_hash = digest
     
     def resize(self, new_h: int, new_w: int) -> None:
         """Resizes the internal image and re-calculates FFT."""
@@ -108,8 +159,20 @@ class ImageModel:
         if self._shape == (new_h, new_w): 
             return
         
-        self._raw_data = cv2.resize(self._raw_data, (new_w, new_h))
-        self._shape = self._raw_data.shape
+        if self._content_hash is not None:
+            cache = SpectrumCache.get_instance()
+            key = cache.make_key(self._content_hash, (new_h, new_w), self._cache_precision(self.is_color()))
+            cached = cache.get(key)
+            if cached is None:
+                with time_stage('resize'):
+                    resized = cv2.resize(self._raw_data, (new_w, new_h))
+                cached = cache.put(key, resized, self._compute_fft(resized))
+            self._use_cache_entry(key, *cached)
+            return
+
+        with time_stage('resize'):
+            self._raw_data = _read_only(cv2.resize(self._raw_data, (new_w, new_h)))
+        self._shape = self._raw_data.shape[:2]
         self._update_fft()
     
     def get_encoded_view(self, view_type: str) -> str:
@@ -135,17 +198,33 @@ class ImageModel:
             return ""
         
         # Normalize to 0-255 for display
-        norm_img = cv2.normalize(data, None, 0, 255, cv2.NORM_MINMAX)
-        norm_img = np.uint8(norm_img)
+        with time_stage('normalize'):
+            norm_img = cv2.normalize(data, None, 0, 255, cv2.NORM_MINMAX)
+            norm_img = np.uint8(norm_img)
         
-        _, buffer = cv2.imencode('.png', norm_img)
-        return base64.b64encode(buffer).decode('utf-8')
+        with time_stage('encode'):
+            _, buffer = cv2.imencode('.png', norm_img)
+            return base64.b64encode(buffer).decode('utf-8')
     
     def clone(self) -> 'ImageModel':
-        """Create a deep copy of the ImageModel."""
+        """
+        Create a copy-on-write copy of the ImageModel.
+
+        Both models share raw and FFT arrays, which are read-only from the
+        moment they are stored. Every mutator (set_raw_data, set_fft_data,
+        resize) replaces arrays instead of writing into them, so a change to
+        either model never shows in the other, and cloning never modifies self.
+        """
         clone = ImageModel()
-        if self._raw_data is not None:
-            clone.set_raw_data(self._raw_data.copy())
+        if self._cache_key is not None:
+            clone._use_cache_entry(self._cache_key, self._raw_data, self._fft_data)
+        else:
+            clone._raw_data = self._raw_data
+            clone._fft_data = self._fft_data
+            clone._fft_from_raw = self._fft_from_raw
+            clone._shape = self._shape
+        clone._content_hash = self._content_hash
+        clone._spectrum_components = dict(self._spectrum_components)
         return clone
 
     # Private method
@@ -153,18 +232,97 @@ class ImageModel:
         """Calculates FFT and shifts zero frequency to center."""
         if self._raw_data is None: 
             return
-        f = np.fft.fft2(self._raw_data)
-        self._fft_data = np.fft.fftshift(f)
+        self._fft_data = _read_only(self._compute_fft(self._raw_data))
+        self._fft_from_raw = True
+        self._spectrum_components = {}
+
+    @staticmethod
+    def _compute_fft(raw_data: np.ndarray) -> np.ndarray:
+        # One batched transform over the spatial axes covers every channel
+        with time_stage('fft'):
+            f = np.fft.fft2(raw_data, axes=(0, 1))
+            return np.fft.fftshift(f, axes=(0, 1))
+
+    def _cache_precision(self, color: bool) -> str:
+        return f'{self.PRECISION}-bgr' if color else self.PRECISION
+
+    def _use_cache_entry(self, key, raw_data: np.ndarray, fft_data: np.ndarray) -> None:
+        """Share a cache entry's read-only arrays, pinning it until released."""
+        cache = SpectrumCache.get_instance()
+        cache.acquire(key)
+        self._release_cache_entry()
+        self._raw_data = raw_data
+        self._fft_data = fft_data
+        self._fft_from_raw = True
+        self._spectrum_components = {}
+        self._shape = raw_data.shape[:2]
+        self._cache_key = key
+        # Unpin when this model is replaced or garbage collected
+        self._cache_ref = weakref.finalize(self, cache.release, key)
+
+    def _release_cache_entry(self) -> None:
+        if self._cache_ref is not None:
+            self._cache_ref()
+        self._cache_ref = None
+        self._cache_key = None
+
+    def __getstate__(self):
+        # Cache pins are per process, and a spectrum computed from the pixels
+        # is 8-16x their size; __setstate__ looks it up or recomputes it instead
+        state = self.__dict__.copy()
+        state['_cache_ref'] = None
+        state['_spectrum_components'] = {}
+        if self._fft_from_raw and self._raw_data is not None:
+            state['_fft_data'] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('_fft_from_raw', False)
+        key = state.pop('_cache_key', None)
+        self.__dict__.update(state, _cache_key=None)
+        self._raw_data = _read_only(self._raw_data)
+        self._fft_data = _read_only(self._fft_data)
+        if self._fft_data is not None or self._raw_data is None:
+            return
+        if key is None:
+            self._update_fft()
+            return
+        cache = SpectrumCache.get_instance()
+        cached = cache.get(key) or cache.put(key, self._raw_data, self._compute_fft(self._raw_data))
+        self._use_cache_entry(key, *cached)
+
+    def _spectrum_component(self, name: str, func) -> Optional[np.ndarray]:
+        fft_data = self._fft_data
+        if fft_data is None:
+            return None
+        value = self._spectrum_components.get(name)
+        if value is None:
+            value = _read_only(func(fft_data))
+            if fft_data is self._fft_data:
+                self._spectrum_components[name] = value
+        return value
     
     @classmethod
     def from_array(cls, array: np.ndarray) -> 'ImageModel':
-        """Create an ImageModel from a numpy array."""
+        """Create an ImageModel from a copy of a numpy array; the caller keeps its own."""
         instance = cls()
-        instance.set_raw_data(array)
+        instance.set_raw_data(np.array(array, copy=True))
         return instance
     
     @classmethod
-    def from_file(cls, filepath: str) -> 'ImageModel':
+    def from_file(cls, filepath: str, color: bool = False) -> 'ImageModel':
         """Create an ImageModel from a file path."""
         with open(filepath, 'rb') as f:
-            return cls(f.read())
\ No newline at end of file
+            return cls(f.read(), color=color)
+
+
+def _read_only(array: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """
+    Read-only view of array. The base array itself stays writeable, so this
+    only protects arrays the model owns; it is applied when they are stored.
+    """
+    if array is None or not array.flags.writeable:
+        return array
+    view = array.view()
+    view.flags.writeable = False
+    return view
@@ -0,0 +1,68 @@
+"""
+Application logging setup: leveled, lazily formatted log output with
+sampling of high-volume DEBUG/INFO records on the hot paths.
+"""
+import itertools
+import logging
+
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s'
+
+# Application packages; third-party loggers stay at INFO or above
+APP_LOGGERS = ('backend', 'beam_models')
+
+# Loggers that fire on every mix / beamforming request
+SAMPLED_LOGGERS = (
+    'backend.routes',
+    'backend.mixer',
+    'backend.mixing_worker',
+)
+
+
+class SamplingFilter(logging.Filter):
+    """Pass 1 in `rate` records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate=1):
+        super().__init__()
+        self._rate = max(1, int(rate))
+        self._counter = itertools.count()
+
+    def get_rate(self):
+        return self._rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self._rate == 1:
+            return True
+        return next(self._counter) % self._rate == 0
+
+
+def configure_logging(config):
+    """
+    Configure the root handler and the hot-path loggers from a Flask config
+    mapping (LOG_LEVEL, LOG_SAMPLE_RATE). Safe to call more than once.
+    """
+    level = logging.getLevelName(str(config.get('LOG_LEVEL', 'INFO')).upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+
+    root = logging.getLogger()
+    if not any(getattr(h, '_moire_handler', False) for h in root.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handler._moire_handler = True
+        root.addHandler(handler)
+    root.setLevel(max(level, logging.INFO))
+    for name in APP_LOGGERS:
+        logging.getLogger(name).setLevel(level)
+
+    rate = config.get('LOG_SAMPLE_RATE', 1)
+    for name in SAMPLED_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        for f in [f for f in logger.filters if isinstance(f, SamplingFilter)]:
+            logger.removeFilter(f)
+        if int(rate) > 1:
+            logger.addFilter(SamplingFilter(rate))
+
+    # Werkzeug's per-request access log is stdout I/O on every poll
+    if level > logging.DEBUG:
+        logging.getLogger('werkzeug').setLevel(max(level, logging.WARNING))
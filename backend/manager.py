@@ -1,7 +1,17 @@
+import threading
 from typing import Dict, Optional, List, Any, Union
 from .imagemodel import ImageModel
 
 class ImageManager:
+    """
+    Input and output image slots.
+
+    The slot dicts are immutable snapshots: writers build a new dict under
+    _write_lock and swap it in, and images already in a snapshot are never
+    modified (resizing replaces them with resized clones). Readers take no
+    lock, so view requests and running mixes never block each other or see
+    a half-updated image.
+    """
     _instance = None  # For singleton pattern
     
     def __init__(self):
@@ -9,53 +19,91 @@ class ImageManager:
         self._input_images = { '1': None, '2': None, '3': None, '4': None }
         # Private storage for output images
         self._output_images = { 'output_1': None, 'output_2': None }
+        # Serializes writers; readers use whichever snapshot they load
+        self._write_lock = threading.RLock()
         # Configuration
         self._auto_resize = True
         self._default_width = 512
         self._default_height = 512
+        # Cross-process sync (see state_store.py); None when running single-process
+        self._state_store = None
+        self._store_versions = {}
+        # Version of the 'image.index' key, bumped after every slot write
+        self._index_version = None
 
     # Getter and setter methods
     def get_input_image(self, slot_id: str) -> Optional[ImageModel]:
         """Get an input image from a specific slot."""
         if slot_id not in self._input_images:
             raise KeyError(f"Invalid slot ID: {slot_id}. Must be '1', '2', '3', or '4'")
+        self._refresh_from_store()
         return self._input_images.get(slot_id)
     
     def set_input_image(self, slot_id: str, image_model: Optional[ImageModel]) -> None:
-        """Set an input image in a specific slot."""
+        """
+        Set an input image in a specific slot. With auto-resize, the stored
+        image may be a resized clone of image_model.
+        """
         if slot_id not in self._input_images:
             raise KeyError(f"Invalid slot ID: {slot_id}. Must be '1', '2', '3', or '4'")
-        self._input_images[slot_id] = image_model
-        if self._auto_resize and image_model is not None:
-            self._unify_sizes()
+        with self._write_lock:
+            self._refresh_from_store()
+            inputs = dict(self._input_images)
+            inputs[slot_id] = image_model
+            if self._auto_resize and image_model is not None:
+                inputs = self._unify_sizes(inputs)
+            # Publish the new slot and any image _unify_sizes resized
+            self._swap_inputs(inputs, always_publish=(slot_id,))
     
     def get_output_image(self, output_key: str) -> Optional[ImageModel]:
         """Get an output image."""
         if output_key not in self._output_images:
             raise KeyError(f"Invalid output key: {output_key}")
+        self._refresh_from_store()
         return self._output_images.get(output_key)
     
     def set_output_image(self, output_key: str, image_model: Optional[ImageModel]) -> None:
         """Set an output image."""
         if output_key not in self._output_images:
             raise KeyError(f"Invalid output key: {output_key}")
-        self._output_images[output_key] = image_model
+        with self._write_lock:
+            self._output_images = dict(self._output_images, **{output_key: image_model})
+            self._publish(output_key)
     
     def get_all_inputs(self) -> Dict[str, Optional[ImageModel]]:
         """Get all input images."""
+        self._refresh_from_store()
         return self._input_images.copy()  # Return copy to prevent external modification
     
     def get_all_outputs(self) -> Dict[str, Optional[ImageModel]]:
         """Get all output images."""
+        self._refresh_from_store()
         return self._output_images.copy()  # Return copy to prevent external modification
     
     def get_valid_inputs(self) -> Dict[str, ImageModel]:
         """Get only valid (non-None) input images."""
+        self._refresh_from_store()
         return {k: v for k, v in self._input_images.items() if v is not None}
     
     def get_valid_outputs(self) -> Dict[str, ImageModel]:
         """Get only valid (non-None) output images."""
+        self._refresh_from_store()
         return {k: v for k, v in self._output_images.items() if v is not None}
+
+    def get_state_store(self):
+        """Get the shared state store, or None when running single-process."""
+        return self._state_store
+
+    def set_state_store(self, store) -> None:
+        """
+        Share slots with other worker processes through a StateStore.
+        In-process stores are ignored: the singleton is already shared.
+        """
+        self._state_store = store if store is not None and store.is_shared() else None
+        self._store_versions = {}
+        self._index_version = None
+        if self._state_store is not None:
+            self._refresh_from_store()
     
     def get_auto_resize(self) -> bool:
         """Check if auto-resize is enabled."""
@@ -100,13 +148,14 @@ class ImageManager:
         }
 
     # Public methods for image management
-    def upload_image(self, slot_id: str, file_bytes: bytes) -> ImageModel:
+    def upload_image(self, slot_id: str, file_bytes: bytes, color: bool = False) -> ImageModel:
         """
         Upload and create an ImageModel from bytes.
         
         Args:
             slot_id: Slot identifier ('1', '2', '3', or '4')
             file_bytes: Image bytes
+            color: Keep the color channels instead of converting to grayscale
             
         Returns:
             Created ImageModel instance
@@ -114,9 +163,10 @@ class ImageManager:
         if slot_id not in self._input_images:
             raise KeyError(f"Invalid slot ID: {slot_id}")
         
-        new_img = ImageModel(file_bytes)
-        self.set_input_image(slot_id, new_img)
-        return new_img
+        new_img = ImageModel(file_bytes, color=color)
+        with self._write_lock:
+            self.set_input_image(slot_id, new_img)
+            return self._input_images[slot_id]
     
     def store_output(self, output_key: str, image_model: ImageModel) -> None:
         """
@@ -130,8 +180,8 @@ class ImageManager:
     
     def clear_all_inputs(self) -> None:
         """Clear all input images."""
-        for key in self._input_images:
-            self._input_images[key] = None
+        with self._write_lock:
+            self._swap_inputs(dict.fromkeys(self._input_images), always_publish=self._input_images)
     
     def clear_input(self, slot_id: str) -> bool:
         """
@@ -146,13 +196,16 @@ class ImageManager:
         if slot_id not in self._input_images:
             return False
         
-        self._input_images[slot_id] = None
+        with self._write_lock:
+            self._swap_inputs(dict(self._input_images, **{slot_id: None}), always_publish=(slot_id,))
         return True
     
     def clear_all_outputs(self) -> None:
         """Clear all output images."""
-        for key in self._output_images:
-            self._output_images[key] = None
+        with self._write_lock:
+            self._output_images = dict.fromkeys(self._output_images)
+            for key in self._output_images:
+                self._publish(key)
     
     def clear_output(self, output_key: str) -> bool:
         """
@@ -167,7 +220,7 @@ class ImageManager:
         if output_key not in self._output_images:
             return False
         
-        self._output_images[output_key] = None
+        self.set_output_image(output_key, None)
         return True
     
     def clear_all(self) -> None:
@@ -183,27 +236,30 @@ class ImageManager:
             height: Target height
             width: Target width
         """
-        for img in self.get_valid_inputs().values():
-            img.resize(height, width)
+        with self._write_lock:
+            self._refresh_from_store()
+            self._swap_inputs(self._resized(self._input_images, height, width))
     
     def clone(self) -> 'ImageManager':
         """
-        Create a deep copy of the ImageManager.
+        Create a snapshot of the ImageManager.
+
+        Images are cloned copy-on-write, so a snapshot shares array memory
+        with this manager and needs no FFTs.
         
         Returns:
             Cloned ImageManager instance
         """
         clone = ImageManager()
+        inputs, outputs = self._input_images, self._output_images
         
         # Clone input images
-        for key, img in self._input_images.items():
-            if img is not None:
-                clone._input_images[key] = img.clone()
+        clone._input_images = {key: img.clone() if img is not None else None
+                               for key, img in inputs.items()}
         
         # Clone output images
-        for key, img in self._output_images.items():
-            if img is not None:
-                clone._output_images[key] = img.clone()
+        clone._output_images = {key: img.clone() if img is not None else None
+                                for key, img in outputs.items()}
         
         clone._auto_resize = self._auto_resize
         clone._default_width = self._default_width
@@ -211,22 +267,86 @@ class ImageManager:
         
         return clone
 
-    # In manager.py, update the _unify_sizes method:
-
-    def _unify_sizes(self) -> None:
-        """Ensures all images match the smallest dimensions."""
-        valid_imgs = list(self.get_valid_inputs().values())
+    def _unify_sizes(self, images: Dict[str, Optional[ImageModel]]) -> Dict[str, Optional[ImageModel]]:
+        """Copy of images with every image matching the smallest dimensions."""
+        valid_imgs = [img for img in images.values() if img is not None]
         if not valid_imgs:
-            return
+            return images
 
         # Get minimum dimensions using getter methods
         min_h = min(img.get_height() for img in valid_imgs)
         min_w = min(img.get_width() for img in valid_imgs)
         
-        # Resize all images
-        for img in valid_imgs:
-            img.resize(min_h, min_w)
+        return self._resized(images, min_h, min_w)
+
+    @staticmethod
+    def _resized(images: Dict[str, Optional[ImageModel]], height: int, width: int) -> Dict[str, Optional[ImageModel]]:
+        """
+        Copy of images at height x width. Mismatched images are replaced by
+        resized copy-on-write clones; the originals stay untouched for
+        readers of the previous snapshot.
+        """
+        resized = {}
+        for key, img in images.items():
+            if img is not None and img.get_shape() != (height, width):
+                img = img.clone()
+                img.resize(height, width)
+            resized[key] = img
+        return resized
+
+    def _swap_inputs(self, inputs: Dict[str, Optional[ImageModel]], always_publish=()) -> None:
+        """Install a new input snapshot and publish the slots that changed (write lock held)."""
+        previous = self._input_images
+        self._input_images = inputs
+        for key, img in inputs.items():
+            if key in always_publish or img is not previous.get(key):
+                self._publish(key)
     
+    def _publish(self, key: str) -> None:
+        """
+        Write one slot to the shared store, then bump the index key. Models
+        pickle their pixels only; readers recompute or reload the spectrum.
+        """
+        if self._state_store is None:
+            return
+        image = self._input_images.get(key) if key in self._input_images else self._output_images.get(key)
+        store_key = f'image.{key}'
+        if image is None:
+            self._state_store.delete(store_key)
+            self._store_versions[key] = None
+        else:
+            self._store_versions[key] = self._state_store.set(store_key, image)
+        self._state_store.set('image.index', key)
+
+    def _refresh_from_store(self) -> None:
+        """
+        Pull slots another worker changed since we last saw them. Costs one
+        stat of the index key unless some worker wrote a slot meanwhile.
+        """
+        store = self._state_store
+        if store is None:
+            return
+        # Read before the slots, so a write racing with this scan bumps it again
+        index_version = store.version('image.index')
+        if index_version is not None and index_version == self._index_version:
+            return
+        stale = [key for key in list(self._input_images) + list(self._output_images)
+                 if store.version(f'image.{key}') != self._store_versions.get(key)]
+        if not stale:
+            self._index_version = index_version
+            return
+        with self._write_lock:
+            inputs, outputs = dict(self._input_images), dict(self._output_images)
+            for key in stale:
+                # Another thread may have refreshed or published it meanwhile
+                if store.version(f'image.{key}') == self._store_versions.get(key):
+                    continue
+                image, version = store.get_versioned(f'image.{key}')
+                (inputs if key in inputs else outputs)[key] = image
+                self._store_versions[key] = version
+            self._input_images, self._output_images = inputs, outputs
+            self._index_version = index_version
+
     def _validate_slot_id(self, slot_id: str) -> bool:
         """Validate slot ID."""
         return slot_id in self._input_images
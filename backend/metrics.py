@@ -0,0 +1,121 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stage timings of the current request, when a request is being traced
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('request_timings', default=None)
+
+
+class StageHistogram:
+    """Cumulative latency histogram for one pipeline stage."""
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, seconds: float) -> None:
+        index = len(self._buckets)
+        for i, bound in enumerate(self._buckets):
+            if seconds <= bound:
+                index = i
+                break
+        self._counts[index] += 1
+        self._sum += seconds
+        self._count += 1
+
+    def snapshot(self) -> Dict:
+        cumulative = []
+        running = 0
+        for bound, count in zip(self._buckets + (float('inf'),), self._counts):
+            running += count
+            cumulative.append((bound, running))
+        return {'buckets': cumulative, 'sum': self._sum, 'count': self._count}
+
+
+class MetricsRegistry:
+    _instance = None
+
+    def __init__(self):
+        self._histograms: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record a stage duration in its histogram and in the current request trace."""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = StageHistogram()
+            histogram.observe(seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, seconds))
+
+    @contextmanager
+    def time_stage(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def get_snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {stage: h.snapshot() for stage, h in self._histograms.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self, extra_gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition (format 0.0.4) of all stage histograms."""
+        lines = [
+            '# HELP moire_stage_duration_seconds Time spent in each processing stage.',
+            '# TYPE moire_stage_duration_seconds histogram',
+        ]
+        for stage, snap in sorted(self.get_snapshot().items()):
+            for bound, count in snap['buckets']:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'moire_stage_duration_seconds_bucket{{stage="{stage}",le="{le}"}} {count}')
+            lines.append(f'moire_stage_duration_seconds_sum{{stage="{stage}"}} {snap["sum"]}')
+            lines.append(f'moire_stage_duration_seconds_count{{stage="{stage}"}} {snap["count"]}')
+        for name, value in sorted((extra_gauges or {}).items()):
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def get_instance(cls) -> 'MetricsRegistry':
+        if cls._instance is None:
+            cls._instance = MetricsRegistry()
+        return cls._instance
+
+
+def time_stage(stage: str):
+    """Context manager timing a block into the shared registry."""
+    return MetricsRegistry.get_instance().time_stage(stage)
+
+
+def start_request_trace():
+    """Begin collecting stage timings for the current request; returns a reset token."""
+    return _request_timings.set([])
+
+
+def finish_request_trace(token) -> List[Tuple[str, float]]:
+    """Stop collecting and return the (stage, seconds) pairs recorded for the request."""
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+
+def format_server_timing(timings: List[Tuple[str, float]]) -> str:
+    """Server-Timing header value with per-stage totals in milliseconds."""
+    totals: Dict[str, float] = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ', '.join(f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in totals.items())
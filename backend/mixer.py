@@ -2,9 +2,200 @@
 import numpy as np
 import cv2
 import base64
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
 from typing import Dict, Optional, Tuple, Any
+from .metrics import MetricsRegistry
+from .cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+metrics = MetricsRegistry.get_instance()
+
+
+class MixerWorkspace:
+    """Full-size scratch buffers for one mix at one image shape."""
+    def __init__(self, shape: Tuple[int, ...]):
+        self.shape = shape
+        self.acc1 = np.empty(shape, dtype=np.float64)
+        self.acc2 = np.empty(shape, dtype=np.float64)
+        self.acc3 = np.empty(shape, dtype=np.float64)
+        self.tmp1 = np.empty(shape, dtype=np.float64)
+        self.tmp2 = np.empty(shape, dtype=np.float64)
+        self.mask = np.empty(shape[:2], dtype=np.float32)
+        self.spectrum = np.empty(shape, dtype=np.complex128)
+        self.shifted = np.empty(shape, dtype=np.complex128)
+        self.display = np.empty(shape, dtype=np.float64)
+        self.display_u8 = np.empty(shape, dtype=np.uint8)
+
+
+class MixerWorkspacePool:
+    """
+    Thread-safe pool of MixerWorkspaces keyed by shape. Concurrent mixes
+    (one per output port) each take their own workspace; only the most
+    recently used shapes are kept, to bound memory.
+    """
+    def __init__(self, max_shapes: int = 4, max_per_shape: int = 2):
+        self._max_shapes = max_shapes
+        self._max_per_shape = max_per_shape
+        self._free: 'OrderedDict[Tuple[int, ...], list]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, shape: Tuple[int, ...]):
+        shape = tuple(shape)
+        with self._lock:
+            free = self._free.get(shape)
+            workspace = free.pop() if free else None
+        if workspace is None:
+            workspace = MixerWorkspace(shape)
+        try:
+            yield workspace
+        finally:
+            with self._lock:
+                free = self._free.setdefault(shape, [])
+                self._free.move_to_end(shape)
+                if len(free) < self._max_per_shape:
+                    free.append(workspace)
+                while len(self._free) > self._max_shapes:
+                    self._free.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._free.clear()
+
+
+_workspaces = MixerWorkspacePool()
+
+
+class MaskCache:
+    """
+    Thread-safe LRU cache of read-only masks, bounded by total bytes rather
+    than entry count (a single 4K float32 mask is 64 MB). Masks larger than
+    the whole budget are returned without being cached.
+    """
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self._max_bytes = max_bytes
+        self._entries: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def cached(self, func):
+        """Decorator memoizing func(*args) in this cache."""
+        @wraps(func)
+        def wrapper(*args):
+            key = (func.__name__,) + args
+            with self._lock:
+                mask = self._entries.get(key)
+                if mask is not None:
+                    self._entries.move_to_end(key)
+                    return mask
+            # Built outside the lock; masks may use other cached masks
+            mask = func(*args)
+            if mask.nbytes <= self._max_bytes:
+                with self._lock:
+                    if key not in self._entries:
+                        self._entries[key] = mask
+                        self._nbytes += mask.nbytes
+                    while self._nbytes > self._max_bytes:
+                        _, evicted = self._entries.popitem(last=False)
+                        self._nbytes -= evicted.nbytes
+            return mask
+        return wrapper
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+
+_masks = MaskCache()
+
+
+@_masks.cached
+def _full_mask(h: int, w: int) -> np.ndarray:
+    mask = np.ones((h, w), dtype=np.float32)
+    mask.flags.writeable = False
+    return mask
+
+
+@_masks.cached
+def _rect_mask(h: int, w: int, y1: int, y2: int, x1: int, x2: int) -> np.ndarray:
+    """Read-only 0/1 mask with ones on [y1:y2, x1:x2], shared between mixes."""
+    mask = np.zeros((h, w), dtype=np.float32)
+    mask[y1:y2, x1:x2] = 1
+    mask.flags.writeable = False
+    return mask
+
+
+@_masks.cached
+def _radius_map(h: int, w: int) -> np.ndarray:
+    """
+    Distance from the DC bin of a shifted spectrum, normalised so 1.0 is
+    the edge midpoint of the shorter side. Shared by every radial mask of
+    this shape.
+    """
+    y = (np.arange(h, dtype=np.float32) - h // 2)[:, None]
+    x = (np.arange(w, dtype=np.float32) - w // 2)[None, :]
+    radius = np.sqrt(y * y + x * x) / (min(h, w) / 2)
+    radius.flags.writeable = False
+    return radius
+
+
+@_masks.cached
+def _radial_mask(h: int, w: int, shape: str, pass_type: str,
+                 radius: float, inner_radius: float, order: int) -> np.ndarray:
+    """
+    Read-only radially symmetric mask; radius and inner_radius are fractions
+    of the radius map. circle/annulus are ideal (hard) masks, gaussian and
+    butterworth taper smoothly and support lowpass, highpass and bandpass.
+    """
+    r = _radius_map(h, w)
+    eps = 1e-6
+
+    def lowpass(cutoff):
+        cutoff = max(cutoff, eps)
+        if shape == 'gaussian':
+            return np.exp(-(r * r) / (2 * cutoff * cutoff))
+        if shape == 'butterworth':
+            return 1.0 / (1.0 + (r / cutoff) ** (2 * order))
+        return (r <= cutoff).astype(np.float32)
+
+    if shape == 'circle':
+        mask = lowpass(radius)
+    elif shape == 'annulus':
+        mask = lowpass(radius) * (r > inner_radius)
+    elif pass_type == 'highpass':
+        mask = 1.0 - lowpass(radius)
+    elif pass_type == 'bandpass':
+        mask = lowpass(radius) * (1.0 - lowpass(inner_radius))
+    else:
+        mask = lowpass(radius)
+    mask = mask.astype(np.float32)
+    mask.flags.writeable = False
+    return mask
+
+
+def _ifftshift_into(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """np.fft.ifftshift(src) written into the preallocated dst."""
+    h, w = src.shape[:2]
+    ky, kx = h // 2, w // 2
+    dst[:h - ky, :w - kx] = src[ky:, kx:]
+    dst[:h - ky, w - kx:] = src[ky:, :kx]
+    dst[h - ky:, :w - kx] = src[:ky, kx:]
+    dst[h - ky:, w - kx:] = src[:ky, :kx]
+    return dst
+
 
 class UnifiedMixer:
+    # Region 'shape' values; 'rect' is the original percentage rectangle
+    MASK_SHAPES = ('rect', 'circle', 'annulus', 'gaussian', 'butterworth')
+    # Region 'filter' values for the tapered (gaussian/butterworth) shapes
+    FILTER_TYPES = ('lowpass', 'highpass', 'bandpass')
+
     def __init__(self):
         self._images_dict = {}
         self._weights_a = {}
@@ -14,6 +205,9 @@ class UnifiedMixer:
         self._masks = {}
         self._result_array = None
         self._result_b64 = None
+        self._cancel_token = None
+        self._encode_result = True
+        self._progress_callback = None
         
     # Getter and setter methods
     def get_images_dict(self) -> Dict:
@@ -57,9 +251,42 @@ class UnifiedMixer:
     def get_masks(self) -> Dict:
         return self._masks
     
+    def get_cancel_token(self) -> Optional[CancellationToken]:
+        return self._cancel_token
+
+    def set_cancel_token(self, token: Optional[CancellationToken]) -> None:
+        """Token checked between mixing stages; cancelling it raises MixCancelled."""
+        self._cancel_token = token
+
+    def get_encode_result(self) -> bool:
+        return self._encode_result
+
+    def set_encode_result(self, encode: bool) -> None:
+        """Disable to skip the display PNG; mix() then returns (result_array, None)."""
+        self._encode_result = encode
+
+    def get_progress_callback(self):
+        return self._progress_callback
+
+    def set_progress_callback(self, callback) -> None:
+        """callback(fraction) is called with the completed share (0-1) after each stage."""
+        self._progress_callback = callback
+
+    def _report_progress(self, fraction: float) -> None:
+        if self._progress_callback is not None:
+            self._progress_callback(fraction)
+
+    def _check_cancelled(self) -> None:
+        if self._cancel_token is not None:
+            self._cancel_token.raise_if_cancelled()
+
     def mix(self) -> Tuple[Optional[np.ndarray], Optional[str]]:
         """
         Unified mixing function (Optimized).
+
+        Accumulation runs in place in a pooled, shape-keyed workspace; per
+        mix only the inverse FFT output, the returned array and the PNG
+        buffer are allocated.
         """
         # Use getters to access the data
         images_dict = self.get_images_dict()
@@ -78,16 +305,13 @@ class UnifiedMixer:
         # 2. Get reference dimensions - FIXED: Use get_shape()
         first_img = next(iter(valid_imgs.values()))
         h, w = first_img.get_shape()  # Changed from .shape to .get_shape()
+        # Color mixes run on (h, w, C); grayscale slots and the 2-D masks broadcast
+        channels = max(img.get_channel_count() for img in valid_imgs.values())
+        work_shape = (h, w) if channels == 1 else (h, w, channels)
+        logger.debug("Mixing %d images at %dx%dx%d, mode=%s", len(valid_imgs), w, h, channels, mode)
         
-        # 3. Initialize Accumulators
-        if mode == 'magnitude_phase':
-            acc1 = np.zeros((h, w), dtype=np.float64)
-            acc2 = np.zeros((h, w), dtype=np.complex128)
-        else:
-            acc1 = np.zeros((h, w), dtype=np.complex128)
-            acc2 = np.zeros((h, w), dtype=np.complex128)
-
-        # 4. Generate Masks
+        # 3. Generate Masks (cached, read-only)
+        stage_start = time.perf_counter()
         regions = region_config.get('regions', {})
         hasRegion_comp = bool(regions)
         
@@ -97,93 +321,139 @@ class UnifiedMixer:
                 if slot_str in regions:
                     masks[slot_str] = self._generate_custom_mask(h, w, regions[slot_str])
                 else:
-                    masks[slot_str] = np.ones((h, w), dtype=np.float32)
+                    masks[slot_str] = _full_mask(h, w)
         else:
             global_mask = self._generate_unified_mask(h, w, region_config)
             masks = {str(i): global_mask for i in range(1, 5)}
         
         self._masks = masks
+        metrics.observe('mask', time.perf_counter() - stage_start)
+        self._report_progress(0.1)
 
-        # 5. Process Images
-        sum_wa = 0
-        sum_wb = 0
-        
-        for slot, img in images_dict.items():
-            if img is None: continue
+        with _workspaces.acquire(work_shape) as ws:
+            # 4. Process Images: one fused in-place update per slot
+            stage_start = time.perf_counter()
+            acc1, acc2, acc3 = ws.acc1, ws.acc2, ws.acc3
+            acc1.fill(0)
+            acc2.fill(0)
+            acc3.fill(0)
+            sum_wa = 0
+            sum_wb = 0
+            slots_done = 0
             
-            wa = weights_a.get(str(slot), 0) / 10.0
-            wb = weights_b.get(str(slot), 0) / 10.0
+            for slot, img in images_dict.items():
+                if img is None: continue
+                self._check_cancelled()
+                if slots_done:
+                    self._report_progress(0.1 + 0.6 * slots_done / len(valid_imgs))
+                slots_done += 1
+                
+                wa = weights_a.get(str(slot), 0) / 10.0
+                wb = weights_b.get(str(slot), 0) / 10.0
 
-            sum_wa += wa
-            sum_wb += wb
+                sum_wa += wa
+                sum_wb += wb
 
-            if wa == 0 and wb == 0: continue
+                if wa == 0 and wb == 0: continue
 
-            # Get Components
-            if mode == 'magnitude_phase':
-                c1 = img.get_magnitude()
-                c2 = img.get_phase()
-            else:
-                c1 = img.get_real()
-                c2 = img.get_imaginary()
+                # Get Components
+                if mode == 'magnitude_phase':
+                    c1 = img.get_magnitude()
+                    c2 = img.get_phase()
+                else:
+                    c1 = img.get_real()
+                    c2 = img.get_imaginary()
 
-            # Determine Masking Logic
-            slot_str = str(slot)
-            current_mask = masks.get(slot_str, np.ones((h, w), dtype=np.float32))
-            
-            is_outer = False
-            if hasRegion_comp:
-                if regions.get(slot_str, {}).get('type') == 'outer':
-                    is_outer = True
-            else:
-                if not region_config.get('inner', True):
-                    is_outer = True
-            
-            final_mask = (1 - current_mask) if is_outer else current_mask
-            
-            c1 = c1 * final_mask
-            c2 = c2 * final_mask
+                # Determine Masking Logic
+                slot_str = str(slot)
+                current_mask = masks.get(slot_str, _full_mask(h, w))
+                
+                is_outer = False
+                if hasRegion_comp:
+                    if regions.get(slot_str, {}).get('type') == 'outer':
+                        is_outer = True
+                else:
+                    if not region_config.get('inner', True):
+                        is_outer = True
+                
+                if is_outer:
+                    final_mask = np.subtract(1, current_mask, out=ws.mask)
+                else:
+                    final_mask = current_mask
+                if channels > 1:
+                    final_mask = final_mask[:, :, None]
+                    if c1.ndim == 2:
+                        c1, c2 = c1[:, :, None], c2[:, :, None]
 
-            # Accumulate
-            if mode == 'magnitude_phase':
-                acc1 += c1 * wa
-                acc2 += wb * np.exp(1j * c2)
-            else:
-                acc1 += c1 * wa
-                acc2 += c2 * wb
+                # Accumulate
+                tmp1, tmp2 = ws.tmp1, ws.tmp2
+                np.multiply(c1, final_mask, out=tmp1)
+                tmp1 *= wa
+                acc1 += tmp1
+                np.multiply(c2, final_mask, out=tmp1)
+                if mode == 'magnitude_phase':
+                    # wb * exp(1j * c2) as separate cos/sin accumulators
+                    np.cos(tmp1, out=tmp2)
+                    tmp2 *= wb
+                    acc2 += tmp2
+                    np.sin(tmp1, out=tmp1)
+                    tmp1 *= wb
+                    acc3 += tmp1
+                else:
+                    tmp1 *= wb
+                    acc2 += tmp1
 
-        # 6. Normalize & Reconstruct
-        if mode == 'magnitude_phase':
+            # 5. Normalize & Reconstruct into the complex workspace buffer
+            result_complex = ws.spectrum
             acc1 /= max(sum_wa, 1e-6)
-            
-            if np.allclose(acc2, 0):
-                final_phase = np.zeros((h, w), dtype=np.float64)
+            if mode == 'magnitude_phase':
+                # |sum of wb * exp(1j * c2)| <= 1e-8 everywhere, as np.allclose(acc, 0)
+                np.hypot(acc2, acc3, out=ws.tmp2)
+                if ws.tmp2.max() <= 1e-8:
+                    result_complex.real[...] = acc1
+                    result_complex.imag.fill(0)
+                else:
+                    acc2 /= max(sum_wb, 1e-6)
+                    acc3 /= max(sum_wb, 1e-6)
+                    final_phase = np.arctan2(acc3, acc2, out=acc3)
+                    np.multiply(acc1, np.cos(final_phase, out=acc2), out=result_complex.real)
+                    np.multiply(acc1, np.sin(final_phase, out=acc2), out=result_complex.imag)
             else:
                 acc2 /= max(sum_wb, 1e-6)
-                final_phase = np.angle(acc2)
-            
-            result_complex = acc1 * np.exp(1j * final_phase)
-            
-        else:
-            acc1 /= max(sum_wa, 1e-6)
-            acc2 /= max(sum_wb, 1e-6)
-            result_complex = acc1 + 1j * acc2
+                result_complex.real[...] = acc1
+                result_complex.imag[...] = acc2
 
-        # 7. Inverse FFT
-        f_ishift = np.fft.ifftshift(result_complex)
-        img_back = np.fft.ifft2(f_ishift)
-        img_back = np.real(img_back)
+            metrics.observe('accumulate', time.perf_counter() - stage_start)
+            self._report_progress(0.7)
 
-        # 8. Post-Processing for Display
-        result_array = img_back.copy()
-        
-        # Normalize to 0-255
-        img_normalized = cv2.normalize(img_back, None, 0, 255, cv2.NORM_MINMAX)
-        img_normalized = np.uint8(img_normalized)
-        
-        # Encode to Base64
-        _, buffer = cv2.imencode('.png', img_normalized)
-        result_b64 = base64.b64encode(buffer).decode('utf-8')
+            # 6. Inverse FFT
+            self._check_cancelled()
+            stage_start = time.perf_counter()
+            f_ishift = _ifftshift_into(result_complex, ws.shifted)
+            img_back = np.fft.ifft2(f_ishift, axes=(0, 1))
+            metrics.observe('ifft', time.perf_counter() - stage_start)
+            self._report_progress(0.9)
+
+            # 7. Post-Processing for Display
+            result_array = np.ascontiguousarray(img_back.real)
+            if not self._encode_result:
+                self._result_array = result_array
+                self._result_b64 = None
+                return result_array, None
+            
+            # Normalize to 0-255
+            stage_start = time.perf_counter()
+            display = cv2.normalize(result_array, ws.display, 0, 255, cv2.NORM_MINMAX)
+            img_normalized = ws.display_u8
+            np.copyto(img_normalized, display, casting='unsafe')
+            metrics.observe('normalize', time.perf_counter() - stage_start)
+            
+            # Encode to Base64
+            stage_start = time.perf_counter()
+            _, buffer = cv2.imencode('.png', img_normalized)
+            result_b64 = base64.b64encode(buffer).decode('utf-8')
+            metrics.observe('encode', time.perf_counter() - stage_start)
+            self._report_progress(1.0)
 
         # Store results
         self._result_array = result_array
@@ -192,7 +462,8 @@ class UnifiedMixer:
         return result_array, result_b64
 
     def _generate_unified_mask(self, h: int, w: int, config: Dict) -> np.ndarray:
-        mask = np.zeros((h, w), dtype=np.float32)
+        if config.get('shape', 'rect') != 'rect':
+            return self._generate_radial_mask(h, w, config)
         cy, cx = h // 2, w // 2
         percent = config.get('size', 100)
         rh = int((percent / 100) * h)
@@ -203,12 +474,11 @@ class UnifiedMixer:
         x1 = max(0, cx - rw//2)
         x2 = min(w, cx + rw//2)
         
-        mask[y1:y2, x1:x2] = 1
-        return mask
+        return _rect_mask(h, w, y1, y2, x1, x2)
 
     def _generate_custom_mask(self, h: int, w: int, region: Dict) -> np.ndarray:
-        mask = np.zeros((h, w), dtype=np.float32)
-        
+        if region.get('shape', 'rect') != 'rect':
+            return self._generate_radial_mask(h, w, region)
         # Convert percentages to pixels
         x_percent = region.get('x', 0)
         y_percent = region.get('y', 0)
@@ -226,8 +496,26 @@ class UnifiedMixer:
         y1 = max(0, y_px)
         y2 = min(h, y_px + height_px)
         
-        mask[y1:y2, x1:x2] = 1
-        return mask
+        return _rect_mask(h, w, y1, y2, x1, x2)
+
+    def _generate_radial_mask(self, h: int, w: int, region: Dict) -> np.ndarray:
+        """
+        Circular/annular or tapered low/high/band-pass mask. 'radius' and
+        'inner_radius' are percentages of half the shorter image side,
+        'order' is the Butterworth order.
+        """
+        shape = region.get('shape')
+        if shape not in self.MASK_SHAPES:
+            raise ValueError(f"Unknown mask shape: {shape}")
+        pass_type = region.get('filter', 'lowpass')
+        if pass_type not in self.FILTER_TYPES:
+            raise ValueError(f"Unknown filter type: {pass_type}")
+        return _radial_mask(
+            h, w, shape, pass_type,
+            float(region.get('radius', 50)) / 100,
+            float(region.get('inner_radius', 0)) / 100,
+            int(region.get('order', 2))
+        )
 
     @staticmethod
     def get_default_region_config(mode: str = 'basic') -> Dict:
@@ -244,10 +532,80 @@ class UnifiedMixer:
             }
         else:
             return {}
-    
+
+    @staticmethod
+    def parse_weight_fields(data: Dict) -> Tuple[Dict, Dict]:
+        """Split 'wa1'..'wb4' request fields into (weights_a, weights_b)."""
+        weights_a = {}
+        weights_b = {}
+        for key, value in data.items():
+            if key.startswith('wa') and key[-1].isdigit():
+                weights_a[key[-1]] = float(value)
+            elif key.startswith('wb') and key[-1].isdigit():
+                weights_b[key[-1]] = float(value)
+        return weights_a, weights_b
+
+    @classmethod
+    def build_region_config(cls, mixing_mode: str, regions_data: Optional[Dict] = None) -> Dict:
+        """
+        Region config for mix() from client-style region specs.
+
+        Basic mode uses the full spectrum for every slot. In region mode each
+        slot's spec gives type/x/y/width/height in percent and optionally a
+        radial mask (shape/filter/radius/inner_radius/order). Slots without a
+        spec use the full spectrum.
+
+        Raises:
+            ValueError: If a region names an unknown mask shape or filter
+        """
+        if mixing_mode == 'basic':
+            return cls.get_default_region_config('basic')
+
+        regions_data = regions_data or {}
+        region_config = {
+            'size': 100,
+            'inner': True,
+            'regions': {}
+        }
+        for slot in ['1', '2', '3', '4']:
+            if slot not in regions_data:
+                region_config['regions'][slot] = {
+                    'type': 'inner',
+                    'x': 0,
+                    'y': 0,
+                    'width': 100,
+                    'height': 100
+                }
+                continue
+
+            region = regions_data[slot]
+            region_config['regions'][slot] = {
+                'type': region.get('type', 'inner'),
+                'x': float(region.get('x', 0)),
+                'y': float(region.get('y', 0)),
+                'width': float(region.get('width', 100)),
+                'height': float(region.get('height', 100))
+            }
+            # Optional circular / tapered frequency mask
+            shape = region.get('shape', 'rect')
+            if shape != 'rect':
+                pass_type = region.get('filter', 'lowpass')
+                if shape not in cls.MASK_SHAPES or pass_type not in cls.FILTER_TYPES:
+                    raise ValueError(f"Invalid mask for slot {slot}: {shape}/{pass_type}")
+                region_config['regions'][slot].update({
+                    'shape': shape,
+                    'filter': pass_type,
+                    'radius': float(region.get('radius', 50)),
+                    'inner_radius': float(region.get('inner_radius', 0)),
+                    'order': int(region.get('order', 2))
+                })
+        return region_config
+
     @classmethod
     def static_mix(cls, images_dict: Dict, weights_a: Dict, weights_b: Dict, 
-                   mode: str, region_config: Dict) -> Tuple[Optional[np.ndarray], Optional[str]]:
+                   mode: str, region_config: Dict,
+                   cancel_token: Optional[CancellationToken] = None,
+                   progress_callback=None) -> Tuple[Optional[np.ndarray], Optional[str]]:
         """
         Static method for backward compatibility.
         """
@@ -257,5 +615,7 @@ class UnifiedMixer:
         mixer.set_weights_b(weights_b)
         mixer.set_mode(mode)
         mixer.set_region_config(region_config)
+        mixer.set_cancel_token(cancel_token)
+        mixer.set_progress_callback(progress_callback)
         
         return mixer.mix()
\ No newline at end of file
@@ -1,4 +1,5 @@
 # mixing_worker.py
+import logging
 import threading
 import time
 import numpy as np
@@ -7,18 +8,25 @@ import base64
 from typing import Dict, Optional, Any, Tuple
 from .mixer import UnifiedMixer as Mixer
 from .imagemodel import ImageModel
+from .metrics import MetricsRegistry
+from .cancellation import CancellationToken, MixCancelled
+
+logger = logging.getLogger(__name__)
 
 class MixingWorker:
     _instance = None
+    # One worker per output port, so mixes into different outputs run concurrently
+    _instances: Dict[int, 'MixingWorker'] = {}
+    _instances_lock = threading.Lock()
     
-    def __init__(self):
+    def __init__(self, output_port: int = 1):
         self._thread = None
         self._cancel_flag = False
         self._progress = 0
         self._result = None
         self._result_array = None
         self._is_running = False
-        self._current_output_port = 1
+        self._current_output_port = output_port
         self._error_message = None
         self._mixing_start_time = None
         self._mixing_end_time = None
@@ -28,6 +36,16 @@ class MixingWorker:
         self._completion_callback = None
         self._error_callback = None
 
+        # Cross-process status sharing (see state_store.py)
+        self._state_store = None
+
+        # Latest-wins scheduling: one in-flight job, one pending slot
+        self._lock = threading.RLock()
+        self._pending_job = None
+        self._current_token = None
+        self._runner_active = False
+        self._coalesced_count = 0
+
     # Getter and setter methods
     def get_thread(self) -> Optional[threading.Thread]:
         return self._thread
@@ -37,6 +55,11 @@ class MixingWorker:
     
     def set_cancel_flag(self, flag: bool) -> None:
         self._cancel_flag = flag
+        if flag:
+            with self._lock:
+                self._pending_job = None
+                if self._current_token is not None:
+                    self._current_token.cancel()
     
     def get_progress(self) -> int:
         return self._progress
@@ -44,6 +67,7 @@ class MixingWorker:
     def set_progress(self, progress: int) -> None:
         if 0 <= progress <= 100:
             self._progress = progress
+            self._publish_status()
             if self._progress_callback:
                 self._progress_callback(progress)
         else:
@@ -66,6 +90,7 @@ class MixingWorker:
     
     def set_running(self, running: bool) -> None:
         self._is_running = running
+        self._publish_status()
     
     def get_current_output_port(self) -> int:
         return self._current_output_port
@@ -96,138 +121,166 @@ class MixingWorker:
     def set_error_callback(self, callback) -> None:
         self._error_callback = callback
 
+    def get_state_store(self):
+        return self._state_store
+
+    def set_state_store(self, store) -> None:
+        """Publish status to a store shared with other worker processes."""
+        self._state_store = store if store is not None and store.is_shared() else None
+
+    def get_coalesced_count(self) -> int:
+        """Number of requests superseded before they ever ran."""
+        return self._coalesced_count
+
     def start(self, images_dict: Dict, weights_a: Dict, weights_b: Dict, 
-              mode: str, region_config: Dict, target_output: int = 1) -> None:
-        # Cancel previous thread if running
-        if self._thread and self._thread.is_alive():
-            self._cancel_flag = True
-            self._thread.join(timeout=0.1)
+              mode: str, region_config: Dict, target_output: Optional[int] = None) -> None:
+        """
+        Schedule a mix, latest wins: the in-flight job is cancelled, the new
+        job replaces any pending one, and a single runner thread picks it up
+        as soon as the cancelled job stops.
+        """
+        job = (images_dict, weights_a, weights_b, mode, region_config)
+        with self._lock:
+            if self._pending_job is not None:
+                self._coalesced_count += 1
+            self._pending_job = job
+            if self._current_token is not None:
+                self._current_token.cancel()
 
-        # Reset state
-        self._cancel_flag = False
-        self._progress = 0
-        self._result = None
-        self._result_array = None
-        self._current_output_port = target_output
-        self._is_running = True
-        self._error_message = None
-        self._mixing_start_time = time.time()
-        self._mixing_end_time = None
+            # Status describes the newest request from now on
+            self._cancel_flag = False
+            self._progress = 0
+            self._result = None
+            self._result_array = None
+            if target_output is not None:
+                self._current_output_port = int(target_output)
+            self._is_running = True
+            self._error_message = None
+            self._mixing_start_time = time.time()
+            self._mixing_end_time = None
+            self._publish_status()
 
-        # Start new worker thread
-        self._thread = threading.Thread(
-            target=self._run,
-            args=(images_dict, weights_a, weights_b, mode, region_config),
-            daemon=True
-        )
-        self._thread.start()
-    
-    # In mixing_worker.py, update the _run method:
+            if not self._runner_active:
+                self._runner_active = True
+                self._thread = threading.Thread(target=self._run_jobs, daemon=True)
+                self._thread.start()
+
+    def _run_jobs(self) -> None:
+        """Runner thread: execute the pending job until none is left."""
+        while True:
+            with self._lock:
+                job = self._pending_job
+                self._pending_job = None
+                if job is None:
+                    self._current_token = None
+                    self._runner_active = False
+                    return
+                token = self._current_token = CancellationToken()
+            self._run(*job, token)
+
+    def _update_if_current(self, token: CancellationToken, **fields) -> bool:
+        """Apply status fields unless a newer request superseded this job."""
+        with self._lock:
+            if token.is_cancelled():
+                return False
+            if 'result' in fields:
+                self.set_result(fields['result'])
+            if 'result_array' in fields:
+                self.set_result_array(fields['result_array'])
+            if 'error' in fields:
+                self.set_error_message(fields['error'])
+            if 'output_model' in fields:
+                from .manager import ImageManager
+                ImageManager.get_instance().store_output(
+                    f'output_{self._current_output_port}', fields['output_model']
+                )
+            if 'progress' in fields:
+                if fields['progress'] == 100:
+                    self._mixing_end_time = time.time()
+                self.set_progress(fields['progress'])
+            if 'running' in fields:
+                self.set_running(fields['running'])
+            return True
 
     def _run(self, images_dict: Dict, weights_a: Dict, weights_b: Dict, 
-            mode: str, region_config: Dict) -> None:
+            mode: str, region_config: Dict, token: CancellationToken) -> None:
         """
         Main mixing execution logic.
         """
         try:
-            print(f"DEBUG: Starting mixing worker...")
+            logger.debug("Starting mixing worker for output %s", self._current_output_port)
             
             # Set initial progress
-            self.set_progress(10)
+            self._update_if_current(token, progress=10)
             
             # Check if we have valid images
             valid_images = {k: v for k, v in images_dict.items() if v is not None}
             if not valid_images:
-                print("DEBUG: No valid images to mix")
-                self.set_result("")
-                self.set_result_array(None)
-                self.set_progress(100)
-                self.set_running(False)
+                logger.debug("No valid images to mix")
+                self._update_if_current(token, result="", result_array=None, progress=100, running=False)
                 return
             
-            print(f"DEBUG: Mixing {len(valid_images)} images")
-            
-            # SIMULATE progress for better UX
-            progress_steps = [20, 30, 40, 50, 60, 70, 80, 90]
-            for progress in progress_steps:
-                if self._cancel_flag:
-                    self.set_running(False)
-                    return
-                time.sleep(0.05)
-                self.set_progress(progress)
+            logger.debug("Mixing %d images", len(valid_images))
             
             # Call the mixer - IMPORTANT: Use the correct method
-            print(f"DEBUG: Calling Mixer.static_mix()...")
-            print(f"DEBUG: Mode: {mode}, Region config: {region_config}")
-            print(f"DEBUG: Weights A: {weights_a}, Weights B: {weights_b}")
+            logger.debug("Calling Mixer.static_mix(): mode=%s, region=%s, weights_a=%s, weights_b=%s",
+                         mode, region_config, weights_a, weights_b)
             
+            # Mixer stages map onto 10-90%; 100% is set once the output is stored
             result_array, result_b64 = Mixer.static_mix(
-                images_dict, weights_a, weights_b, mode, region_config
+                images_dict, weights_a, weights_b, mode, region_config, token,
+                lambda fraction: self._update_if_current(token, progress=10 + int(80 * fraction))
             )
             
-            print(f"DEBUG: Mixing complete.")
-            print(f"DEBUG: Result array: {'Present' if result_array is not None else 'None'}")
-            print(f"DEBUG: Result base64: {'Present' if result_b64 else 'Empty/None'}")
-            if result_b64:
-                print(f"DEBUG: Base64 length: {len(result_b64)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Mixing complete: array=%s, base64 length=%d",
+                             result_array.shape if result_array is not None else None,
+                             len(result_b64) if result_b64 else 0)
             
             # Always store results, even if empty
-            self.set_result(result_b64 if result_b64 else "")
-            self.set_result_array(result_array)
+            fields = {'result': result_b64 if result_b64 else "", 'result_array': result_array}
             
             # Create output model if we have results
             if result_array is not None and result_b64:
-                output_model = self._create_output_model(result_array)
-                
-                # Store in manager
-                from .manager import ImageManager
-                manager = ImageManager.get_instance()
-                output_key = f'output_{self._current_output_port}'
-                manager.store_output(output_key, output_model)
-                print(f"DEBUG: Output stored to {output_key}")
+                token.raise_if_cancelled()
+                fields['output_model'] = self._create_output_model(result_array)
             else:
-                print(f"DEBUG: No output to store - array: {result_array is not None}, b64: {bool(result_b64)}")
+                logger.debug("No output to store - array: %s, b64: %s",
+                             result_array is not None, bool(result_b64))
             
             # ALWAYS set progress to 100% when done
-            self.set_progress(100)
-            self._mixing_end_time = time.time()
-            self.set_running(False)
-            print(f"DEBUG: Worker finished successfully")
+            if not self._update_if_current(token, progress=100, running=False, **fields):
+                raise MixCancelled()
+            MetricsRegistry.get_instance().observe('mix_total', self.get_mixing_duration())
+            logger.info("Mix for output %s finished in %.3fs",
+                        self._current_output_port, self.get_mixing_duration())
             
             if self._completion_callback:
                 self._completion_callback(self._result, self._result_array)
 
+        except MixCancelled:
+            logger.debug("Mix superseded by a newer request")
+
         except Exception as e:
-            print(f"ERROR in mixing worker: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in mixing worker")
             
-            # Set empty result on error
-            self.set_result("")
-            self.set_result_array(None)
-            self.set_error_message(str(e))
-            self.set_running(False)
-            self._mixing_end_time = time.time()
-            self.set_progress(100)  # Still set to 100% even on error
-            
-            if self._error_callback:
-                self._error_callback(str(e))
+            # Set empty result on error; still set progress to 100%
+            if self._update_if_current(token, result="", result_array=None, error=str(e),
+                                       progress=100, running=False):
+                if self._error_callback:
+                    self._error_callback(str(e))
 
     def _create_output_model(self, result_array: np.ndarray) -> ImageModel:
-        # Convert numpy array to PNG bytes
         if result_array.dtype != np.uint8:
             result_array = cv2.normalize(result_array, None, 0, 255, cv2.NORM_MINMAX)
             result_array = result_array.astype(np.uint8)
         
-        # Encode to PNG bytes
-        _, buffer = cv2.imencode('.png', result_array)
-        image_bytes = buffer.tobytes()
-        
-        # Create ImageModel
-        return ImageModel(image_bytes)
+        # Built from the array directly: one-off outputs are not worth
+        # hashing, pinning or writing to the spectrum cache's disk tier
+        return ImageModel.from_array(result_array)
 
     def cancel(self) -> None:
-        self._cancel_flag = True
+        self.set_cancel_flag(True)
         self.set_progress(0)
         self.set_running(False)
     
@@ -238,6 +291,14 @@ class MixingWorker:
         return True
     
     def get_status(self) -> Dict[str, Any]:
+        if self._state_store is not None:
+            # The mix may be running in another worker process
+            status = self._state_store.get(self._status_key())
+            if status is not None:
+                return status
+        return self._local_status()
+
+    def _local_status(self) -> Dict[str, Any]:
         return {
             "running": self._is_running,
             "progress": self._progress,
@@ -252,12 +313,30 @@ class MixingWorker:
         self._result_array = None
         self._error_message = None
         self._progress = 0
+        self._publish_status()
+
+    def _publish_status(self) -> None:
+        if self._state_store is not None:
+            self._state_store.set(self._status_key(), self._local_status())
+
+    def _status_key(self) -> str:
+        return f'mix_status.{self._current_output_port}'
     
     @classmethod
-    def get_instance(cls) -> 'MixingWorker':
-        if cls._instance is None:
-            cls._instance = MixingWorker()
-        return cls._instance
+    def get_instance(cls, output_port: int = 1) -> 'MixingWorker':
+        """Worker for an output port; port 1 is also the legacy singleton."""
+        output_port = int(output_port)
+        with cls._instances_lock:
+            if output_port not in cls._instances:
+                cls._instances[output_port] = MixingWorker(output_port)
+                if output_port == 1:
+                    cls._instance = cls._instances[output_port]
+            return cls._instances[output_port]
+
+    @classmethod
+    def get_all_instances(cls) -> Dict[int, 'MixingWorker']:
+        with cls._instances_lock:
+            return dict(cls._instances)
 
 # Singleton worker
 mixing_worker = MixingWorker.get_instance()
\ No newline at end of file
@@ -1,6 +1,12 @@
 import json
+import logging
+import math
 import os
-from flask import Blueprint, request, jsonify, render_template
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import (
+    Blueprint, request, jsonify, render_template, Response, stream_with_context, current_app
+)
 from .manager import ImageManager
 from .mixer import UnifiedMixer
 from .mixing_worker import MixingWorker
@@ -10,12 +16,55 @@ from PIL import Image
 import numpy as np
 import cv2
 from .imagemodel import ImageModel 
+from .spectrum_cache import SpectrumCache
+from .metrics import (
+    MetricsRegistry, time_stage, start_request_trace, finish_request_trace, format_server_timing
+)
 
 bp = Blueprint('main', __name__)
+logger = logging.getLogger(__name__)
 
 # Get singleton instances
 manager = ImageManager.get_instance()
-mixing_worker = MixingWorker.get_instance()
+# Independent mixing pipeline per output port ('output_1' -> 1, ...)
+mixing_workers = {
+    int(key.split('_')[-1]): MixingWorker.get_instance(int(key.split('_')[-1]))
+    for key in manager.get_output_slot_ids()
+}
+metrics = MetricsRegistry.get_instance()
+
+# ---------------------- STAGE TIMING ----------------------
+@bp.before_app_request
+def _start_stage_trace():
+    request.environ['moire.trace_token'] = start_request_trace()
+
+@bp.after_app_request
+def _add_server_timing(response):
+    token = request.environ.pop('moire.trace_token', None)
+    if token is None:
+        return response
+    timings = finish_request_trace(token)
+    wanted = current_app.config.get('SERVER_TIMING', False) or request.args.get('server_timing')
+    if wanted and timings:
+        response.headers['Server-Timing'] = format_server_timing(timings)
+    return response
+
+@bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms plus cache gauges."""
+    cache_stats = beam_cache.stats()
+    spectrum_stats = SpectrumCache.get_instance().stats()
+    body = metrics.render_prometheus({
+        'moire_beam_cache_entries': cache_stats['entries'],
+        'moire_beam_cache_bytes': cache_stats['bytes'],
+        'moire_beam_cache_hits': cache_stats['hits'],
+        'moire_beam_cache_misses': cache_stats['misses'],
+        'moire_spectrum_cache_entries': spectrum_stats['entries'],
+        'moire_spectrum_cache_bytes': spectrum_stats['bytes'],
+        'moire_spectrum_cache_hits': spectrum_stats['hits'] + spectrum_stats['disk_hits'],
+        'moire_spectrum_cache_misses': spectrum_stats['misses'],
+    })
+    return Response(body, mimetype='text/plain; version=0.0.4')
 
 @bp.route('/')
 def index():
@@ -36,7 +85,10 @@ def upload():
     file = request.files['image']
     if file:
         # Use the upload_image method which now returns an ImageModel
-        manager.upload_image(slot, file.read())
+        try:
+            manager.upload_image(slot, file.read(), color=_is_truthy(request.form.get('color', False)))
+        except ValueError as e:
+            return jsonify({'msg': 'failed', 'error': str(e)}), 400
         return jsonify({'msg': 'success'})
     return jsonify({'msg': 'failed'}), 400
 
@@ -45,16 +97,10 @@ def upload():
 @bp.route('/mix', methods=['POST'])
 def mix():
     data = request.json
-    print(f"Mixing request data: {data}")
+    logger.debug("Mixing request data: %s", data)
 
     # Parse sliders
-    wa = {}
-    wb = {}
-    for key, value in data.items():
-        if key.startswith('wa') and key[-1].isdigit():
-            wa[key[-1]] = float(value)
-        elif key.startswith('wb') and key[-1].isdigit():
-            wb[key[-1]] = float(value)
+    wa, wb = UnifiedMixer.parse_weight_fields(data)
     
     # Get mixing mode (basic or region)
     mixing_mode = data.get('mixing_mode', 'basic')
@@ -63,52 +109,20 @@ def mix():
     component_mode = data.get('mode', 'magnitude_phase')
     
     # Get target output port
-    target_output = data.get('target_output', 1)
-    
-    # Get regions data
-    regions_data = data.get('regions', {})
+    try:
+        target_output = int(data.get('target_output', 1))
+    except (TypeError, ValueError):
+        target_output = None
+    if target_output not in mixing_workers:
+        return jsonify({"error": f"Invalid target output: {data.get('target_output')}"}), 400
     
     # Convert to backend-compatible region format
-    if mixing_mode == 'basic':
-        # Basic mode: use full region (100%) inner for all
-        region_config = {
-            'size': 100,
-            'inner': True,
-            'regions': {
-                '1': {'type': 'inner', 'x': 0, 'y': 0, 'width': 100, 'height': 100},
-                '2': {'type': 'inner', 'x': 0, 'y': 0, 'width': 100, 'height': 100},
-                '3': {'type': 'inner', 'x': 0, 'y': 0, 'width': 100, 'height': 100},
-                '4': {'type': 'inner', 'x': 0, 'y': 0, 'width': 100, 'height': 100}
-            }
-        }
-    else:
-        # Region mode: use user-defined regions
-        region_config = {
-            'size': 100,
-            'inner': True,
-            'regions': {}
-        }
-        
-        for slot in ['1', '2', '3', '4']:
-            if slot in regions_data:
-                region = regions_data[slot]
-                region_config['regions'][slot] = {
-                    'type': region.get('type', 'inner'),
-                    'x': float(region.get('x', 0)),
-                    'y': float(region.get('y', 0)),
-                    'width': float(region.get('width', 100)),
-                    'height': float(region.get('height', 100))
-                }
-            else:
-                region_config['regions'][slot] = {
-                    'type': 'inner',
-                    'x': 0,
-                    'y': 0,
-                    'width': 100,
-                    'height': 100
-                }
+    try:
+        region_config = UnifiedMixer.build_region_config(mixing_mode, data.get('regions', {}))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
 
-    print(f"Processed region config: {region_config}")
+    logger.debug("Processed region config: %s", region_config)
 
     # Start async mixing
     try:
@@ -116,16 +130,13 @@ def mix():
         # The mixer needs all slots, even if they're None
         all_images = manager.get_all_inputs()
         
-        # Debug logging
-        image_count = sum(1 for img in all_images.values() if img is not None)
-        print(f"Starting mix with {image_count} images")
-        print(f"Weights A: {wa}")
-        print(f"Weights B: {wb}")
-        print(f"Mode: {component_mode}")
-        print(f"Target output: {target_output}")
+        if logger.isEnabledFor(logging.DEBUG):
+            image_count = sum(1 for img in all_images.values() if img is not None)
+            logger.debug("Starting mix with %d images: mode=%s, target=%s, weights_a=%s, weights_b=%s",
+                         image_count, component_mode, target_output, wa, wb)
         
-        # Start the worker
-        mixing_worker.start(
+        # Start the worker for that output; the other outputs keep running
+        mixing_workers[target_output].start(
             all_images,  # Pass all images, including None values
             wa,
             wb,
@@ -135,17 +146,19 @@ def mix():
         )
         return jsonify({"status": "mix_started"})
     except Exception as e:
-        print(f"Error starting mix: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error starting mix")
         return jsonify({"error": str(e)}), 500
 
 # ---------------------- MIXING STATUS ----------------------
 # Update the mix_status route in routes.py:
 @bp.route('/mix_status', methods=['GET'])
 def mix_status():
-    """Frontend polls this every 200ms."""
-    status = mixing_worker.get_status()
+    """Frontend polls this every 200ms; ?output=N selects the output port."""
+    try:
+        worker = mixing_workers[int(request.args.get('output', 1))]
+    except (KeyError, ValueError):
+        return jsonify({"error": f"Invalid output: {request.args.get('output')}"}), 400
+    status = worker.get_status()
     # Format status to match expected frontend format
     formatted_status = {
         "running": status["running"],
@@ -175,7 +188,7 @@ def get_view():
             b64 = output_model.get_encoded_view(view_type)
             return jsonify({'image': b64})
         except Exception as e:
-            print(f"Error getting output view for {output_key}, type {view_type}: {e}")
+            logger.warning("Error getting output view for %s, type %s: %s", output_key, view_type, e)
             return jsonify({'image': ''})
     else:
         # Handle input images
@@ -188,23 +201,256 @@ def get_view():
             b64 = img.get_encoded_view(view_type)
             return jsonify({'image': b64})
         except Exception as e:
-            print(f"Error getting input view for slot {slot}, type {view_type}: {e}")
+            logger.warning("Error getting input view for slot %s, type %s: %s", slot, view_type, e)
             return jsonify({'error': str(e)}), 500
  # ---------------------- CLEAR IMAGES ----------------------
 @bp.route("/reset", methods=["POST"])
 def reset():
     """Clear all images."""
     manager.clear_all()
-    mixing_worker.clear_results()
+    for worker in mixing_workers.values():
+        worker.clear_results()
     return "", 204
 
 #----------------------------BEAMFORMING------------------------------
-from beam_models.phased_array import PhasedArray, LinearGeometry, CurvilinearGeometry
-from beam_models.beam_viewer import BeamViewer
+from beam_models.phased_array import (
+    PhasedArray, LinearGeometry, CurvilinearGeometry, GEOMETRY_STRATEGIES, parse_focal_point
+)
+from beam_models.beam_viewer import BeamViewer, WAVE_MAP_EXTENT
+from beam_models.beam_cache import BeamResultCache
+from beam_models.wave_animator import WaveAnimator
+from beam_models.beam_metrics import analyze_beam_profile
 
 
 phased_array = PhasedArray()
+# Held while handlers change phased_array; renders work on snapshots taken under it
+_phased_array_lock = threading.RLock()
 beam_viewer = BeamViewer()
+beam_cache = BeamResultCache(max_entries=128)
+
+def _phased_array_snapshot():
+    """Consistent copy of the shared array; cache keys and renders both use it."""
+    with _phased_array_lock:
+        return phased_array.clone()
+
+# ---------------------- SHARED STATE ----------------------
+# With several worker processes, the phased-array parameters go through the
+# state store: refreshed before each request, published after one changes them.
+_state_store = None
+_phased_array_version = None
+
+def bind_state_store(store):
+    """Share image slots, mixing status and beamforming parameters through store."""
+    global _state_store, _phased_array_version
+    manager.set_state_store(store)
+    for worker in mixing_workers.values():
+        worker.set_state_store(store)
+    _state_store = store if store is not None and store.is_shared() else None
+    _phased_array_version = None
+
+@bp.before_app_request
+def _sync_phased_array():
+    global _phased_array_version
+    if _state_store is None:
+        return
+    with _phased_array_lock:
+        if _state_store.version('phased_array') != _phased_array_version:
+            params, version = _state_store.get_versioned('phased_array')
+            if params is not None:
+                phased_array.set_parameters(params)
+            _phased_array_version = version
+        request.environ['moire.phased_array_key'] = phased_array.get_state_key()
+
+@bp.after_app_request
+def _publish_phased_array(response):
+    global _phased_array_version
+    key = request.environ.pop('moire.phased_array_key', None)
+    if _state_store is None or key is None:
+        return response
+    with _phased_array_lock:
+        if key != phased_array.get_state_key():
+            _phased_array_version = _state_store.set('phased_array', phased_array.get_parameters())
+    return response
+
+WAVE_MAP_MAX_SIZE = 4096
+# Streams hold their field and encoded frames for the life of the connection
+WAVE_ANIMATION_MAX_SIZE = 1024
+WAVE_MAP_PREVIEW_FACTOR = 4
+
+# Full-resolution wave maps requested progressively are rendered here; kept
+# separate from the compute pool so a render never waits on its own workers.
+_background_renders = ThreadPoolExecutor(max_workers=1)
+_pending_wave_maps = {}
+_pending_lock = threading.Lock()
+
+def _parse_wave_map_options(source):
+    """Render mode, grid size and viewport from query args or a JSON body."""
+    def clamp_size(value, default):
+        return int(min(max(int(value if value is not None else default), 16), WAVE_MAP_MAX_SIZE))
+
+    viewport = None
+    bounds = [source.get(name) for name in ('x_min', 'x_max', 'y_min', 'y_max')]
+    if all(bound is not None for bound in bounds):
+        x_min, x_max, y_min, y_max = (float(bound) for bound in bounds)
+        if not all(math.isfinite(bound) for bound in (x_min, x_max, y_min, y_max)):
+            raise ValueError("Viewport bounds must be finite numbers")
+        if x_max <= x_min or y_max <= y_min:
+            raise ValueError("Viewport must satisfy x_min < x_max and y_min < y_max")
+        viewport = (x_min, x_max, y_min, y_max)
+    z_plane = float(source.get('z_plane', 0.0))
+    if not math.isfinite(z_plane):
+        raise ValueError("z_plane must be a finite number")
+    return {
+        'render': source.get('render', 'figure'),
+        'format': source.get('format', 'png'),
+        'width': clamp_size(source.get('width'), 800),
+        'height': clamp_size(source.get('height'), 800),
+        'viewport': viewport,
+        'z_plane': z_plane
+    }
+
+def _wave_map_key(array, options):
+    return ('wave_map', array.get_state_key(), options['render'], options['format'],
+            options['width'], options['height'], options['viewport'], options['z_plane'])
+
+def _render_wave_map(array, options):
+    """
+    Wave map image for an array state and view, memoized on both. array
+    must be a snapshot, not the shared phased_array.
+    """
+    def compute():
+        logger.debug("Rendering wave map: %s, %dx%d, render=%s",
+                     array.geometry_name, options['width'], options['height'], options['render'])
+        extent = list(options['viewport'] or array.get_default_viewport())
+        with time_stage('wave_map'):
+            wave_map = array.generate_wave_map(
+                (options['width'], options['height']), options['viewport'], options['z_plane']
+            )
+        # render=raster skips Matplotlib; the client draws axes for the returned extent
+        with time_stage('render'):
+            if options['render'] == 'raster':
+                image = beam_viewer.generate_wave_map_raster(wave_map, options['format'])
+            else:
+                image = beam_viewer.generate_wave_map_image(wave_map, extent)
+        return {
+            'image': image,
+            'transmitter_positions': array.get_transmitter_positions(),
+            'extent': extent,
+            'width': options['width'],
+            'height': options['height']
+        }
+    return beam_cache.get_or_compute(_wave_map_key(array, options), compute)
+
+def _wave_map_payload(array, options):
+    """Like _render_wave_map, but joins a background render of the same view"""
+    with _pending_lock:
+        pending = _pending_wave_maps.get(_wave_map_key(array, options))
+    if pending is not None:
+        return pending.result()
+    return _render_wave_map(array, options)
+
+def _progressive_wave_map_payload(options):
+    """
+    Coarse preview now, full resolution rendered in the background.
+
+    The full-resolution result lands in the beam cache, so the client's
+    follow-up request with the same parameters is served from there.
+    """
+    snapshot = _phased_array_snapshot()
+    key = _wave_map_key(snapshot, options)
+    cached = beam_cache.get(key)
+    if cached is not None:
+        return dict(cached, preview=False)
+
+    def render_full():
+        try:
+            return _render_wave_map(snapshot, options)
+        finally:
+            with _pending_lock:
+                _pending_wave_maps.pop(key, None)
+
+    with _pending_lock:
+        if key not in _pending_wave_maps:
+            _pending_wave_maps[key] = _background_renders.submit(render_full)
+
+    preview_options = dict(
+        options,
+        width=max(16, options['width'] // WAVE_MAP_PREVIEW_FACTOR),
+        height=max(16, options['height'] // WAVE_MAP_PREVIEW_FACTOR)
+    )
+    return dict(_render_wave_map(snapshot, preview_options), preview=True)
+
+def _beam_profile_payload(array, metrics_only=False):
+    """
+    Beam profile image, samples and metrics for an array snapshot,
+    memoized. With metrics_only the raw angle/response lists are dropped.
+    """
+    def compute():
+        with time_stage('beam_profile'):
+            angles, response = array.calculate_beam_profile()
+        with time_stage('render'):
+            image = beam_viewer.generate_beam_profile_image(angles, response)
+        return {
+            'image': image,
+            'angles': angles,
+            'response': response,
+            'metrics': analyze_beam_profile(angles, response)
+        }
+    payload = beam_cache.get_or_compute(('beam_profile', array.get_state_key()), compute)
+    if metrics_only:
+        return {'image': payload['image'], 'metrics': payload['metrics']}
+    return payload
+
+def _is_truthy(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+MAX_TRANSMITTERS = 128
+# Accepted ranges (inclusive) for client-supplied array parameters
+BEAM_PARAM_RANGES = {
+    'frequency': (0.01, 100.0),
+    'phase_shift': (-4 * np.pi, 4 * np.pi),
+    'elevation_phase_shift': (-4 * np.pi, 4 * np.pi),
+    'distance': (0.0, 10.0),
+    'radius': (0.1, 100.0),
+    'transmitter_count': (1, MAX_TRANSMITTERS),
+}
+
+def _parse_beam_params(data):
+    """
+    Validated PhasedArray.configure() arguments for the parameters in data.
+
+    Raises:
+        ValueError: If geometry is unknown or a value is not a number in
+            its BEAM_PARAM_RANGES range
+    """
+    params = {}
+    geometry = data.get('geometry')
+    if geometry is not None:
+        if geometry not in GEOMETRY_STRATEGIES:
+            raise ValueError(f"Unknown geometry: {geometry}")
+        params['geometry'] = geometry
+    for name, (low, high) in BEAM_PARAM_RANGES.items():
+        value = data.get(name)
+        if value is None:
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a number, got {value!r}")
+        if not low <= number <= high:
+            raise ValueError(f"{name} must be between {low:g} and {high:g}")
+        params[name] = int(number) if name == 'transmitter_count' else number
+    return params
+
+def _set_array_parameter(data, name, attribute, default):
+    """Validate data[name] and assign it to phased_array.<attribute>."""
+    try:
+        value = _parse_beam_params({name: data.get(name, default)})[name]
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    with _phased_array_lock:
+        setattr(phased_array, attribute, value)
+    return jsonify({'success': True})
 
 # -------------------------------
 # GET current phased array
@@ -218,77 +464,281 @@ def get_phased_array():
 # -------------------------------
 @bp.route('/update_frequency', methods=['POST'])
 def update_frequency():
-    data = request.json
-    phased_array.current_frequency = data.get('frequency', 1)
-    return jsonify({'success': True})
+    return _set_array_parameter(request.json or {}, 'frequency', 'current_frequency', 1)
 
 # -------------------------------
 # Update phase shift
 # -------------------------------
 @bp.route('/update_phase_shift', methods=['POST'])
 def update_phase_shift():
-    data = request.json
-    phased_array.phase_shift = data.get('phase_shift', 0)
-    return jsonify({'success': True})
+    return _set_array_parameter(request.json or {}, 'phase_shift', 'phase_shift', 0)
 
 # Update geometry
 @bp.route('/update_geometry', methods=['POST'])
 def update_geometry():
     data = request.json
     geometry = data.get('geometry', 'Linear')
-    if geometry == "Linear":
-        phased_array.geometry_strategy = LinearGeometry()
-    else:
-        phased_array.geometry_strategy = CurvilinearGeometry()
+    with _phased_array_lock:
+        phased_array.geometry_strategy = GEOMETRY_STRATEGIES.get(geometry, CurvilinearGeometry)()
     return jsonify({'success': True})
 
+# Update elevation phase shift (planar arrays)
+@bp.route('/update_elevation_phase_shift', methods=['POST'])
+def update_elevation_phase_shift():
+    return _set_array_parameter(request.json or {}, 'elevation_phase_shift', 'elevation_phase_shift', 0)
+
+# -------------------------------
+# Near-field focusing
+# -------------------------------
+@bp.route('/focus', methods=['POST'])
+def focus():
+    """
+    Focus the array on {x, y[, z]} (or clear with {"focal_point": null}) and
+    return the intensity at the focus and along lateral/axial lines through it.
+    """
+    data = request.json or {}
+    try:
+        if 'focal_point' in data and data['focal_point'] is None:
+            with _phased_array_lock:
+                phased_array.focal_point = None
+            return jsonify({'success': True, 'focal_point': None})
+        point = parse_focal_point(data.get('focal_point') or [data['x'], data['y'], data.get('z', 0.0)])
+        with _phased_array_lock:
+            phased_array.focal_point = point
+            snapshot = phased_array.clone()
+        profiles = snapshot.calculate_focal_profiles(
+            float(data.get('half_length', 5.0)),
+            min(max(int(data.get('samples', 201)), 3), 10001)
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid focal point: {e}'}), 400
+    return jsonify(dict(profiles, success=True))
+
 # Update distance
 @bp.route('/update_distance', methods=['POST'])
 def update_distance():
-    data = request.json
-    phased_array.distance = data.get('distance', 1)  # auto updates positions
-    return jsonify({'success': True})
+    # The distance setter recomputes positions
+    return _set_array_parameter(request.json or {}, 'distance', 'distance', 1)
 
 # Update radius
 @bp.route('/update_radius', methods=['POST'])
 def update_radius():
-    data = request.json
-    phased_array.radius = data.get('radius', 1)  # auto updates positions
-    return jsonify({'success': True})
+    # The radius setter recomputes positions
+    return _set_array_parameter(request.json or {}, 'radius', 'radius', 1)
 
 # -------------------------------
 # Add/remove transmitter
 # -------------------------------
 @bp.route('/add_transmitter', methods=['POST'])
 def add_transmitter():
-    phased_array.add_transmitter()
-    return jsonify({'success': True, 'count': len(phased_array.transmitters)})
+    with _phased_array_lock:
+        if len(phased_array.transmitters) >= MAX_TRANSMITTERS:
+            return jsonify({'error': f'At most {MAX_TRANSMITTERS} transmitters'}), 400
+        phased_array.add_transmitter()
+        count = len(phased_array.transmitters)
+    return jsonify({'success': True, 'count': count})
 
 @bp.route('/remove_transmitter', methods=['POST'])
 def remove_transmitter():
-    phased_array.remove_transmitter()
-    return jsonify({'success': True, 'count': len(phased_array.transmitters)})
+    with _phased_array_lock:
+        phased_array.remove_transmitter()
+        count = len(phased_array.transmitters)
+    return jsonify({'success': True, 'count': count})
 
 # -------------------------------
 # Wave map
 # -------------------------------
 @bp.route('/wave_map', methods=['GET'])
 def get_wave_map():
-    if len(phased_array.transmitters) == 0:
+    try:
+        options = _parse_wave_map_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if _is_truthy(request.args.get('progressive', False)):
+        return jsonify(_progressive_wave_map_payload(options))
+    snapshot = _phased_array_snapshot()
+    if len(snapshot.transmitters) == 0:
         return jsonify({'image': '', 'transmitter_positions': []})
-    wave_map = phased_array.generate_wave_map()
-    image = beam_viewer.generate_wave_map_image(wave_map)
-    positions = phased_array.get_transmitter_positions()
-    return jsonify({'image': image, 'transmitter_positions': positions})
+    return jsonify(_wave_map_payload(snapshot, options))
+
+# -------------------------------
+# Animated wave propagation (MJPEG stream)
+# -------------------------------
+@bp.route('/wave_animation', methods=['GET'])
+def wave_animation():
+    """
+    Stream propagation frames as multipart/x-mixed-replace, usable directly
+    as an <img> source. The complex field is computed once per request from
+    a snapshot of the array; frames only rotate its phase.
+    """
+    args = request.args.to_dict()
+    args.setdefault('width', 400)
+    args.setdefault('height', 400)
+    try:
+        options = _parse_wave_map_options(args)
+        options['width'] = min(options['width'], WAVE_ANIMATION_MAX_SIZE)
+        options['height'] = min(options['height'], WAVE_ANIMATION_MAX_SIZE)
+        fps = min(max(float(args.get('fps', 30)), 1.0), 60.0)
+        speed = min(max(float(args.get('speed', 1.0)), 0.05), 10.0)
+        max_frames = int(args['frames']) if 'frames' in args else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    snapshot = _phased_array_snapshot()
+    field = snapshot.generate_wave_field(
+        (options['width'], options['height']), options['viewport'], options['z_plane']
+    )
+    animator = WaveAnimator(
+        field, beam_viewer.wave_map_lut, fps=fps, periods_per_second=speed,
+        image_format='png' if options['format'] == 'png' else 'jpg'
+    )
+    return Response(
+        stream_with_context(animator.stream(max_frames)),
+        mimetype='multipart/x-mixed-replace; boundary=frame'
+    )
 
 # -------------------------------
 # Beam profile
 # -------------------------------
 @bp.route('/beam_profile', methods=['GET'])
 def get_beam_profile():
-    angles, response = phased_array.calculate_beam_profile()
-    image = beam_viewer.generate_beam_profile_image(angles, response)
-    return jsonify({'image': image, 'angles': angles, 'response': response})
+    return jsonify(_beam_profile_payload(
+        _phased_array_snapshot(), _is_truthy(request.args.get('metrics_only', False))
+    ))
+
+# -------------------------------
+# Beam metrics only (no image, no sample lists)
+# -------------------------------
+@bp.route('/beam_metrics', methods=['GET'])
+def get_beam_metrics():
+    snapshot = _phased_array_snapshot()
+    key = ('beam_metrics', snapshot.get_state_key())
+    return jsonify(beam_cache.get_or_compute(key, snapshot.calculate_beam_metrics))
+
+# -------------------------------
+# 2D beam pattern (azimuth x elevation)
+# -------------------------------
+@bp.route('/beam_pattern_2d', methods=['GET'])
+def get_beam_pattern_2d():
+    try:
+        azimuth_count = min(max(int(request.args.get('azimuth_count', 181)), 2), 2048)
+        elevation_count = min(max(int(request.args.get('elevation_count', 91)), 2), 2048)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    snapshot = _phased_array_snapshot()
+
+    def compute():
+        azimuths, elevations, pattern = snapshot.calculate_beam_pattern_2d(
+            azimuth_count, elevation_count
+        )
+        return {
+            'image': beam_viewer.generate_beam_pattern_2d_raster(pattern),
+            'azimuths': azimuths.tolist(),
+            'elevations': elevations.tolist(),
+            'pattern': pattern.tolist()
+        }
+    key = ('beam_pattern_2d', snapshot.get_state_key(), azimuth_count, elevation_count)
+    return jsonify(beam_cache.get_or_compute(key, compute))
+
+# -------------------------------
+# Combined state update + results
+# -------------------------------
+@bp.route('/beamforming_state', methods=['POST'])
+def beamforming_state():
+    """Apply a full parameter set and return wave map and beam profile together."""
+    data = request.json or {}
+    try:
+        options = _parse_wave_map_options(data)
+        params = _parse_beam_params(data)
+        focal_point = parse_focal_point(data.get('focal_point'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    with _phased_array_lock:
+        phased_array.configure(**params)
+        if 'focal_point' in data:
+            phased_array.focal_point = focal_point
+        snapshot = phased_array.clone()
+    logger.debug("Beamforming state: %s", data)
+    return jsonify({
+        'state': snapshot.to_dict(),
+        'wave_map': _wave_map_payload(snapshot, options),
+        'beam_profile': _beam_profile_payload(snapshot, _is_truthy(data.get('metrics_only', False)))
+    })
+
+# -------------------------------
+# Parameter sweep (batch beam profiles)
+# -------------------------------
+MAX_SWEEP_VALUES = 50_000_000  # float32 samples, ~200 MB
+
+def _parse_sweep_axis(spec, default, name):
+    """
+    Accept a scalar, a list of values, or {'start', 'stop', 'num'}; every value
+    must lie in the BEAM_PARAM_RANGES range of name.
+    """
+    if spec is None:
+        return np.array([default], dtype=np.float64)
+    if isinstance(spec, dict):
+        values = np.linspace(float(spec['start']), float(spec['stop']), int(spec.get('num', 50)))
+    else:
+        values = np.atleast_1d(np.asarray(spec, dtype=np.float64))
+    if values.ndim != 1 or not np.all(np.isfinite(values)):
+        raise ValueError("Sweep axes must be flat lists of finite numbers")
+    low, high = BEAM_PARAM_RANGES[name]
+    if values.size and not (low <= values.min() and values.max() <= high):
+        raise ValueError(f"{name} values must be between {low:g} and {high:g}")
+    return values
+
+@bp.route('/beam_sweep', methods=['POST'])
+def beam_sweep():
+    """
+    Compute beam profiles over a frequency x phase shift x distance grid.
+
+    Returns an uncompressed .npz with angles, the three axes and a
+    (frequencies, phase_shifts, distances, angles) float32 'responses' array,
+    or just the responses array with format='npy'. The global phased array is
+    left untouched.
+    """
+    data = request.json or {}
+    current = _phased_array_snapshot()
+    try:
+        frequencies = _parse_sweep_axis(data.get('frequencies'), current.current_frequency, 'frequency')
+        phase_shifts = _parse_sweep_axis(data.get('phase_shifts'), current.phase_shift, 'phase_shift')
+        distances = _parse_sweep_axis(data.get('distances'), current.distance, 'distance')
+        num_angles = int(data.get('num_angles', 1000))
+        params = _parse_beam_params({
+            'geometry': data.get('geometry', current.geometry_name),
+            'transmitter_count': data.get('transmitter_count', len(current.transmitters)),
+            'radius': data.get('radius', current.radius)
+        })
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid sweep specification: {e}'}), 400
+
+    total = len(frequencies) * len(phase_shifts) * len(distances) * num_angles
+    if num_angles < 2 or total > MAX_SWEEP_VALUES:
+        return jsonify({'error': f'Sweep size {total} outside allowed range (max {MAX_SWEEP_VALUES})'}), 400
+
+    sweep_array = PhasedArray()
+    sweep_array.configure(**params)
+    logger.info("Beam sweep: %d x %d x %d x %d", len(frequencies), len(phase_shifts),
+                len(distances), num_angles)
+    angles, responses = sweep_array.calculate_beam_profile_sweep(
+        frequencies, phase_shifts, distances, num_angles
+    )
+
+    buf = io.BytesIO()
+    if data.get('format', 'npz') == 'npy':
+        np.save(buf, responses)
+        filename = 'beam_sweep.npy'
+    else:
+        np.savez(buf, angles=angles, frequencies=frequencies, phase_shifts=phase_shifts,
+                 distances=distances, responses=responses)
+        filename = 'beam_sweep.npz'
+    return Response(
+        buf.getvalue(),
+        mimetype='application/octet-stream',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 # -------------------------------
 # Load scenario
@@ -297,13 +747,24 @@ def get_beam_profile():
 def load_scenario():
     data = request.json
     scenario = data.get('scenario', 'custom')
+    with _phased_array_lock:
+        _apply_scenario(scenario)
+        geometry = phased_array.geometry_name
+    return jsonify({
+        'success': True,
+        'geometry': geometry
+    })
 
-   # Clear all existing transmitters
+def _apply_scenario(scenario):
+    """Reconfigure phased_array for a preset scenario (caller holds _phased_array_lock)."""
+    # Clear all existing transmitters
     while len(phased_array.transmitters) > 1:
         phased_array.remove_transmitter()
 
-    # Reset phase shift
+    # Reset phase shifts and focusing
     phased_array.phase_shift = 0
+    phased_array.elevation_phase_shift = 0
+    phased_array.focal_point = None
 
     if scenario == 'tumor_ablation':
         phased_array.geometry_strategy = CurvilinearGeometry()
@@ -314,6 +775,10 @@ def load_scenario():
         for _ in range(15):
             phased_array.add_transmitter()
 
+        # Focus in front of the arc, halfway to its center of curvature; the
+        # center itself is equidistant from every element and needs no delays
+        phased_array.focal_point = (phased_array.radius / 2, phased_array.radius)
+
     elif scenario == 'ultrasound':
         phased_array.geometry_strategy = LinearGeometry()
         phased_array.distance = 0.5
@@ -335,13 +800,3 @@ def load_scenario():
         phased_array.geometry_strategy = LinearGeometry()
         phased_array.distance = 0.5
         phased_array.current_frequency = 1
-        
-
-    # Return friendly geometry name
-    geometry_name = "Linear" if isinstance(phased_array.geometry_strategy, LinearGeometry) else "Curvilinear"
-
-    return jsonify({
-        'success': True,
-        'geometry': geometry_name
-        
-    })
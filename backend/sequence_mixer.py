@@ -0,0 +1,409 @@
+"""
+Frame-sequence mixing: video files, image directories or image stacks mixed
+frame by frame with fixed weights and regions.
+
+Frames stream through three stages connected by bounded queues:
+
+    reader thread   decode + resize + forward FFT (one ImageModel per slot)
+    caller thread   mix + inverse FFT on one warm UnifiedMixer
+    writer thread   normalize + encode + write
+
+The mixer, its cached masks and its pooled workspace are reused for every
+frame, and OpenCV and NumPy's FFT release the GIL, so decoding and encoding
+overlap the mix. A slot given a still image holds that image (and its
+spectrum) for every frame, e.g. to keep one magnitude fixed under a video's
+phase. The sequence ends with the shortest non-still source.
+
+CLI (from the repository root), with a batch-style spec whose "images" map
+slots to sources and whose "output" is a video file or a frame directory:
+    python -m backend.sequence_mixer sequence.json --output-dir out/
+"""
+import argparse
+import glob
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+import cv2
+import numpy as np
+
+from .batch import IMAGE_EXTENSIONS, MixJob, load_spec
+from .cancellation import CancellationToken
+from .imagemodel import ImageModel
+from .logging_config import configure_logging
+from .mixer import UnifiedMixer
+
+logger = logging.getLogger(__name__)
+
+VIDEO_FOURCC = {'.mp4': 'mp4v', '.m4v': 'mp4v', '.mov': 'mp4v', '.avi': 'MJPG', '.mkv': 'XVID'}
+DEFAULT_FPS = 25.0
+
+# Queue marker for the end of the stream
+_END = object()
+
+
+class FrameSource:
+    """
+    Frames of one slot: a video file, a directory of images, a glob pattern
+    or a still image (repeated for every frame).
+    """
+
+    def __init__(self, path: str, color: bool = False):
+        self._path = path
+        self._color = color
+        self._files = None
+        self._still = False
+        self._capture = None
+        self._fps = None
+
+        if os.path.isdir(path):
+            self._files = sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        elif any(c in path for c in '*?['):
+            self._files = sorted(p for p in glob.glob(path) if p.lower().endswith(IMAGE_EXTENSIONS))
+        elif not os.path.exists(path):
+            raise FileNotFoundError(f"No such frame source: {path}")
+        elif path.lower().endswith(IMAGE_EXTENSIONS):
+            self._still = True
+        else:
+            self._capture = cv2.VideoCapture(path)
+            if not self._capture.isOpened():
+                raise ValueError(f"Could not open video: {path}")
+            self._fps = self._capture.get(cv2.CAP_PROP_FPS) or None
+
+        if self._files is not None and not self._files:
+            raise ValueError(f"No images found for {path}")
+
+    # Getter methods
+    def get_path(self) -> str:
+        return self._path
+
+    def get_fps(self) -> Optional[float]:
+        """Frame rate of a video source; None for image sources."""
+        return self._fps
+
+    def is_still(self) -> bool:
+        return self._still
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        if self._still:
+            # The same array every frame lets the pipeline reuse its FFT
+            return itertools.repeat(self._read_image(self._path))
+        if self._files is not None:
+            return (self._read_image(path) for path in self._files)
+        return self._read_video()
+
+    def close(self) -> None:
+        if self._capture is not None:
+            self._capture.release()
+
+    def _read_image(self, path: str) -> np.ndarray:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR if self._color else cv2.IMREAD_GRAYSCALE)
+        if frame is None:
+            raise ValueError(f"Could not decode image: {path}")
+        return frame
+
+    def _read_video(self) -> Iterator[np.ndarray]:
+        while True:
+            ok, frame = self._capture.read()
+            if not ok:
+                return
+            if not self._color and frame.ndim == 3:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            yield frame
+
+
+class FrameSink:
+    """Writes 8-bit frames to a video file or as numbered PNGs in a directory."""
+
+    def __init__(self, path: str, fps: float = DEFAULT_FPS):
+        self._path = path
+        self._fps = fps
+        self._fourcc = VIDEO_FOURCC.get(os.path.splitext(path)[1].lower())
+        self._writer = None
+        self._count = 0
+        directory = path if self._fourcc is None else os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_path(self) -> str:
+        return self._path
+
+    def get_frame_count(self) -> int:
+        return self._count
+
+    def write(self, frame: np.ndarray) -> None:
+        if self._fourcc is None:
+            frame_path = os.path.join(self._path, f'frame_{self._count:06d}.png')
+            if not cv2.imwrite(frame_path, frame):
+                raise RuntimeError(f"Could not write {frame_path}")
+        else:
+            if self._writer is None:
+                # The writer needs the frame size, so it opens on the first frame
+                h, w = frame.shape[:2]
+                self._writer = cv2.VideoWriter(
+                    self._path, cv2.VideoWriter_fourcc(*self._fourcc), self._fps, (w, h),
+                    isColor=frame.ndim == 3
+                )
+                if not self._writer.isOpened():
+                    raise RuntimeError(f"Could not open video writer for {self._path}")
+            self._writer.write(frame)
+        self._count += 1
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+
+
+def iter_frame_sets(sources: Dict[str, FrameSource]) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield {slot: frame} until the shortest non-still source runs out."""
+    iterators = {slot: iter(source) for slot, source in sources.items()}
+    if all(source.is_still() for source in sources.values()):
+        yield {slot: next(it) for slot, it in iterators.items()}
+        return
+    while True:
+        frames = {}
+        for slot, it in iterators.items():
+            frame = next(it, None)
+            if frame is None:
+                return
+            frames[slot] = frame
+        yield frames
+
+
+class SequenceMixer:
+    """Mixes a stream of frame sets with fixed weights and regions."""
+
+    def __init__(self, weights_a: Dict, weights_b: Dict, mode: str = 'magnitude_phase',
+                 region_config: Optional[Dict] = None, queue_size: int = 4):
+        # One mixer for the whole sequence keeps its masks and workspace warm
+        self._mixer = UnifiedMixer()
+        self._mixer.set_weights_a({str(k): float(v) for k, v in weights_a.items()})
+        self._mixer.set_weights_b({str(k): float(v) for k, v in weights_b.items()})
+        self._mixer.set_mode(mode)
+        self._mixer.set_region_config(region_config or UnifiedMixer.get_default_region_config('basic'))
+        self._mixer.set_encode_result(False)
+        self._queue_size = max(1, queue_size)
+        self._frames_mixed = 0
+
+    # Getter and setter methods
+    def get_mixer(self) -> UnifiedMixer:
+        return self._mixer
+
+    def get_queue_size(self) -> int:
+        return self._queue_size
+
+    def set_queue_size(self, queue_size: int) -> None:
+        self._queue_size = max(1, queue_size)
+
+    def get_frames_mixed(self) -> int:
+        return self._frames_mixed
+
+    # Public methods
+    def mix_frames(self, frame_sets: Iterable[Dict[str, np.ndarray]],
+                   cancel_token: Optional[CancellationToken] = None) -> Iterator[np.ndarray]:
+        """
+        Yield the real-valued mix of each {slot: frame} set.
+
+        The frame_sets iterable is consumed (decoded, resized and transformed)
+        by a reader thread that stays at most queue_size frames ahead.
+        Cancelling cancel_token raises MixCancelled from the current frame.
+        """
+        self._mixer.set_cancel_token(cancel_token)
+        models = queue.Queue(self._queue_size)
+        stop = CancellationToken()
+        reader = threading.Thread(
+            target=self._read, args=(frame_sets, models, stop),
+            name='sequence-reader', daemon=True
+        )
+        reader.start()
+        try:
+            while True:
+                item = _get(models, stop)
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                self._mixer.set_images_dict(item)
+                result_array, _ = self._mixer.mix()
+                self._frames_mixed += 1
+                yield result_array
+        finally:
+            stop.cancel()
+            reader.join()
+
+    def run(self, sources: Dict[str, FrameSource], sink: FrameSink,
+            max_frames: Optional[int] = None,
+            cancel_token: Optional[CancellationToken] = None) -> Dict:
+        """
+        Mix sources into sink; the writer thread normalizes, encodes and
+        writes each frame while the next one is mixed.
+
+        Returns:
+            Summary with the frame count and throughput
+        """
+        start = time.perf_counter()
+        frame_sets = itertools.islice(iter_frame_sets(sources), max_frames)
+        results = queue.Queue(self._queue_size)
+        stop = CancellationToken()
+        errors = []
+        writer = threading.Thread(
+            target=_write, args=(sink, results, stop, errors),
+            name='sequence-writer', daemon=True
+        )
+        writer.start()
+        try:
+            for result_array in self.mix_frames(frame_sets, cancel_token):
+                if not _put(results, result_array, stop):
+                    break
+            _put(results, _END, stop)
+        except BaseException:
+            stop.cancel()
+            raise
+        finally:
+            writer.join()
+            sink.close()
+        if errors:
+            raise errors[0]
+
+        seconds = time.perf_counter() - start
+        frames = sink.get_frame_count()
+        return {
+            "output": sink.get_path(),
+            "frames": frames,
+            "seconds": round(seconds, 4),
+            "fps": round(frames / seconds, 2) if seconds > 0 else None,
+        }
+
+    # Private methods
+    def _read(self, frame_sets, models: queue.Queue, stop: CancellationToken) -> None:
+        """Reader thread: frames to same-size ImageModels (FFT included)."""
+        try:
+            target = None
+            previous = {}
+            for frames in frame_sets:
+                if stop.is_cancelled():
+                    return
+                if target is None:
+                    # Smallest common size, as ImageManager unifies uploads
+                    target = (min(f.shape[0] for f in frames.values()),
+                              min(f.shape[1] for f in frames.values()))
+                images = {}
+                for slot, frame in frames.items():
+                    cached = previous.get(slot)
+                    if cached is not None and cached[0] is frame:
+                        images[slot] = cached[1]
+                        continue
+                    if frame.shape[:2] != target:
+                        frame_resized = cv2.resize(frame, (target[1], target[0]))
+                    else:
+                        frame_resized = frame
+                    images[slot] = ImageModel.from_array(frame_resized)
+                    previous[slot] = (frame, images[slot])
+                if not _put(models, images, stop):
+                    return
+            _put(models, _END, stop)
+        except BaseException as e:
+            _put(models, e, stop)
+
+
+# ---------------------- INTERNAL HELPERS ----------------------
+def _put(q: queue.Queue, item, stop: CancellationToken) -> bool:
+    """Blocking put that gives up (returns False) once stop is cancelled."""
+    while not stop.is_cancelled():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: CancellationToken):
+    """Blocking get; returns _END once stop is cancelled."""
+    while not stop.is_cancelled():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def _write(sink: FrameSink, results: queue.Queue, stop: CancellationToken, errors: list) -> None:
+    """Writer thread: same 0-255 normalization as the mixer's display image."""
+    try:
+        while True:
+            result_array = _get(results, stop)
+            if result_array is _END:
+                return
+            frame = np.uint8(cv2.normalize(result_array, None, 0, 255, cv2.NORM_MINMAX))
+            sink.write(frame)
+    except BaseException as e:
+        errors.append(e)
+        stop.cancel()
+
+
+# ---------------------- CLI ----------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m backend.sequence_mixer', description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('spec', help='JSON or YAML spec (batch format; images map slots to sources)')
+    parser.add_argument('-o', '--output-dir', default='.', help='directory for outputs (default: .)')
+    parser.add_argument('--fps', type=float, default=None,
+                        help='output frame rate (default: the first video source, else 25)')
+    parser.add_argument('--max-frames', type=int, default=None)
+    parser.add_argument('--queue-size', type=int, default=4, help='frames buffered per stage')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args(argv)
+
+    configure_logging({'LOG_LEVEL': args.log_level})
+    try:
+        spec = load_spec(args.spec)
+    except (OSError, ValueError, RuntimeError) as e:
+        parser.error(str(e))
+
+    base_dir = os.path.dirname(os.path.abspath(args.spec))
+    defaults = spec.get('defaults') or {}
+    entries = spec.get('jobs') or [spec]
+    failed = 0
+    for index, entry in enumerate(entries):
+        entry = dict(entry)
+        # Without an explicit output, frames go to a directory named after the job
+        entry.setdefault('output', str(entry.get('name') or f'sequence_{index:03d}'))
+        sources = {}
+        try:
+            job = MixJob.from_dict(entry, defaults, base_dir, args.output_dir, index)
+            sources = {slot: FrameSource(path, job.is_color()) for slot, path in job.get_images().items()}
+            fps = args.fps or next((s.get_fps() for s in sources.values() if s.get_fps()), DEFAULT_FPS)
+            mixer = SequenceMixer(
+                job.get_weights_a(), job.get_weights_b(), job.get_mode(),
+                UnifiedMixer.build_region_config(job.get_mixing_mode(), job.get_regions()),
+                args.queue_size
+            )
+            summary = dict(name=job.get_name(), status="ok",
+                           **mixer.run(sources, FrameSink(job.get_output(), fps), args.max_frames))
+        except Exception as e:
+            logger.debug("Sequence %d failed", index, exc_info=True)
+            failed += 1
+            summary = {"name": entry.get('name', index), "status": "error",
+                       "error": f"{type(e).__name__}: {e}"}
+        finally:
+            for source in sources.values():
+                source.close()
+        print(json.dumps(summary), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
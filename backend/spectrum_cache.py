@@ -0,0 +1,262 @@
+# spectrum_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Any
+
+import numpy as np
+
+# (sha256 of the uploaded file, (height, width) or None for the decoded size, precision)
+SpectrumKey = Tuple[str, Optional[Tuple[int, int]], str]
+
+
+class SpectrumCache:
+    """
+    Content-addressed cache of decoded images and their shifted spectra.
+
+    Entries hold read-only (raw, fft) arrays that ImageModels share directly.
+    ImageModels using an entry hold a reference (acquire/release), and
+    referenced entries are never evicted. Unreferenced entries are evicted
+    least recently used first once the memory budget is exceeded. An optional
+    directory adds a .npy tier that survives restarts and is shared by worker
+    processes; it has its own budget, trimmed least recently used first by
+    file mtime.
+    """
+    _instance = None
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 1024 * 1024 * 1024):
+        self._max_bytes = max_bytes
+        self._max_disk_bytes = max_disk_bytes
+        self._disk_dir = None
+        self._entries: 'OrderedDict[SpectrumKey, Tuple[np.ndarray, np.ndarray]]' = OrderedDict()
+        self._refcounts: Dict[SpectrumKey, int] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self.set_disk_dir(disk_dir)
+
+    # Getter and setter methods
+    def get_max_bytes(self) -> int:
+        return self._max_bytes
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def get_max_disk_bytes(self) -> int:
+        return self._max_disk_bytes
+
+    def set_max_disk_bytes(self, max_disk_bytes: int) -> None:
+        """Budget for the .npy tier (0 disables the limit)."""
+        self._max_disk_bytes = max_disk_bytes
+        self._trim_disk()
+
+    def get_disk_dir(self) -> Optional[str]:
+        return self._disk_dir
+
+    def set_disk_dir(self, disk_dir: Optional[str]) -> None:
+        """Enable the on-disk .npy tier in disk_dir (None disables it)."""
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._disk_dir = disk_dir or None
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def make_key(digest: str, size: Optional[Tuple[int, int]], precision: str) -> SpectrumKey:
+        return (digest, tuple(size) if size is not None else None, precision)
+
+    # Public methods
+    def get(self, key: SpectrumKey) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(raw, fft) read-only arrays for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+
+        entry = self._load_from_disk(key)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            return self._insert(key, entry)
+
+    def put(self, key: SpectrumKey, raw: np.ndarray, fft: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Store arrays under key (frozen read-only) and return the cached pair."""
+        entry = (_freeze(raw), _freeze(fft))
+        with self._lock:
+            entry = self._insert(key, entry)
+        self._save_to_disk(key, entry)
+        return entry
+
+    def acquire(self, key: SpectrumKey) -> None:
+        """Pin key while an ImageModel shares its arrays."""
+        with self._lock:
+            self._refcounts[key] = self._refcounts.get(key, 0) + 1
+
+    def release(self, key: SpectrumKey) -> None:
+        with self._lock:
+            count = self._refcounts.get(key, 0) - 1
+            if count > 0:
+                self._refcounts[key] = count
+            else:
+                self._refcounts.pop(key, None)
+                self._evict()
+
+    def get_refcount(self, key: SpectrumKey) -> int:
+        with self._lock:
+            return self._refcounts.get(key, 0)
+
+    def clear(self) -> None:
+        """Drop unreferenced in-memory entries (the disk tier is kept)."""
+        with self._lock:
+            for key in [k for k in self._entries if k not in self._refcounts]:
+                self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+                "max_bytes": self._max_bytes,
+                "max_disk_bytes": self._max_disk_bytes,
+                "pinned": len(self._refcounts),
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+            }
+
+    # Private methods (called with the lock held unless noted)
+    def _insert(self, key, entry):
+        existing = self._entries.get(key)
+        if existing is not None:
+            self._entries.move_to_end(key)
+            return existing
+        self._entries[key] = entry
+        self._nbytes += entry[0].nbytes + entry[1].nbytes
+        self._evict()
+        return entry
+
+    def _drop(self, key) -> None:
+        raw, fft = self._entries.pop(key)
+        self._nbytes -= raw.nbytes + fft.nbytes
+
+    def _evict(self) -> None:
+        if self._nbytes <= self._max_bytes:
+            return
+        for key in list(self._entries):
+            if self._nbytes <= self._max_bytes:
+                break
+            if key not in self._refcounts:
+                self._drop(key)
+
+    def _disk_paths(self, key) -> Tuple[str, str]:
+        digest, size, precision = key
+        size_tag = f'{size[0]}x{size[1]}' if size is not None else 'orig'
+        base = os.path.join(self._disk_dir, f'{digest}_{size_tag}_{precision}')
+        return base + '.raw.npy', base + '.fft.npy'
+
+    def _load_from_disk(self, key):
+        """Read-only memory maps of the .npy pair (no lock needed)."""
+        if self._disk_dir is None:
+            return None
+        raw_path, fft_path = self._disk_paths(key)
+        try:
+            entry = (np.load(raw_path, mmap_mode='r').view(np.ndarray),
+                     np.load(fft_path, mmap_mode='r').view(np.ndarray))
+        except (FileNotFoundError, ValueError):
+            return None
+        # The mtime doubles as the last-use time for _trim_disk
+        for path in (raw_path, fft_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return entry
+
+    def _save_to_disk(self, key, entry) -> None:
+        """Write the .npy pair atomically (no lock needed)."""
+        if self._disk_dir is None:
+            return
+        written = False
+        for path, array in zip(self._disk_paths(key), entry):
+            if os.path.exists(path):
+                continue
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+            written = True
+        if written:
+            self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        """
+        Delete the least recently used .npy pairs until the directory fits
+        max_disk_bytes (no lock needed). Pairs of pinned keys are kept.
+        """
+        disk_dir, budget = self._disk_dir, self._max_disk_bytes
+        if disk_dir is None or not budget:
+            return
+        # base name -> (bytes, newest mtime, paths); '.raw.npy' and '.fft.npy' are both 8 chars
+        pairs: Dict[str, Tuple[int, float, list]] = {}
+        try:
+            files = list(os.scandir(disk_dir))
+        except OSError:
+            return
+        for f in files:
+            if not f.name.endswith(('.raw.npy', '.fft.npy')):
+                continue
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            size, mtime, paths = pairs.get(f.name[:-8], (0, 0.0, []))
+            pairs[f.name[:-8]] = (size + st.st_size, max(mtime, st.st_mtime), paths + [f.path])
+        total = sum(size for size, _, _ in pairs.values())
+        if total <= budget:
+            return
+        with self._lock:
+            pinned = {os.path.basename(self._disk_paths(key)[0])[:-8] for key in self._refcounts}
+        for base, (size, _, paths) in sorted(pairs.items(), key=lambda item: item[1][1]):
+            if total <= budget:
+                break
+            if base in pinned:
+                continue
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    @classmethod
+    def get_instance(cls) -> 'SpectrumCache':
+        """
+        Get the singleton instance of SpectrumCache.
+
+        Returns:
+            Singleton SpectrumCache instance
+        """
+        if cls._instance is None:
+            cls._instance = SpectrumCache()
+        return cls._instance
+
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    """Contiguous read-only version of array (a view if it already is)."""
+    array = np.ascontiguousarray(array)
+    if array.flags.writeable:
+        array = array.view()
+        array.flags.writeable = False
+    return array
@@ -0,0 +1,147 @@
+"""
+Shared application state for multi-process serving.
+
+Image slots, mixing status and the phased-array parameters live in
+process-local singletons. When the app runs under several worker
+processes (gunicorn/uvicorn), each of them publishes its changes to a
+StateStore and refreshes from it before reading, so any worker can serve
+any request. Caches (spectra, beam results) and metrics stay per process.
+"""
+import itertools
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+
+class StateStore:
+    """Key/value store with a cheap per-key version for change detection."""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> Any:
+        """Store value and return its new version."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def version(self, key: str) -> Optional[Any]:
+        """Opaque token that changes on every write; None if the key is absent."""
+        raise NotImplementedError
+
+    def get_versioned(self, key: str, default: Any = None):
+        """(value, version) read; version is None if the key is absent."""
+        return self.get(key, default), self.version(key)
+
+    def is_shared(self) -> bool:
+        """True if other processes see this store's writes."""
+        return False
+
+
+class MemoryStateStore(StateStore):
+    """In-process store; state is shared between threads only."""
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            version = self._versions[key] = next(self._counter)
+            return version
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._versions.pop(key, None)
+
+    def version(self, key):
+        with self._lock:
+            return self._versions.get(key)
+
+    def get_versioned(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default), self._versions.get(key)
+
+
+class FileStateStore(StateStore):
+    """
+    One pickle file per key in a local directory shared by all workers.
+
+    Writes go to a temporary file that is renamed into place, so readers
+    never see a partial value. The file's (mtime_ns, inode) pair is the
+    version, which costs a single stat() to check.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def get_directory(self) -> str:
+        return self._directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, f'{key}.pkl')
+
+    def get(self, key, default=None):
+        return self.get_versioned(key, default)[0]
+
+    def set(self, key, value):
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, prefix=f'.{key}.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                st = os.fstat(f.fileno())
+            # rename keeps the inode and mtime, so this is the published version
+            os.replace(tmp_path, self._path(key))
+            return (st.st_mtime_ns, st.st_ino)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def version(self, key):
+        try:
+            st = os.stat(self._path(key))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_ino)
+
+    def get_versioned(self, key, default=None):
+        try:
+            with open(self._path(key), 'rb') as f:
+                st = os.fstat(f.fileno())
+                return pickle.load(f), (st.st_mtime_ns, st.st_ino)
+        except (FileNotFoundError, EOFError):
+            return default, None
+
+    def is_shared(self):
+        return True
+
+
+def create_state_store(config) -> StateStore:
+    """Build the store named by config STATE_STORE ('memory' or 'file')."""
+    kind = str(config.get('STATE_STORE', 'memory')).lower()
+    if kind == 'memory':
+        return MemoryStateStore()
+    if kind == 'file':
+        directory = config.get('STATE_DIR') or os.path.join(tempfile.gettempdir(), 'moire-state')
+        return FileStateStore(directory)
+    raise ValueError(f"Unknown STATE_STORE '{kind}'. Use 'memory' or 'file'")
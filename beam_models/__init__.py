@@ -1,5 +1,7 @@
 from .phased_array import PhasedArray
 from .transmitter import Transmitter
 from .beam_viewer import BeamViewer
+from .beam_cache import BeamResultCache
+from .wave_animator import WaveAnimator
 
-__all__ = ['PhasedArray', 'Transmitter', 'BeamViewer']
\ No newline at end of file
+__all__ = ['PhasedArray', 'Transmitter', 'BeamViewer', 'BeamResultCache', 'WaveAnimator']
\ No newline at end of file
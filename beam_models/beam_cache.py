@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from numbers import Number
+
+import numpy as np
+
+
+class BeamResultCache:
+    """
+    Thread-safe LRU cache of computed beamforming results keyed on array state.
+    Bounded by entry count and by the estimated size of the cached payloads
+    (encoded images dominate), evicting least recently used entries first.
+    """
+    def __init__(self, max_entries=128, max_bytes=32 * 1024 * 1024):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        # key -> Future of the computation in progress (single-flight misses)
+        self._inflight = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def max_entries(self):
+        return self._max_entries
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return self._entries[key]
+
+    def put(self, key, value):
+        """Store value; one larger than the whole byte budget is not cached"""
+        size = _estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self._max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._nbytes += size
+            self._evict()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        Concurrent misses on the same key share one computation.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+                self._misses += 1
+            else:
+                self._hits += 1
+        if not owner:
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(e)
+            raise
+        self.put(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        pending.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "bytes": self._nbytes,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    # Private methods (called with the lock held)
+    def _drop(self, key):
+        del self._entries[key]
+        self._nbytes -= self._sizes.pop(key)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self._max_entries
+                                 or self._nbytes > self._max_bytes):
+            self._drop(next(iter(self._entries)))
+
+
+def _estimate_nbytes(value):
+    """Approximate memory held by a cached payload of strings, numbers, lists, dicts and arrays"""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        # Flat lists of numbers (profile samples) are sized without walking them
+        if value and isinstance(value[0], Number):
+            return 8 + 32 * len(value)
+        return 8 + sum(8 + _estimate_nbytes(v) for v in value)
+    return 32
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+def _to_db(values):
+    return 20 * np.log10(np.maximum(values, 1e-12))
+
+
+def _crossing(angles, response, lo, hi, threshold):
+    """Angle where response crosses threshold between samples lo and hi (linear interpolation)"""
+    r_lo, r_hi = response[lo], response[hi]
+    if r_hi == r_lo:
+        return angles[lo]
+    return angles[lo] + (threshold - r_lo) * (angles[hi] - angles[lo]) / (r_hi - r_lo)
+
+
+def analyze_beam_profile(angles, response, hemisphere='front', grating_threshold_db=-3.0):
+    """
+    Summarize a beam profile (as returned by calculate_beam_profile).
+
+    Angles are converted to degrees from broadside (+y), and with
+    hemisphere='front' only -90..90 degrees is analyzed, which excludes
+    the mirror lobe of planar and linear arrays. Peaks and nulls are found
+    with vectorized neighbour comparisons. Returns main-lobe direction, the
+    -3 dB beamwidth, peak sidelobe level (dB relative to the main lobe),
+    null directions, and lobes outside the main lobe within
+    grating_threshold_db of it (grating lobes).
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    response = np.asarray(response, dtype=np.float64)
+    signed = np.degrees(np.mod(angles + np.pi, 2 * np.pi) - np.pi)
+    if hemisphere == 'front':
+        keep = np.abs(signed) <= 90
+        signed, response = signed[keep], response[keep]
+    # linspace(0, 2*pi) repeats broadside at both ends; sort and drop the duplicate
+    signed, unique_index = np.unique(signed, return_index=True)
+    response = response[unique_index]
+
+    empty = {
+        'main_lobe_direction_deg': None, 'main_lobe_level_db': None, 'hpbw_deg': None,
+        'peak_sidelobe_level_db': None, 'peak_sidelobe_direction_deg': None,
+        'nulls_deg': [], 'grating_lobes': [], 'has_grating_lobes': False
+    }
+    # A flat (isotropic) pattern has no lobes to measure
+    if len(response) < 3 or np.ptp(response) < 1e-9:
+        return empty
+
+    padded = np.concatenate([[-np.inf], response, [-np.inf]])
+    peaks = np.flatnonzero((response > padded[:-2]) & (response >= padded[2:]))
+    padded = np.concatenate([[np.inf], response, [np.inf]])
+    nulls = np.flatnonzero((response < padded[:-2]) & (response <= padded[2:]))
+
+    main = int(np.argmax(response))
+    peak = response[main]
+
+    # -3 dB (half power) points on either side of the main lobe
+    threshold = peak / np.sqrt(2)
+    below = response < threshold
+    left = np.flatnonzero(below[:main])
+    right = np.flatnonzero(below[main:])
+    hpbw = None
+    if len(left) and len(right):
+        left_angle = _crossing(signed, response, left[-1], left[-1] + 1, threshold)
+        right_angle = _crossing(signed, response, main + right[0] - 1, main + right[0], threshold)
+        hpbw = float(right_angle - left_angle)
+
+    # Main lobe spans the nearest nulls around the peak; other peaks are sidelobes
+    left_null = nulls[nulls < main].max(initial=-1)
+    right_null = nulls[nulls > main].min(initial=len(response))
+    side = peaks[(peaks < left_null) | (peaks > right_null)]
+    side_db = _to_db(response[side] / peak)
+
+    psl = psl_direction = None
+    if len(side):
+        strongest = int(np.argmax(side_db))
+        psl = float(side_db[strongest])
+        psl_direction = float(signed[side[strongest]])
+
+    grating = side_db >= grating_threshold_db
+    return {
+        'main_lobe_direction_deg': float(signed[main]),
+        'main_lobe_level_db': float(_to_db(peak)),
+        'hpbw_deg': hpbw,
+        'peak_sidelobe_level_db': psl,
+        'peak_sidelobe_direction_deg': psl_direction,
+        'nulls_deg': signed[nulls].tolist(),
+        'grating_lobes': [
+            {'direction_deg': float(d), 'level_db': float(l)}
+            for d, l in zip(signed[side[grating]], side_db[grating])
+        ],
+        'has_grating_lobes': bool(grating.any())
+    }
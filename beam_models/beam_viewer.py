@@ -1,58 +1,145 @@
-from matplotlib import pyplot as plt
+import threading
 import numpy as np
 import base64
 import io
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
 import matplotlib
+import cv2
 
 matplotlib.use('Agg')
 
+WAVE_MAP_COLORS = [(1, 0, 0), (0, 0, 1), (1, 0, 0)]
+WAVE_MAP_EXTENT = [-20, 20, 0, 20]
+
 class BeamViewer:
     """Handles visualization of beam patterns and wave maps"""
     
-    def __init__(self):
-        self.figure_size = (10, 10)
+    def __init__(self, figure_size=(10, 10), profile_figure_size=(6, 6), dpi=100):
+        self.figure_size = figure_size
+        self.profile_figure_size = profile_figure_size
+        self.dpi = dpi
+        # Figures are built once and reused; Agg figures are not thread-safe
+        self._render_lock = threading.RLock()
+        self._wave_map_artists = None
+        self._beam_profile_artists = None
+        self._wave_map_cmap = matplotlib.colors.LinearSegmentedColormap.from_list(
+            'custom', WAVE_MAP_COLORS
+        )
+        # 256-entry BGR lookup table for the raster path (cv2 channel order)
+        rgb = self._wave_map_cmap(np.linspace(0, 1, 256))[:, :3]
+        self._wave_map_lut = np.round(rgb[:, ::-1] * 255).astype(np.uint8)
+
+    @property
+    def wave_map_lut(self):
+        """256-entry BGR lookup table of the wave-map colormap"""
+        return self._wave_map_lut
+
+    def set_output_size(self, figure_size=None, profile_figure_size=None, dpi=None):
+        """Change figure sizes (inches) and/or DPI; the affected figures are rebuilt lazily"""
+        with self._render_lock:
+            if figure_size is not None:
+                self.figure_size = tuple(figure_size)
+                self._wave_map_artists = None
+            if profile_figure_size is not None:
+                self.profile_figure_size = tuple(profile_figure_size)
+                self._beam_profile_artists = None
+            if dpi is not None:
+                self.dpi = dpi
+                self._wave_map_artists = None
+                self._beam_profile_artists = None
 
     def _figure_to_base64(self, fig):
         """Convert a Matplotlib figure to base64-encoded PNG"""
         buf = io.BytesIO()
         FigureCanvas(fig).print_png(buf)
         encoded = base64.b64encode(buf.getbuffer()).decode("ascii")
-        return f"data:image/png;base64,{encoded}"    
+        return f"data:image/png;base64,{encoded}"
+
+    def _array_to_base64(self, image, image_format='png'):
+        """Encode a BGR uint8 array with cv2 as a base64 data URI"""
+        if image_format == 'webp':
+            ok, buffer = cv2.imencode('.webp', image, [cv2.IMWRITE_WEBP_QUALITY, 90])
+        else:
+            image_format = 'png'
+            ok, buffer = cv2.imencode('.png', image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        if not ok:
+            raise ValueError(f"Could not encode image as {image_format}")
+        encoded = base64.b64encode(buffer).decode("ascii")
+        return f"data:image/{image_format};base64,{encoded}"
+
+    def apply_wave_map_colormap(self, wave_map):
+        """Map a wave map to BGR pixels with the precomputed colormap LUT"""
+        wave_map = np.asarray(wave_map)
+        min_val = wave_map.min()
+        span = wave_map.max() - min_val
+        scale = 255.0 / span if span != 0 else 0.0
+        indices = ((wave_map - min_val) * scale).astype(np.uint8)
+        # imshow(origin='lower') puts row 0 at the bottom
+        return self._wave_map_lut[indices[::-1]]
+
+    def generate_wave_map_raster(self, wave_map, image_format='png'):
+        """
+        Fast path: colormapped wave map pixels only, without axes or colorbar.
+
+        The frontend is expected to draw axes for the wave map's extent.
+        """
+        return self._array_to_base64(self.apply_wave_map_colormap(wave_map), image_format)
     
-    def generate_wave_map_image(self, wave_map):
+    def generate_beam_pattern_2d_raster(self, pattern, image_format='png'):
+        """Azimuth x elevation pattern as a viridis raster, elevation increasing upwards"""
+        indices = np.clip(np.asarray(pattern) * 255, 0, 255).astype(np.uint8)
+        image = cv2.applyColorMap(indices[::-1], cv2.COLORMAP_VIRIDIS)
+        return self._array_to_base64(image, image_format)
+
+    def generate_wave_map_image(self, wave_map, extent=None):
         """Generate base64 encoded image of wave map"""
-        fig = Figure(figsize=self.figure_size, facecolor='#1E293B')
+        with self._render_lock:
+            if self._wave_map_artists is None:
+                self._wave_map_artists = self._build_wave_map_figure(wave_map)
+            fig, im = self._wave_map_artists
+            im.set_data(wave_map)
+            im.set_clim(np.min(wave_map), np.max(wave_map))
+            im.set_extent(list(extent or WAVE_MAP_EXTENT))
+            
+            # Convert to base64
+            return self._figure_to_base64(fig)
+    
+    def generate_beam_profile_image(self, angles, response):
+        """Generate base64 encoded image of beam profile"""
+        with self._render_lock:
+            if self._beam_profile_artists is None:
+                self._beam_profile_artists = self._build_beam_profile_figure()
+            fig, line = self._beam_profile_artists
+            line.set_data(angles, response)
+            
+             # Convert to base64
+            return self._figure_to_base64(fig)
+
+    def _build_wave_map_figure(self, wave_map):
+        """Create the persistent wave map figure; later calls only swap the data"""
+        fig = Figure(figsize=self.figure_size, dpi=self.dpi, facecolor='#1E293B')
         ax = fig.add_subplot(111)
         
-        # Create colormap similar to original
-        cmap = matplotlib.colors.LinearSegmentedColormap.from_list(
-            'custom', [(1, 0, 0), (0, 0, 1), (1, 0, 0)]
-        )
-        
-        im = ax.imshow(wave_map, cmap=cmap, aspect='auto', 
-                      extent=[-20, 20, 0, 20], origin='lower')
+        im = ax.imshow(wave_map, cmap=self._wave_map_cmap, aspect='auto', 
+                      extent=WAVE_MAP_EXTENT, origin='lower')
         ax.set_xlabel('X Position', color='white')
         ax.set_ylabel('Y Position', color='white')
         ax.tick_params(colors='white')
         ax.set_facecolor('#1E293B')
         
-        # Add colorbar
+        # Add colorbar (labelcolor also applies to ticks created on later redraws)
         cbar = fig.colorbar(im, ax=ax)
-        cbar.ax.yaxis.set_tick_params(color='white')
+        cbar.ax.yaxis.set_tick_params(color='white', labelcolor='white')
         cbar.outline.set_edgecolor('white')
-        plt.setp(cbar.ax.get_yticklabels(), color='white')
-        
-        # Convert to base64
-        return self._figure_to_base64(fig)
-    
-    def generate_beam_profile_image(self, angles, response):
-        """Generate base64 encoded image of beam profile"""
-        fig = Figure(figsize=(6, 6), facecolor='#1E293B')
+        return fig, im
+
+    def _build_beam_profile_figure(self):
+        """Create the persistent polar beam profile figure"""
+        fig = Figure(figsize=self.profile_figure_size, dpi=self.dpi, facecolor='#1E293B')
         ax = fig.add_subplot(111, polar=True)
         
-        ax.plot(angles, response, color='b', linewidth=2)
+        line, = ax.plot([], [], color='b', linewidth=2)
         ax.set_theta_zero_location("N")
         ax.set_theta_direction(-1) #clockwise
         ax.set_rticks([])
@@ -60,6 +147,4 @@ class BeamViewer:
         ax.set_facecolor('#1E293B')
         ax.tick_params(colors='white')
         ax.grid(color='gray', alpha=0.3)
-        
-         # Convert to base64
-        return self._figure_to_base64(fig)
\ No newline at end of file
+        return fig, line
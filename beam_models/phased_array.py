@@ -1,6 +1,25 @@
+import os
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List
 from .transmitter import Transmitter
+from .beam_metrics import analyze_beam_profile
+
+# Shared worker pool for vectorized batch computations; NumPy releases the GIL
+# inside exp/matmul so threads scale across cores without copying arrays.
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            # Concurrent first requests must not each create (and leak) a pool
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _executor
 
 # =========================================================
 # Geometry Strategy (Abstraction)
@@ -10,6 +29,22 @@ class GeometryStrategy:
     def calculate_positions(self, transmitters, distance, radius):
         raise NotImplementedError("Must be implemented by subclass")
 
+    def position_arrays(self, count, distance, radius):
+        """Element positions for a hypothetical array, without touching a PhasedArray"""
+        transmitters = [Transmitter() for _ in range(count)]
+        self.calculate_positions(transmitters, distance, radius)
+        return _position_arrays(transmitters)
+
+    def element_phases(self, x_positions, y_positions, z_positions, distance,
+                       phase_shift, elevation_phase_shift=0.0):
+        """Progressive steering phases: element i gets i * phase_shift"""
+        return np.arange(len(x_positions)) * phase_shift
+
+    def calculate_array_factor(self, x_positions, y_positions, phases, k, angles):
+        """Far-field array factor magnitude by direct summation over elements"""
+        delta_r = np.outer(np.sin(angles), x_positions) + np.outer(np.cos(angles), y_positions)
+        return np.abs(np.exp(1j * (k * delta_r - phases)).sum(axis=1))
+
 # =========================================================
 # Linear Geometry
 # =========================================================
@@ -21,6 +56,26 @@ class LinearGeometry(GeometryStrategy):
         for i, t in enumerate(transmitters):
             t.x_position = start_x + i * distance
             t.y_position = 0.0
+            t.z_position = 0.0
+
+    def calculate_array_factor(self, x_positions, y_positions, phases, k, angles):
+        """
+        Far-field array factor of a uniform linear array via FFT.
+
+        With equally spaced elements the array factor is the DFT of the
+        element weights evaluated at u = k * d * sin(theta), so the weights
+        are zero-padded to the angular resolution and the spectrum is
+        sampled at each angle's spatial frequency.
+        """
+        n = len(x_positions)
+        if n < 2:
+            return super().calculate_array_factor(x_positions, y_positions, phases, k, angles)
+        spacing = x_positions[1] - x_positions[0]
+        nfft = 1 << int(np.ceil(np.log2(max(len(angles), 128 * n))))
+        spectrum = np.abs(np.fft.fft(np.exp(-1j * phases), nfft))
+        # Bin m holds u = -2*pi*m / nfft; wrap the spectrum for periodic interpolation
+        bins = np.mod(-k * spacing * np.sin(angles) * nfft / (2 * np.pi), nfft)
+        return np.interp(bins, np.arange(nfft + 1), np.append(spectrum, spectrum[0]))
 
 # =========================================================
 # Curvilinear Geometry
@@ -32,6 +87,7 @@ class CurvilinearGeometry(GeometryStrategy):
         if n == 1:
             transmitters[0].x_position = 0
             transmitters[0].y_position = radius
+            transmitters[0].z_position = 0.0
             return
         delta_theta = distance / radius
         total_angle = delta_theta * (n - 1)
@@ -39,17 +95,123 @@ class CurvilinearGeometry(GeometryStrategy):
         for i, t in enumerate(transmitters):
             t.x_position = radius * np.cos(angles[i])
             t.y_position = radius * np.sin(angles[i]) + radius
+            t.z_position = 0.0
+
+# =========================================================
+# Planar Geometries (panel in the x-z plane, facing +y)
+# =========================================================
+class PlanarGeometry(GeometryStrategy):
+    """Base for 2D panels; steering phases follow the element's column and row"""
+    def element_phases(self, x_positions, y_positions, z_positions, distance,
+                       phase_shift, elevation_phase_shift=0.0):
+        if distance == 0:
+            return super().element_phases(x_positions, y_positions, z_positions, distance, phase_shift)
+        columns = (x_positions - x_positions.min()) / distance
+        rows = (z_positions - z_positions.min()) / distance
+        return columns * phase_shift + rows * elevation_phase_shift
+
+
+class RectangularPlanarGeometry(PlanarGeometry):
+    """Near-square grid of elements, filled row by row"""
+    def calculate_positions(self, transmitters, distance, radius):
+        n = len(transmitters)
+        columns = int(np.ceil(np.sqrt(n)))
+        rows = int(np.ceil(n / columns))
+        for i, t in enumerate(transmitters):
+            row, column = divmod(i, columns)
+            t.x_position = (column - (columns - 1) / 2) * distance
+            t.y_position = 0.0
+            t.z_position = (row - (rows - 1) / 2) * distance
+
+
+class CircularPlanarGeometry(PlanarGeometry):
+    """Center element plus concentric rings spaced by distance"""
+    def calculate_positions(self, transmitters, distance, radius):
+        n = len(transmitters)
+        placed = 0
+        ring = 0
+        while placed < n:
+            # Ring m holds about 2*pi*m elements so arc spacing stays near distance
+            capacity = 1 if ring == 0 else int(2 * np.pi * ring)
+            count = min(capacity, n - placed)
+            angles = 2 * np.pi * np.arange(count) / count
+            for angle, t in zip(angles, transmitters[placed:placed + count]):
+                t.x_position = ring * distance * np.cos(angle)
+                t.y_position = 0.0
+                t.z_position = ring * distance * np.sin(angle)
+            placed += count
+            ring += 1
+
+
+def _position_arrays(transmitters):
+    x_positions = np.array([t.x_position for t in transmitters], dtype=np.float64)
+    y_positions = np.array([t.y_position for t in transmitters], dtype=np.float64)
+    z_positions = np.array([t.z_position for t in transmitters], dtype=np.float64)
+    return x_positions, y_positions, z_positions
+
+
+GEOMETRY_STRATEGIES = {
+    "Linear": LinearGeometry,
+    "Curvilinear": CurvilinearGeometry,
+    "RectangularPlanar": RectangularPlanarGeometry,
+    "CircularPlanar": CircularPlanarGeometry,
+}
+
+# =========================================================
+# Near-field focusing
+# =========================================================
+def parse_focal_point(point):
+    """
+    (x, y, z) floats from an (x, y) or (x, y, z) sequence, or None for None.
+
+    Raises:
+        ValueError: If point is not 2 or 3 finite numbers
+    """
+    if point is None:
+        return None
+    if isinstance(point, (str, bytes, dict)):
+        raise ValueError(f"Focal point must be (x, y) or (x, y, z), got {point!r}")
+    try:
+        point = tuple(float(v) for v in point)
+    except TypeError:
+        raise ValueError(f"Focal point must be (x, y) or (x, y, z), got {point!r}")
+    if len(point) not in (2, 3):
+        raise ValueError(f"Focal point must have 2 or 3 coordinates, got {len(point)}")
+    if not all(np.isfinite(point)):
+        raise ValueError("Focal point coordinates must be finite")
+    return point if len(point) == 3 else (point[0], point[1], 0.0)
+
+@lru_cache(maxsize=256)
+def focal_delay_table(strategy_cls, count, distance, radius, focal_point):
+    """
+    Per-element path-length delays that bring every element's wave into
+    phase at focal_point: max(r) - r_i. They depend only on geometry, so
+    they are cached per (geometry, focal point) and scaled by k for any
+    frequency. The returned array is read-only because it is shared.
+    """
+    x_positions, y_positions, z_positions = strategy_cls().position_arrays(count, distance, radius)
+    fx, fy, fz = focal_point
+    ranges = np.sqrt((x_positions - fx) ** 2 + (y_positions - fy) ** 2 + (z_positions - fz) ** 2)
+    delays = ranges.max() - ranges
+    delays.flags.writeable = False
+    return delays
 
 # =========================================================
 # Phased Array with Properties
 # =========================================================
 class PhasedArray:
     """Manages transmitters, geometry, beamforming, wave calculations"""
+    # Samples per wave-map tile: 32768 float64 values keep each tile's
+    # accumulator and scratch buffer resident in L2 cache
+    TILE_ELEMENTS = 32768
+
     def __init__(self, geometry_strategy=None):
         self._geometry_strategy = geometry_strategy or LinearGeometry()
         self._transmitters: List[Transmitter] = [Transmitter()]
         self._current_frequency = 1.0
         self._phase_shift = 0.0
+        self._elevation_phase_shift = 0.0
+        self._focal_point = None
         self._distance = 1.0
         self._radius = 5.0
 
@@ -73,6 +235,13 @@ class PhasedArray:
         self._geometry_strategy = strategy
         self.update_positions()
 
+    @property
+    def geometry_name(self):
+        for name, strategy_cls in GEOMETRY_STRATEGIES.items():
+            if type(self._geometry_strategy) is strategy_cls:
+                return name
+        return self._geometry_strategy.__class__.__name__
+
     @property
     def transmitters(self):
         return self._transmitters
@@ -91,8 +260,28 @@ class PhasedArray:
 
     @phase_shift.setter
     def phase_shift(self, value):
+        # Choosing a linear progression switches steering back from focusing
+        if value != self._phase_shift:
+            self._focal_point = None
         self._phase_shift = value
 
+    @property
+    def focal_point(self):
+        return self._focal_point
+
+    @focal_point.setter
+    def focal_point(self, point):
+        """(x, y) or (x, y, z) to focus on, or None for linear phase steering"""
+        self._focal_point = parse_focal_point(point)
+
+    @property
+    def elevation_phase_shift(self):
+        return self._elevation_phase_shift
+
+    @elevation_phase_shift.setter
+    def elevation_phase_shift(self, value):
+        self._elevation_phase_shift = value
+
     @property
     def distance(self):
         return self._distance
@@ -125,6 +314,24 @@ class PhasedArray:
             self._radius
         )
 
+    def get_position_arrays(self):
+        return _position_arrays(self._transmitters)
+
+    def get_element_phases(self):
+        if self._focal_point is not None:
+            return self.calculate_wave_number() * self.get_focal_delays()
+        return self._geometry_strategy.element_phases(
+            *self.get_position_arrays(), self._distance,
+            self._phase_shift, self._elevation_phase_shift
+        )
+
+    def get_focal_delays(self):
+        """Cached focusing delays (path length) for the current geometry and focal point"""
+        return focal_delay_table(
+            type(self._geometry_strategy), len(self._transmitters),
+            float(self._distance), float(self._radius), self._focal_point
+        )
+
     # -------------------------------
     # Transmitter Management
     # -------------------------------
@@ -137,48 +344,296 @@ class PhasedArray:
             self._transmitters.pop()
             self.update_positions()
 
+    def set_transmitter_count(self, count):
+        count = max(1, int(count))
+        while len(self._transmitters) < count:
+            self._transmitters.append(Transmitter())
+        del self._transmitters[count:]
+        self.update_positions()
+
+    def configure(self, geometry=None, transmitter_count=None, frequency=None,
+                  phase_shift=None, distance=None, radius=None, elevation_phase_shift=None):
+        """Apply a full (or partial) parameter set, recomputing positions once"""
+        if geometry is not None and geometry != self.geometry_name:
+            self._geometry_strategy = GEOMETRY_STRATEGIES.get(geometry, CurvilinearGeometry)()
+        if frequency is not None:
+            self._current_frequency = float(frequency)
+        if phase_shift is not None:
+            self.phase_shift = float(phase_shift)
+        if elevation_phase_shift is not None:
+            self._elevation_phase_shift = float(elevation_phase_shift)
+        if distance is not None:
+            self._distance = float(distance)
+        if radius is not None:
+            self._radius = float(radius)
+        if transmitter_count is not None:
+            self.set_transmitter_count(transmitter_count)
+        else:
+            self.update_positions()
+
     # -------------------------------
     # Wave Physics
     # -------------------------------
     def calculate_wave_number(self):
         return 2 * np.pi * self._current_frequency
 
-    def generate_wave_map(self):
-        x = np.linspace(-self._current_x_range, self._current_x_range, self._x_grid_size)
-        y = np.linspace(0, self._current_y_range, self._y_grid_size)
-        X, Y = np.meshgrid(x, y)
-        amplitude = np.zeros_like(X)
-        k = self.calculate_wave_number()
-        for i, t in enumerate(self._transmitters):
-            r = np.sqrt((X - t.x_position) ** 2 + (Y - t.y_position) ** 2)
-            amplitude += np.sin(k * r + i * self._phase_shift)
-        amplitude -= amplitude.min()
-        max_val = amplitude.max()
-        if max_val != 0:
-            amplitude /= max_val
+    def get_default_viewport(self):
+        """Full simulation area as (x_min, x_max, y_min, y_max)"""
+        return (-self._current_x_range, self._current_x_range, 0, self._current_y_range)
+
+    def generate_wave_map(self, grid_size=None, viewport=None, z_plane=0.0):
+        """
+        Normalized interference pattern over a viewport.
+
+        grid_size is (width, height) in samples and viewport is
+        (x_min, x_max, y_min, y_max); both default to the full 800x800 area,
+        so clients can request just the zoomed region at their display density.
+        z_plane selects the x-y cross-section for arrays with z extent.
+        The grid is evaluated in row tiles on the shared thread pool, each tile
+        accumulating in place through one reusable scratch buffer.
+        """
+        grid = self._wave_grid(grid_size, viewport, z_plane)
+        amplitude = np.empty(grid["shape"])
+
+        def run(rows):
+            out = amplitude[rows]
+            out.fill(0)
+            buf = np.empty_like(out)
+            for _ in self._phase_terms(grid, rows, buf):
+                np.sin(buf, out=buf)
+                out += buf
+            return out.min(), out.max()
+
+        extrema = self._map_tiles(run, grid["tiles"])
+        min_val = min(lo for lo, _ in extrema)
+        max_val = max(hi for _, hi in extrema) - min_val
+
+        def normalize(rows):
+            out = amplitude[rows]
+            out -= min_val
+            if max_val != 0:
+                out /= max_val
+
+        self._map_tiles(normalize, grid["tiles"])
         self._wave_map = amplitude
         return amplitude
 
+    def generate_wave_field(self, grid_size=None, viewport=None, z_plane=0.0):
+        """
+        Complex field sum(-j * exp(j * (k * r + phase))) over a viewport.
+
+        Re(field * exp(-j * w * t)) is the un-normalized wave map at time t,
+        so animation frames need only this precomputed field.
+        """
+        grid = self._wave_grid(grid_size, viewport, z_plane)
+        field = np.empty(grid["shape"], dtype=np.complex128)
+
+        def run(rows):
+            real = np.zeros(field[rows].shape)
+            imag = np.zeros_like(real)
+            buf = np.empty_like(real)
+            scratch = np.empty_like(real)
+            for _ in self._phase_terms(grid, rows, buf):
+                real += np.sin(buf, out=scratch)
+                imag -= np.cos(buf, out=scratch)
+            field[rows].real = real
+            field[rows].imag = imag
+
+        self._map_tiles(run, grid["tiles"])
+        return field
+
+    def _wave_grid(self, grid_size, viewport, z_plane=0.0):
+        """Sample axes, row tiles and per-element terms shared by the field engines"""
+        width, height = grid_size or (self._x_grid_size, self._y_grid_size)
+        width, height = int(width), int(height)
+        x_min, x_max, y_min, y_max = viewport or self.get_default_viewport()
+        x = np.linspace(x_min, x_max, width)
+        y = np.linspace(y_min, y_max, height)
+        x_positions, y_positions, z_positions = self.get_position_arrays()
+        tile_rows = max(1, self.TILE_ELEMENTS // width)
+        return {
+            "shape": (height, width),
+            "y": y,
+            "tiles": [slice(start, min(start + tile_rows, height)) for start in range(0, height, tile_rows)],
+            # Row-independent squared x (and constant z) offsets, one row per transmitter
+            "dx2": (x[None, :] - x_positions[:, None]) ** 2 + ((z_plane - z_positions) ** 2)[:, None],
+            "y_positions": y_positions,
+            "k": self.calculate_wave_number(),
+            "phases": self.get_element_phases(),
+        }
+
+    @staticmethod
+    def _phase_terms(grid, rows, buf):
+        """Fill buf with k * r + phase for each element in turn over a row tile"""
+        y = grid["y"][rows]
+        for i, y_position in enumerate(grid["y_positions"]):
+            np.add(((y - y_position) ** 2)[:, None], grid["dx2"][i], out=buf)
+            np.sqrt(buf, out=buf)
+            buf *= grid["k"]
+            buf += grid["phases"][i]
+            yield i
+
+    @staticmethod
+    def _map_tiles(func, tiles):
+        if len(tiles) == 1:
+            return [func(tiles[0])]
+        return list(get_executor().map(func, tiles))
+
+    def calculate_field_intensity(self, points, max_chunk_values=4_000_000):
+        """
+        Normalized intensity |sum(exp(j * (k * r + phase)))|^2 / n^2 at points.
+
+        points is (P, 2) or (P, 3); 1.0 means every element arrives in phase.
+        Evaluated as chunked (points x elements) range matrices on the shared pool.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        if points.shape[1] == 2:
+            points = np.column_stack([points, np.zeros(len(points))])
+        positions = np.stack(self.get_position_arrays(), axis=1)
+        k = self.calculate_wave_number()
+        weights = np.exp(1j * self.get_element_phases())
+        intensity = np.empty(len(points))
+        chunk = max(1, int(max_chunk_values // len(positions)))
+
+        def run(rows):
+            offsets = points[rows, None, :] - positions[None, :, :]
+            ranges = np.sqrt(np.einsum('pnc,pnc->pn', offsets, offsets))
+            intensity[rows] = np.abs(np.exp(1j * k * ranges) @ weights) ** 2
+
+        self._map_tiles(run, [slice(i, i + chunk) for i in range(0, len(points), chunk)])
+        return intensity / len(positions) ** 2
+
+    def calculate_focal_profiles(self, half_length=5.0, samples=201):
+        """
+        Intensity at the focal point and along lateral (x) and axial (y) lines
+        through it. Requires a focal point.
+        """
+        if self._focal_point is None:
+            raise ValueError("No focal point set")
+        fx, fy, fz = self._focal_point
+        offsets = np.linspace(-half_length, half_length, samples)
+        lateral = np.column_stack([fx + offsets, np.full(samples, fy), np.full(samples, fz)])
+        axial = np.column_stack([np.full(samples, fx), fy + offsets, np.full(samples, fz)])
+        intensity = self.calculate_field_intensity(np.vstack([[self._focal_point], lateral, axial]))
+        return {
+            "focal_point": list(self._focal_point),
+            "focus_intensity": float(intensity[0]),
+            "offsets": offsets.tolist(),
+            "lateral": intensity[1:samples + 1].tolist(),
+            "axial": intensity[samples + 1:].tolist(),
+        }
+
     # -------------------------------
     # Beam Profile
     # -------------------------------
-    def calculate_beam_profile(self):
-        angles = np.linspace(0, 2 * np.pi, 1000)
+    def calculate_beam_profile(self, num_angles=1000):
+        angles = np.linspace(0, 2 * np.pi, num_angles)
         k = self.calculate_wave_number()
-        response = []
-        for theta in angles:
-            phases = []
-            for i, t in enumerate(self._transmitters):
-                delta_r = t.x_position * np.sin(theta) + t.y_position * np.cos(theta)
-                phases.append(k * delta_r - i * self._phase_shift)
-            array_response = np.sum(np.exp(1j * np.array(phases)))
-            response.append(abs(array_response))
-        response = np.array(response)
+        x_positions, y_positions, _ = self.get_position_arrays()
+        response = self._geometry_strategy.calculate_array_factor(
+            x_positions, y_positions, self.get_element_phases(), k, angles
+        )
         max_resp = response.max()
         if max_resp != 0:
             response /= max_resp
         return angles.tolist(), response.tolist()
 
+    def calculate_beam_metrics(self, num_angles=1000):
+        """Main lobe, beamwidth, sidelobe, null and grating-lobe summary of the beam profile"""
+        return analyze_beam_profile(*self.calculate_beam_profile(num_angles))
+
+    def calculate_beam_pattern_2d(self, azimuth_count=181, elevation_count=91,
+                                  max_chunk_values=4_000_000):
+        """
+        Normalized array factor over azimuth x elevation in the front hemisphere.
+
+        Azimuth is measured from broadside (+y) towards +x, elevation towards
+        +z, so the elevation-0 row is the beam profile cut. Direction cosines
+        are projected onto all element positions with one matmul per chunk of
+        directions and summed against the element weights with a second one,
+        so thousands of elements stay bounded in memory. Returns
+        (azimuths, elevations, pattern) with pattern shaped (elevations, azimuths).
+        """
+        azimuths = np.linspace(-np.pi / 2, np.pi / 2, azimuth_count)
+        elevations = np.linspace(-np.pi / 2, np.pi / 2, elevation_count)
+        az, el = np.meshgrid(azimuths, elevations)
+        directions = np.stack(
+            [np.cos(el) * np.sin(az), np.cos(el) * np.cos(az), np.sin(el)], axis=-1
+        ).reshape(-1, 3)
+
+        positions = np.stack(self.get_position_arrays(), axis=1)  # (elements, 3)
+        weights = np.exp(-1j * self.get_element_phases())
+        k = self.calculate_wave_number()
+        pattern = np.empty(len(directions))
+        chunk = max(1, int(max_chunk_values // len(positions)))
+
+        def run(rows):
+            path = k * (directions[rows] @ positions.T)  # (directions, elements)
+            pattern[rows] = np.abs(np.exp(1j * path) @ weights)
+
+        self._map_tiles(run, [slice(i, i + chunk) for i in range(0, len(directions), chunk)])
+        peak = pattern.max()
+        if peak != 0:
+            pattern /= peak
+        return azimuths, elevations, pattern.reshape(elevation_count, azimuth_count)
+
+    def calculate_beam_profile_sweep(self, frequencies, phase_shifts, distances,
+                                     num_angles=1000, max_chunk_values=4_000_000):
+        """
+        Beam profiles over a frequency x phase shift x distance grid.
+
+        For each (distance, frequency chunk, phase shift chunk) the steering
+        terms form a (frequency, angle, element) tensor that is multiplied by
+        the (element, phase shift) weight matrix in one complex matmul. Both
+        tensors stay within max_chunk_values per task. Chunks run on the
+        shared thread pool. Returns (angles, responses) where responses
+        has shape (frequencies, phase_shifts, distances, angles) as float32,
+        each profile normalized to a peak of 1 like calculate_beam_profile.
+        """
+        frequencies = np.atleast_1d(np.asarray(frequencies, dtype=np.float64))
+        phase_shifts = np.atleast_1d(np.asarray(phase_shifts, dtype=np.float64))
+        distances = np.atleast_1d(np.asarray(distances, dtype=np.float64))
+        angles = np.linspace(0, 2 * np.pi, num_angles)
+        n = len(self._transmitters)
+
+        responses = np.empty(
+            (len(frequencies), len(phase_shifts), len(distances), num_angles), dtype=np.float32
+        )
+        wave_numbers = 2 * np.pi * frequencies
+        phase_chunk = max(1, min(len(phase_shifts), max_chunk_values // num_angles))
+        chunk = max(1, int(max_chunk_values // (num_angles * max(n, phase_chunk))))
+        sin_a, cos_a = np.sin(angles), np.cos(angles)
+
+        def run(d_index, f_slice, p_slice):
+            x_positions, y_positions, z_positions = self._geometry_strategy.position_arrays(
+                n, distances[d_index], self._radius
+            )
+            # Steering phases are linear in phase_shift, so unit-shift phases scale per column
+            unit_phases = self._geometry_strategy.element_phases(
+                x_positions, y_positions, z_positions, distances[d_index], 1.0
+            )
+            weights = np.exp(-1j * np.outer(unit_phases, phase_shifts[p_slice]))  # (elements, phases)
+            delta_r = np.outer(sin_a, x_positions) + np.outer(cos_a, y_positions)
+            steering = np.exp(1j * wave_numbers[f_slice, None, None] * delta_r)
+            profiles = np.abs(steering @ weights)  # (freqs, angles, phases)
+            peaks = profiles.max(axis=1, keepdims=True)
+            np.divide(profiles, peaks, out=profiles, where=peaks != 0)
+            responses[f_slice, p_slice, d_index, :] = profiles.transpose(0, 2, 1)
+
+        tasks = [
+            (d, slice(f, min(f + chunk, len(frequencies))),
+             slice(p, min(p + phase_chunk, len(phase_shifts))))
+            for d in range(len(distances))
+            for f in range(0, len(frequencies), chunk)
+            for p in range(0, len(phase_shifts), phase_chunk)
+        ]
+        if len(tasks) == 1:
+            run(*tasks[0])
+        else:
+            for future in [get_executor().submit(run, *task) for task in tasks]:
+                future.result()
+        return angles, responses
+
     # -------------------------------
     # Utilities
     # -------------------------------
@@ -186,12 +641,53 @@ class PhasedArray:
         return {
             "current_frequency": self._current_frequency,
             "phase_shift": self._phase_shift,
+            "elevation_phase_shift": self._elevation_phase_shift,
+            "focal_point": list(self._focal_point) if self._focal_point else None,
             "distance": self._distance,
             "radius": self._radius,
-            "geometry": self._geometry_strategy.__class__.__name__,
+            "geometry": self.geometry_name,
             "transmitter_count": len(self._transmitters),
             "transmitters": [t.to_dict() for t in self._transmitters]
         }
 
+    def get_parameters(self):
+        """Plain-data parameter set, enough to rebuild the array with set_parameters()"""
+        return {
+            "geometry": self.geometry_name,
+            "transmitter_count": len(self._transmitters),
+            "frequency": self._current_frequency,
+            "phase_shift": self._phase_shift,
+            "distance": self._distance,
+            "radius": self._radius,
+            "elevation_phase_shift": self._elevation_phase_shift,
+            "focal_point": self._focal_point
+        }
+
+    def set_parameters(self, params):
+        """Apply a get_parameters() dict; the focus is set after the phase shift"""
+        params = dict(params)
+        focal_point = params.pop("focal_point", None)
+        self.configure(**params)
+        self.focal_point = focal_point
+
+    def clone(self):
+        """Independent copy with the same geometry and parameters"""
+        copy = PhasedArray(type(self._geometry_strategy)())
+        copy.set_parameters(self.get_parameters())
+        return copy
+
+    def get_state_key(self):
+        """Hashable key of everything the wave map and beam profile depend on"""
+        return (
+            self.geometry_name,
+            len(self._transmitters),
+            float(self._current_frequency),
+            float(self._phase_shift),
+            float(self._distance),
+            float(self._radius),
+            float(self._elevation_phase_shift),
+            self._focal_point,
+        )
+
     def get_transmitter_positions(self):
         return [t.to_dict() for t in self._transmitters]
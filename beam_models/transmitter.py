@@ -1,8 +1,9 @@
 class Transmitter:
     """Represents a single transmitter in the phased array"""
-    def __init__(self, x_position=0, y_position=0, frequency=1, phase_shift=0):
+    def __init__(self, x_position=0, y_position=0, frequency=1, phase_shift=0, z_position=0):
         self.x_position = x_position
         self.y_position = y_position
+        self.z_position = z_position
         self.frequency = frequency
         self.phase_shift = phase_shift
 
@@ -10,6 +11,7 @@ class Transmitter:
         return {
             'x_position': self.x_position,
             'y_position': self.y_position,
+            'z_position': self.z_position,
             'frequency': self.frequency,
             'phase_shift': self.phase_shift
         }
@@ -20,5 +22,6 @@ class Transmitter:
             x_position=data.get('x_position', 0),
             y_position=data.get('y_position', 0),
             frequency=data.get('frequency', 1),
-            phase_shift=data.get('phase_shift', 0)
+            phase_shift=data.get('phase_shift', 0),
+            z_position=data.get('z_position', 0)
         )
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+import cv2
+
+
+class WaveAnimator:
+    """
+    Renders wave propagation frames from a precomputed complex field.
+
+    Each frame is Re(field * exp(-j * phase)) = real * cos(phase) + imag * sin(phase),
+    mapped through a colormap LUT and encoded. Frames repeat after one wave
+    period, so the encoded frames of a period are cached and replayed when the
+    period has at most MAX_CACHED_FRAMES frames.
+    """
+    MAX_CACHED_FRAMES = 240
+
+    def __init__(self, field, colormap_lut, fps=30, periods_per_second=1.0, image_format='jpg'):
+        # imshow(origin='lower') puts row 0 at the bottom, like the static wave map
+        field = field[::-1]
+        self._real = np.ascontiguousarray(field.real, dtype=np.float32)
+        self._imag = np.ascontiguousarray(field.imag, dtype=np.float32)
+        peak = float(np.abs(field).max())
+        # Fixed scale over the whole period so frames do not flicker
+        self._scale = 127.5 / peak if peak != 0 else 0.0
+        self._lut = colormap_lut
+        self._fps = fps
+        self._format = image_format
+        self._mimetype = 'image/png' if image_format == 'png' else 'image/jpeg'
+        self._frames_per_period = max(1, int(round(fps / periods_per_second))) if periods_per_second > 0 else 1
+        self._frame_cache = {}
+        self._values = np.empty_like(self._real)
+        self._indices = np.empty(self._real.shape, dtype=np.uint8)
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @property
+    def frames_per_period(self):
+        return self._frames_per_period
+
+    def render_frame(self, frame_index):
+        """BGR pixels for a frame index within the wave period"""
+        phase = 2 * np.pi * (frame_index % self._frames_per_period) / self._frames_per_period
+        np.multiply(self._real, np.cos(phase), out=self._values)
+        self._values += self._imag * np.float32(np.sin(phase))
+        # [-peak, peak] -> [0, 255]
+        self._values *= self._scale
+        self._values += 127.5
+        np.clip(self._values, 0, 255, out=self._values)
+        self._indices[...] = self._values
+        return self._lut[self._indices]
+
+    def encode_frame(self, frame_index):
+        """Encoded image bytes for a frame, cached per position in the period"""
+        key = frame_index % self._frames_per_period
+        encoded = self._frame_cache.get(key)
+        if encoded is None:
+            if self._format == 'png':
+                _, buffer = cv2.imencode('.png', self.render_frame(key), [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            else:
+                _, buffer = cv2.imencode('.jpg', self.render_frame(key), [cv2.IMWRITE_JPEG_QUALITY, 85])
+            encoded = buffer.tobytes()
+            # Slow waves have long periods; their frames are re-encoded instead of kept
+            if self._frames_per_period <= self.MAX_CACHED_FRAMES:
+                self._frame_cache[key] = encoded
+        return encoded
+
+    def stream(self, max_frames=None, boundary='frame'):
+        """Yield multipart/x-mixed-replace parts paced at the target frame rate"""
+        interval = 1.0 / self._fps
+        next_time = time.perf_counter()
+        frame_index = 0
+        while max_frames is None or frame_index < max_frames:
+            encoded = self.encode_frame(frame_index)
+            yield (
+                f"--{boundary}\r\nContent-Type: {self._mimetype}\r\n"
+                f"Content-Length: {len(encoded)}\r\n\r\n"
+            ).encode('ascii') + encoded + b"\r\n"
+            frame_index += 1
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind: resynchronize instead of bursting
+                next_time = time.perf_counter()
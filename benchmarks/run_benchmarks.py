@@ -0,0 +1,276 @@
+"""
+Benchmark suite for the mixer and beamforming hot paths.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks                      # run everything
+    python -m benchmarks.run_benchmarks --quick -k mixer     # small sizes, filtered
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json
+
+Each case reports the median and minimum wall time over several repeats and
+the peak traced allocation of one extra run (NumPy allocations are visible to
+tracemalloc). With --compare, cases slower than the baseline by more than
+--threshold make the process exit with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from backend.imagemodel import ImageModel
+from backend.mixer import UnifiedMixer
+from backend.spectrum_cache import SpectrumCache
+from beam_models.phased_array import PhasedArray, LinearGeometry, CurvilinearGeometry
+from beam_models.beam_viewer import BeamViewer
+
+IMAGE_SIZES = [256, 512, 1024, 2048, 4096]
+MIX_SIZES = [256, 512, 1024, 2048]
+QUICK_SIZES = [256, 512]
+ELEMENT_COUNTS = [4, 16, 64]
+VIEW_TYPES = ['original', 'mag', 'phase', 'real', 'imag']
+
+
+class BenchmarkCase:
+    """A named benchmark: setup() builds state outside the timed region, run(state) is timed"""
+    def __init__(self, name, run, setup=None, repeat=5):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda: None)
+        self.repeat = repeat
+
+    def measure(self):
+        times = []
+        for _ in range(self.repeat):
+            state = self.setup()
+            start = time.perf_counter()
+            self.run(state)
+            times.append(time.perf_counter() - start)
+
+        state = self.setup()
+        tracemalloc.start()
+        self.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'median_ms': statistics.median(times) * 1000,
+            'min_ms': min(times) * 1000,
+            'peak_mb': peak / (1024 * 1024),
+            'repeat': self.repeat,
+        }
+
+
+def _test_image(size, seed):
+    """Deterministic smooth-plus-noise grayscale image"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / size
+    image = 127 + 60 * np.sin(2 * np.pi * (3 + seed) * x) * np.cos(2 * np.pi * (2 + seed) * y)
+    image += rng.normal(0, 20, (size, size))
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def _png_bytes(image):
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+def _latest(factory):
+    """
+    Memoize factory(*args) for the most recent arguments only: cases sharing
+    an input reuse it, and it is released once the next size is built.
+    """
+    memo = {}
+
+    def get(*args):
+        if args not in memo:
+            memo.clear()
+            memo[args] = factory(*args)
+        return memo[args]
+    return get
+
+
+def image_cases(sizes):
+    image = _latest(lambda size: _test_image(size, 0))
+    encoded = _latest(lambda size: _png_bytes(image(size)))
+    model = _latest(lambda size: ImageModel.from_array(image(size)))
+    cases = []
+    for size in sizes:
+        # Cold path: the spectrum cache is emptied before each run
+        name = f'imagemodel.decode_fft[{size}]'
+        cases.append((name, lambda n=name, s=size: BenchmarkCase(
+            n, lambda _, b=encoded(s): ImageModel(b), setup=SpectrumCache.get_instance().clear
+        )))
+        name = f'imagemodel.decode_fft_cached[{size}]'
+        cases.append((name, lambda n=name, s=size: BenchmarkCase(
+            n, lambda _, b=encoded(s): ImageModel(b)
+        )))
+        name = f'imagemodel.fft[{size}]'
+        cases.append((name, lambda n=name, s=size: BenchmarkCase(
+            n, lambda _, a=image(s): ImageModel.from_array(a)
+        )))
+        name = f'imagemodel.resize[{size}->{size // 2}]'
+        cases.append((name, lambda n=name, s=size: BenchmarkCase(
+            n, lambda m: m.resize(s // 2, s // 2), setup=lambda a=image(s): ImageModel.from_array(a)
+        )))
+        for view in VIEW_TYPES:
+            name = f'imagemodel.encoded_view[{view},{size}]'
+            cases.append((name, lambda n=name, s=size, v=view: BenchmarkCase(
+                n, lambda _, m=model(s): m.get_encoded_view(v)
+            )))
+    return cases
+
+
+def mixer_cases(sizes):
+    weights_a = {'1': 10, '2': 5, '3': 3, '4': 7}
+    weights_b = {'1': 2, '2': 10, '3': 4, '4': 1}
+    region_configs = {
+        'basic': UnifiedMixer.get_default_region_config('basic'),
+        'region': {
+            'size': 100, 'inner': True,
+            'regions': {
+                '1': {'type': 'inner', 'x': 25, 'y': 25, 'width': 50, 'height': 50},
+                '2': {'type': 'outer', 'x': 30, 'y': 30, 'width': 40, 'height': 40},
+                '3': {'type': 'inner', 'x': 10, 'y': 10, 'width': 80, 'height': 80},
+                '4': {'type': 'outer', 'x': 40, 'y': 40, 'width': 20, 'height': 20},
+            }
+        },
+    }
+    images = _latest(lambda size: {str(i): ImageModel.from_array(_test_image(size, i)) for i in range(1, 5)})
+    cases = []
+    for size in sizes:
+        for mode in ('magnitude_phase', 'real_imag'):
+            for config_name, config in region_configs.items():
+                name = f'mixer.mix[{mode},{config_name},{size}]'
+                cases.append((name, lambda n=name, s=size, m=mode, c=config: BenchmarkCase(
+                    n, lambda _, i=images(s): UnifiedMixer.static_mix(i, weights_a, weights_b, m, c)
+                )))
+    return cases
+
+
+def _phased_array(count, geometry):
+    array = PhasedArray(geometry())
+    array.configure(transmitter_count=count, frequency=2, phase_shift=0.5, distance=0.5, radius=10)
+    return array
+
+
+def beamforming_cases(element_counts):
+    array = _latest(_phased_array)
+    cases = []
+    for geometry in (LinearGeometry, CurvilinearGeometry):
+        label = geometry.__name__.replace('Geometry', '').lower()
+        for count in element_counts:
+            name = f'phased_array.wave_map[{label},{count}]'
+            cases.append((name, lambda n=name, c=count, g=geometry: BenchmarkCase(
+                n, lambda _, a=array(c, g): a.generate_wave_map(), repeat=3
+            )))
+            name = f'phased_array.beam_profile[{label},{count}]'
+            cases.append((name, lambda n=name, c=count, g=geometry: BenchmarkCase(
+                n, lambda _, a=array(c, g): a.calculate_beam_profile()
+            )))
+    return cases
+
+
+def _viewer_inputs():
+    viewer = BeamViewer()
+    array = _phased_array(16, LinearGeometry)
+    wave_map = array.generate_wave_map()
+    angles, response = array.calculate_beam_profile()
+    # Warm the persistent figures so steady-state render cost is measured
+    viewer.generate_wave_map_image(wave_map)
+    viewer.generate_beam_profile_image(angles, response)
+    return viewer, wave_map, angles, response
+
+
+def viewer_cases():
+    inputs = _latest(_viewer_inputs)
+
+    def case(name, run, repeat=5):
+        return name, lambda: BenchmarkCase(name, lambda _, i=inputs(): run(*i), repeat=repeat)
+
+    return [
+        case('beam_viewer.wave_map_image', lambda v, w, a, r: v.generate_wave_map_image(w), repeat=3),
+        case('beam_viewer.wave_map_raster[png]', lambda v, w, a, r: v.generate_wave_map_raster(w)),
+        case('beam_viewer.wave_map_raster[webp]', lambda v, w, a, r: v.generate_wave_map_raster(w, 'webp')),
+        case('beam_viewer.beam_profile_image', lambda v, w, a, r: v.generate_beam_profile_image(a, r)),
+    ]
+
+
+def build_cases(quick=False):
+    """
+    (name, build) pairs; build() creates the BenchmarkCase and its inputs, so
+    filtered-out cases never allocate anything.
+    """
+    image_sizes = QUICK_SIZES if quick else IMAGE_SIZES
+    mix_sizes = QUICK_SIZES if quick else MIX_SIZES
+    return (
+        image_cases(image_sizes)
+        + mixer_cases(mix_sizes)
+        + beamforming_cases(ELEMENT_COUNTS[:2] if quick else ELEMENT_COUNTS)
+        + viewer_cases()
+    )
+
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline_ms, current_ms, ratio) for cases slower than threshold x baseline"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        ratio = result['median_ms'] / max(previous['median_ms'], 1e-9)
+        if ratio > threshold:
+            regressions.append((name, previous['median_ms'], result['median_ms'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', '--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--quick', action='store_true', help='small sizes only')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio counted as a regression (default 1.25)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':<52} {'median ms':>11} {'min ms':>10} {'peak MB':>9}")
+    for name, build in build_cases(args.quick):
+        if args.filter not in name:
+            continue
+        result = build().measure()
+        results[name] = result
+        print(f"{name:<52} {result['median_ms']:>11.2f} {result['min_ms']:>10.2f} {result['peak_mb']:>9.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'cpu_count': os.cpu_count(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.2f}x baseline:")
+            for name, before, after, ratio in regressions:
+                print(f"  {name}: {before:.2f} ms -> {after:.2f} ms ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo regressions over {args.threshold:.2f}x baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
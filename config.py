@@ -2,4 +2,36 @@ import os
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'beamforming-secret-key'
-    DEBUG = True
\ No newline at end of file
+    DEBUG = True
+    USE_RELOADER = True
+    # Send per-stage Server-Timing headers on every response (otherwise only with ?server_timing=1)
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', '').lower() in ('1', 'true')
+    # Level for the application loggers; DEBUG records cost nothing above this level
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG')
+    # Keep 1 in N DEBUG/INFO records on the mixer and beamforming paths
+    LOG_SAMPLE_RATE = int(os.environ.get('LOG_SAMPLE_RATE', '1'))
+    # 'memory' for a single process; 'file' shares state between worker processes
+    STATE_STORE = os.environ.get('STATE_STORE', 'memory')
+    STATE_DIR = os.environ.get('STATE_DIR')
+    # Decoded images and spectra, keyed by upload content hash (memory budget in MB,
+    # plus an optional directory for a persistent .npy tier)
+    SPECTRUM_CACHE_MB = int(os.environ.get('SPECTRUM_CACHE_MB', '256'))
+    SPECTRUM_CACHE_DIR = os.environ.get('SPECTRUM_CACHE_DIR')
+    SPECTRUM_CACHE_DISK_MB = int(os.environ.get('SPECTRUM_CACHE_DISK_MB', '1024'))
+    # Rendered wave maps / beam profiles, per process (memory budget in MB)
+    BEAM_CACHE_MB = int(os.environ.get('BEAM_CACHE_MB', '32'))
+
+class DevelopmentConfig(Config):
+    pass
+
+class ProductionConfig(Config):
+    DEBUG = False
+    USE_RELOADER = False
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING')
+    LOG_SAMPLE_RATE = int(os.environ.get('LOG_SAMPLE_RATE', '10'))
+    STATE_STORE = os.environ.get('STATE_STORE', 'file')
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+}
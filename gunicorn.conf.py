@@ -0,0 +1,11 @@
+# Gunicorn settings for `gunicorn -c gunicorn.conf.py wsgi:app`
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+# Processes for CPU-bound mixing/beamforming, threads for polling and uploads
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('THREADS', '4'))
+# Long sweeps and 4K wave maps outlive the 30 s default
+timeout = int(os.environ.get('TIMEOUT', '120'))
@@ -433,7 +433,9 @@ class RegionManager {
  */
 class MixingManager {
     constructor() {
-        this.pollingInterval = null;
+        // Each output port mixes independently: one poller and latest job per output
+        this.pollingIntervals = {};
+        this.outputJobIds = {};
         this.currentJobId = 0;
         this.isMixing = false;
     }
@@ -441,12 +443,13 @@ class MixingManager {
     async requestMix(regionManager, targetOutput, currentMixingMode) {
         console.log('Mix Images button clicked');
         
-        // Cancel any ongoing mixing
-        this.cancelCurrentMix();
+        // Cancel any ongoing mixing into the same output
+        this.cancelCurrentMix(targetOutput);
         
         // Increment job ID for new job
         this.currentJobId++;
         const jobId = this.currentJobId;
+        this.outputJobIds[targetOutput] = jobId;
         
         console.log(`Starting Job #${jobId}`);
         
@@ -499,11 +502,11 @@ class MixingManager {
         return el ? el.value : 0;
     }
 
-    cancelCurrentMix() {
-        if (this.pollingInterval) {
-            console.log(`Cancelling previous mixing process for Job #${this.currentJobId}`);
-            clearInterval(this.pollingInterval);
-            this.pollingInterval = null;
+    cancelCurrentMix(targetOutput) {
+        if (this.pollingIntervals[targetOutput]) {
+            console.log(`Cancelling previous mixing process for Job #${this.outputJobIds[targetOutput]}`);
+            clearInterval(this.pollingIntervals[targetOutput]);
+            delete this.pollingIntervals[targetOutput];
         }
     }
 
@@ -532,25 +535,27 @@ class MixingManager {
     }
 
     startPolling(jobId, targetOutput) {
-        this.pollingInterval = setInterval(async () => {
-            // Stop if a newer job started
-            if (jobId !== this.currentJobId) {
-                console.log(`Job #${jobId} - Stopping polling (replaced by Job #${this.currentJobId})`);
-                clearInterval(this.pollingInterval);
-                this.pollingInterval = null;
+        const interval = setInterval(async () => {
+            // Stop if a newer job started for this output
+            if (jobId !== this.outputJobIds[targetOutput]) {
+                console.log(`Job #${jobId} - Stopping polling (replaced by Job #${this.outputJobIds[targetOutput]})`);
+                clearInterval(interval);
                 return;
             }
 
             try {
-                const data = await this.fetchMixStatus();
+                const data = await this.fetchMixStatus(targetOutput);
+                if (jobId !== this.outputJobIds[targetOutput]) return;
                 
                 // Log progress periodically (every 5% or when it changes significantly)
                 if (data.progress % 10 === 0 || data.progress === 100) {
                     console.log(`Job #${jobId} - Progress: ${data.progress}%`);
                 }
                 
-                // Update progress bar
-                this.updateProgressBar(data.progress);
+                // The progress bar follows the most recently started job
+                if (jobId === this.currentJobId) {
+                    this.updateProgressBar(data.progress);
+                }
                 
                 // Stop polling when job is done
                 if (!data.running) {
@@ -559,13 +564,14 @@ class MixingManager {
                 
             } catch (error) {
                 console.error(`Job #${jobId} - Error polling mix status:`, error);
-                this.cleanupPolling(jobId);
+                this.cleanupPolling(jobId, targetOutput);
             }
         }, 150);
+        this.pollingIntervals[targetOutput] = interval;
     }
 
-    async fetchMixStatus() {
-        const res = await fetch('/mix_status');
+    async fetchMixStatus(targetOutput) {
+        const res = await fetch(`/mix_status?output=${targetOutput}`);
         if (!res.ok) {
             throw new Error(`Status fetch failed: ${res.status}`);
         }
@@ -579,7 +585,7 @@ class MixingManager {
 
     handleMixCompletion(jobId, data, targetOutput) {
         console.log(`Job #${jobId} - Completed with ${data.progress}% progress`);
-        this.cleanupPolling(jobId);
+        this.cleanupPolling(jobId, targetOutput);
 
         if (data.result) {
             console.log(`Job #${jobId} - Result received, updating output image...`);
@@ -588,7 +594,9 @@ class MixingManager {
             console.warn(`Job #${jobId} - Mix finished but no result returned`);
         }
 
-        this.resetProgressBarWithDelay(jobId);
+        if (jobId === this.currentJobId) {
+            this.resetProgressBarWithDelay(jobId);
+        }
     }
 
     updateOutputImage(base64Image, targetOutput) {
@@ -618,12 +626,12 @@ class MixingManager {
         }, 300);
     }
 
-    cleanupPolling(jobId) {
-        if (this.pollingInterval) {
-            clearInterval(this.pollingInterval);
-            this.pollingInterval = null;
+    cleanupPolling(jobId, targetOutput) {
+        if (jobId === this.outputJobIds[targetOutput] && this.pollingIntervals[targetOutput]) {
+            clearInterval(this.pollingIntervals[targetOutput]);
+            delete this.pollingIntervals[targetOutput];
         }
-        this.isMixing = false;
+        this.isMixing = Object.keys(this.pollingIntervals).length > 0;
         if (jobId) {
             console.log(`Job #${jobId} - Cleanup complete`);
         }
@@ -770,6 +778,8 @@ document.getElementById('fileInput').addEventListener('change', async function()
     const fd = new FormData();
     fd.append('image', this.files[0]);
     fd.append('slot_id', appState.currentSlot);
+    const colorToggle = document.getElementById('colorToggle');
+    fd.append('color', colorToggle && colorToggle.checked ? 'true' : 'false');
 
     try {
         await fetch('/upload', { method: 'POST', body: fd });
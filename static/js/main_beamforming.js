@@ -138,14 +138,9 @@ class BeamFormingApp {
         
         this.isUpdating = true;
         this.frequencyValue.textContent = value;
+        this.currentState.current_frequency = parseFloat(value);
         
         try {
-            await fetch(`${this.baseUrl}/update_frequency`, {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({ frequency: parseFloat(value) })
-            });
-            
             await this.updateVisualizations();
         } catch (error) {
             console.error('Failed to update frequency:', error);
@@ -160,14 +155,9 @@ class BeamFormingApp {
         
         this.isUpdating = true;
         this.phaseShiftValue.textContent = (value / Math.PI).toFixed(1) + 'π';
+        this.currentState.phase_shift = parseFloat(value);
         
         try {
-            await fetch(`${this.baseUrl}/update_phase_shift`, {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({ phase_shift: parseFloat(value) })
-            });
-            
             await this.updateVisualizations();
         } catch (error) {
             console.error('Failed to update phase shift:', error);
@@ -182,14 +172,9 @@ class BeamFormingApp {
         
         this.isUpdating = true;
         this.distanceValue.textContent = value;
+        this.currentState.distance = parseFloat(value);
         
         try {
-            await fetch(`${this.baseUrl}/update_distance`, {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({ distance: parseFloat(value) })
-            });
-            
             await this.updateVisualizations();
         } catch (error) {
             console.error('Failed to update distance:', error);
@@ -204,14 +189,9 @@ class BeamFormingApp {
         
         this.isUpdating = true;
         this.radiusValue.textContent = value;
+        this.currentState.radius = parseFloat(value);
         
         try {
-            await fetch(`${this.baseUrl}/update_radius`, {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({ radius: parseFloat(value) })
-            });
-            
             await this.updateVisualizations();
         } catch (error) {
             console.error('Failed to update radius:', error);
@@ -226,14 +206,9 @@ class BeamFormingApp {
         
         this.isUpdating = true;
         this.toggleRadiusVisibility(value === 'Curvilinear');
+        this.currentState.geometry = value;
         
         try {
-            await fetch(`${this.baseUrl}/update_geometry`, {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({ geometry: value })
-            });
-            
             await this.updateVisualizations();
         } catch (error) {
             console.error('Failed to update geometry:', error);
@@ -261,6 +236,7 @@ class BeamFormingApp {
             
             const data = await response.json();
             this.transmitterCount.textContent = data.count;
+            this.currentState.transmitter_count = data.count;
             
             await this.updateVisualizations();
             this.updateStatus('Transmitter added', 'success');
@@ -290,6 +266,7 @@ class BeamFormingApp {
             
             const data = await response.json();
             this.transmitterCount.textContent = data.count;
+            this.currentState.transmitter_count = data.count;
             
             await this.updateVisualizations();
             this.updateStatus('Transmitter removed', 'success');
@@ -326,17 +303,30 @@ class BeamFormingApp {
         }
     }
     
+    getParameters() {
+        // currentState holds exact values; sliders may clamp or round them
+        return {
+            geometry: this.currentState.geometry,
+            transmitter_count: this.currentState.transmitter_count,
+            frequency: this.currentState.current_frequency,
+            phase_shift: this.currentState.phase_shift,
+            distance: this.currentState.distance,
+            radius: this.currentState.radius
+        };
+    }
+    
     async updateVisualizations() {
         try {
-            // Update wave map
-            const waveMapResponse = await fetch(`${this.baseUrl}/wave_map`);
-            const waveMapData = await waveMapResponse.json();
-            this.waveMapImage.src = waveMapData.image;
-            
-            // Update beam profile
-            const beamProfileResponse = await fetch(`${this.baseUrl}/beam_profile`);
-            const beamProfileData = await beamProfileResponse.json();
-            this.beamProfileImage.src = beamProfileData.image;
+            // One round trip applies all parameters and returns both results
+            const response = await fetch(`${this.baseUrl}/beamforming_state`, {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                // Only the rendered images are shown, so skip the 1000-point sample lists
+                body: JSON.stringify({ ...this.getParameters(), metrics_only: true })
+            });
+            const data = await response.json();
+            this.waveMapImage.src = data.wave_map.image;
+            this.beamProfileImage.src = data.beam_profile.image;
             
         } catch (error) {
             console.error('Failed to update visualizations:', error);
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from backend.imagemodel import ImageModel
+
+
+def make_image(shape=(48, 64), seed=0):
+    """Deterministic uint8 test image"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, shape, dtype=np.uint8)
+
+
+@pytest.fixture
+def images():
+    """Four same-size grayscale ImageModels in slots '1'..'4'"""
+    return {str(i): ImageModel.from_array(make_image(seed=i)) for i in range(1, 5)}
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    return create_app('development')
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
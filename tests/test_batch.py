@@ -0,0 +1,92 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.batch import MixJob, iter_jobs, mix_images, run_batch
+from backend.cancellation import CancellationToken, MixCancelled
+from backend.imagemodel import ImageModel
+from backend.mixer import UnifiedMixer
+from backend.sequence_mixer import FrameSink, FrameSource, SequenceMixer
+
+from conftest import make_image
+
+
+@pytest.fixture
+def image_files(tmp_path):
+    paths = {}
+    for slot in '12':
+        path = tmp_path / f'{slot}.png'
+        cv2.imwrite(str(path), make_image((40, 48), seed=int(slot)))
+        paths[slot] = str(path)
+    return paths
+
+
+def test_mix_images_matches_mixer(images):
+    result, png = mix_images(images, {'1': 10}, {'2': 10})
+    expected, _ = UnifiedMixer.static_mix(images, {'1': 10.0}, {'2': 10.0}, 'magnitude_phase',
+                                          UnifiedMixer.get_default_region_config('basic'))
+    np.testing.assert_array_equal(result, expected)
+    assert cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_UNCHANGED).shape == result.shape
+
+    unencoded, no_png = mix_images(images, {'1': 10}, {'2': 10}, encode=False)
+    assert no_png is None
+    np.testing.assert_array_equal(unencoded, result)
+
+
+def test_run_batch_writes_png_and_npy_outputs(tmp_path, image_files):
+    spec = {
+        'defaults': {'weights_a': {'1': 10}, 'weights_b': {'2': 10}},
+        'jobs': [
+            {'name': 'swap', 'images': image_files},
+            {'name': 'lowpass', 'images': image_files, 'mixing_mode': 'region',
+             'regions': {'1': {'shape': 'circle', 'radius': 20}}, 'output': 'lp/a.npy'},
+            {'name': 'broken', 'images': {'1': str(tmp_path / 'missing.png')}},
+        ],
+    }
+    out = tmp_path / 'out'
+    summaries = {s['name']: s for s in run_batch(iter_jobs(spec, output_dir=str(out)), workers=1)}
+    assert summaries['swap']['status'] == 'ok'
+    assert summaries['lowpass']['status'] == 'ok'
+    assert summaries['broken']['status'] == 'error'
+    assert cv2.imread(str(out / 'swap.png')).shape[:2] == (40, 48)
+    array = np.load(out / 'lp' / 'a.npy')
+    assert array.dtype == np.float64 and array.shape == (40, 48)
+
+
+def test_job_rejects_unknown_slots():
+    with pytest.raises(ValueError):
+        MixJob.from_dict({'images': {'5': 'a.png'}})
+
+
+def test_sequence_frames_match_single_mixes():
+    frames = [{'1': make_image((32, 32), seed=i), '2': make_image((32, 32), seed=10 + i)} for i in range(3)]
+    sequence = SequenceMixer({'1': 10}, {'2': 10})
+    results = list(sequence.mix_frames(iter(frames)))
+    assert sequence.get_frames_mixed() == 3
+    config = UnifiedMixer.get_default_region_config('basic')
+    for frame_set, result in zip(frames, results):
+        models = {slot: ImageModel.from_array(frame) for slot, frame in frame_set.items()}
+        expected, _ = UnifiedMixer.static_mix(models, {'1': 10.0}, {'2': 10.0}, 'magnitude_phase', config)
+        np.testing.assert_allclose(result, expected, atol=1e-9)
+
+
+def test_sequence_run_writes_png_frames(tmp_path, image_files):
+    frame_dir = tmp_path / 'frames'
+    frame_dir.mkdir()
+    for i in range(4):
+        cv2.imwrite(str(frame_dir / f'{i:03d}.png'), make_image((40, 48), seed=20 + i))
+    sources = {'1': FrameSource(str(frame_dir)), '2': FrameSource(image_files['2'])}
+    sink = FrameSink(str(tmp_path / 'out'))
+    summary = SequenceMixer({'1': 10}, {'2': 10}).run(sources, sink)
+    assert summary['frames'] == 4
+    assert sorted(os.listdir(tmp_path / 'out')) == [f'frame_{i:06d}.png' for i in range(4)]
+
+
+def test_sequence_cancellation():
+    token = CancellationToken()
+    token.cancel()
+    frames = iter([{'1': make_image((16, 16))}] * 3)
+    with pytest.raises(MixCancelled):
+        list(SequenceMixer({'1': 10}, {'1': 10}).mix_frames(frames, token))
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from beam_models.beam_cache import BeamResultCache
+from beam_models.wave_animator import WaveAnimator
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = BeamResultCache(max_entries=100, max_bytes=3000)
+    for key in 'abc':
+        cache.put(key, 'x' * 1000)
+    cache.get('a')
+    cache.put('d', 'x' * 1000)
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.stats()['bytes'] <= 3000
+
+
+def test_value_over_budget_is_not_cached():
+    cache = BeamResultCache(max_bytes=100)
+    cache.put('big', np.zeros(1000))
+    assert cache.get('big') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_get_or_compute_is_single_flight():
+    cache = BeamResultCache()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    results = []
+
+    def request():
+        barrier.wait()
+        results.append(cache.get_or_compute('key', compute))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+def test_failed_compute_is_not_cached():
+    cache = BeamResultCache()
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute('key', fail)
+    assert cache.get_or_compute('key', lambda: 1) == 1
+
+
+def test_wave_animator_caches_short_periods_only():
+    field = np.exp(1j * np.linspace(0, 4 * np.pi, 16 * 16)).reshape(16, 16)
+    lut = np.zeros((256, 3), dtype=np.uint8)
+    fast = WaveAnimator(field, lut, fps=30, periods_per_second=1.0)
+    for index in range(2 * fast.frames_per_period):
+        fast.encode_frame(index)
+    assert len(fast._frame_cache) == fast.frames_per_period
+
+    slow = WaveAnimator(field, lut, fps=60, periods_per_second=0.05)
+    assert slow.frames_per_period > WaveAnimator.MAX_CACHED_FRAMES
+    for index in range(20):
+        slow.encode_frame(index)
+    assert not slow._frame_cache
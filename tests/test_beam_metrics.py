@@ -0,0 +1,42 @@
+import numpy as np
+
+from beam_models.beam_metrics import analyze_beam_profile
+from beam_models.phased_array import LinearGeometry, PhasedArray
+
+
+def _linear_profile(count, distance=0.5, phase_shift=0.0):
+    array = PhasedArray(LinearGeometry())
+    array.configure(transmitter_count=count, frequency=1.0, distance=distance, phase_shift=phase_shift)
+    return array.calculate_beam_profile(num_angles=20001)
+
+
+def test_uniform_broadside_array():
+    count = 16
+    metrics = analyze_beam_profile(*_linear_profile(count))
+    assert abs(metrics['main_lobe_direction_deg']) < 0.1
+    # Uniform linear array: HPBW ~ 0.886 / (N d / lambda) rad, first sidelobe ~ -13.3 dB
+    expected_hpbw = np.degrees(0.886 / (count * 0.5))
+    assert abs(metrics['hpbw_deg'] - expected_hpbw) < 0.05 * expected_hpbw
+    assert abs(metrics['peak_sidelobe_level_db'] + 13.3) < 0.5
+    assert not metrics['has_grating_lobes']
+
+
+def test_steering_moves_main_lobe():
+    # Progressive phase kd sin(theta0) steers the beam to theta0
+    theta0 = np.radians(20)
+    phase_shift = -2 * np.pi * 0.5 * np.sin(theta0)
+    metrics = analyze_beam_profile(*_linear_profile(16, phase_shift=phase_shift))
+    assert abs(abs(metrics['main_lobe_direction_deg']) - 20) < 0.5
+
+
+def test_wide_spacing_has_grating_lobes():
+    metrics = analyze_beam_profile(*_linear_profile(8, distance=1.5))
+    assert metrics['has_grating_lobes']
+    assert metrics['grating_lobes']
+
+
+def test_isotropic_profile_has_no_lobes():
+    angles = np.linspace(0, 2 * np.pi, 100)
+    metrics = analyze_beam_profile(angles, np.ones_like(angles))
+    assert metrics['main_lobe_direction_deg'] is None
+    assert metrics['nulls_deg'] == []
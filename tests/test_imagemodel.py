@@ -0,0 +1,79 @@
+import pickle
+
+import cv2
+import numpy as np
+
+from backend.imagemodel import ImageModel
+from backend.spectrum_cache import SpectrumCache
+
+from conftest import make_image
+
+
+def test_fft_matches_numpy():
+    image = make_image()
+    model = ImageModel.from_array(image)
+    np.testing.assert_allclose(model.get_fft_data(), np.fft.fftshift(np.fft.fft2(image)))
+    np.testing.assert_allclose(model.get_magnitude(), np.abs(model.get_fft_data()))
+    np.testing.assert_allclose(model.get_phase(), np.angle(model.get_fft_data()))
+
+
+def test_from_array_copies_the_callers_buffer():
+    image = make_image()
+    model = ImageModel.from_array(image)
+    clone = model.clone()
+    image[:] = 0
+    assert model.get_raw_data().any()
+    assert clone.get_raw_data().any()
+
+
+def test_stored_arrays_are_read_only_and_clone_leaves_source_untouched():
+    model = ImageModel.from_array(make_image())
+    raw, fft = model.get_raw_data(), model.get_fft_data()
+    assert not raw.flags.writeable and not fft.flags.writeable
+
+    clone = model.clone()
+    assert model.get_raw_data() is raw and model.get_fft_data() is fft
+    clone.resize(24, 32)
+    assert model.get_shape() == (48, 64)
+    assert clone.get_shape() == (24, 32)
+    assert not clone.get_raw_data().flags.writeable
+
+
+def test_channel_count_of_spectrum_only_model():
+    model = ImageModel()
+    model.set_fft_data(np.zeros((8, 8, 3), dtype=np.complex128))
+    assert model.is_color()
+    assert model.get_channel_count() == 3
+    assert ImageModel().get_channel_count() == 1
+
+
+def test_uploads_of_the_same_bytes_share_the_cached_spectrum():
+    png = cv2.imencode('.png', make_image(seed=7))[1].tobytes()
+    first, second = ImageModel(png), ImageModel(png)
+    assert first.get_content_hash() == second.get_content_hash()
+    assert first.get_fft_data() is second.get_fft_data()
+
+
+def test_pickle_drops_derived_spectrum_and_restores_it():
+    model = ImageModel.from_array(make_image((128, 128)))
+    data = pickle.dumps(model)
+    assert len(data) < model.get_fft_data().nbytes
+    restored = pickle.loads(data)
+    np.testing.assert_array_equal(restored.get_raw_data(), model.get_raw_data())
+    np.testing.assert_allclose(restored.get_fft_data(), model.get_fft_data())
+
+
+def test_pickle_keeps_directly_set_spectrum():
+    model = ImageModel()
+    spectrum = np.arange(16, dtype=np.complex128).reshape(4, 4)
+    model.set_fft_data(spectrum)
+    np.testing.assert_array_equal(pickle.loads(pickle.dumps(model)).get_fft_data(), spectrum)
+
+
+def test_pickled_upload_reuses_cache_entry():
+    png = cv2.imencode('.png', make_image(seed=11))[1].tobytes()
+    model = ImageModel(png)
+    restored = pickle.loads(pickle.dumps(model))
+    assert restored.get_content_hash() == model.get_content_hash()
+    assert restored.get_fft_data() is model.get_fft_data()
+    assert SpectrumCache.get_instance().get_refcount(restored._cache_key) >= 2
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from backend.cancellation import CancellationToken, MixCancelled
+from backend.imagemodel import ImageModel
+from backend.mixer import MaskCache, UnifiedMixer
+
+from conftest import make_image
+
+
+def reference_mix(images, weights_a, weights_b, mode, masks, outer):
+    """The original (pre-workspace) mixing kernel, used as the baseline"""
+    h, w = next(iter(images.values())).get_shape()
+    acc1 = np.zeros((h, w), dtype=np.float64 if mode == 'magnitude_phase' else np.complex128)
+    acc2 = np.zeros((h, w), dtype=np.complex128)
+    sum_wa = sum_wb = 0
+    for slot, img in images.items():
+        wa = weights_a.get(slot, 0) / 10.0
+        wb = weights_b.get(slot, 0) / 10.0
+        sum_wa += wa
+        sum_wb += wb
+        if wa == 0 and wb == 0:
+            continue
+        if mode == 'magnitude_phase':
+            c1, c2 = img.get_magnitude(), img.get_phase()
+        else:
+            c1, c2 = img.get_real(), img.get_imaginary()
+        mask = 1 - masks[slot] if outer.get(slot) else masks[slot]
+        c1, c2 = c1 * mask, c2 * mask
+        acc1 += c1 * wa
+        acc2 += wb * np.exp(1j * c2) if mode == 'magnitude_phase' else c2 * wb
+    acc1 /= max(sum_wa, 1e-6)
+    if mode == 'magnitude_phase':
+        if np.allclose(acc2, 0):
+            phase = np.zeros((h, w))
+        else:
+            phase = np.angle(acc2 / max(sum_wb, 1e-6))
+        result = acc1 * np.exp(1j * phase)
+    else:
+        result = acc1 + 1j * acc2 / max(sum_wb, 1e-6)
+    return np.real(np.fft.ifft2(np.fft.ifftshift(result)))
+
+
+WEIGHTS = [
+    ({'1': 10, '2': 0}, {'1': 0, '2': 10}),
+    ({'1': 5, '2': 5, '3': 5, '4': 5}, {'1': 2, '2': 8, '3': 0, '4': 1}),
+    # Opposite-sign phase weights cancel in sum_wb but not in the phasor sum
+    ({'1': 10, '2': 10}, {'1': 10, '2': -10}),
+    ({'1': 10}, {'1': 5, '2': -5}),
+    ({'1': 3, '3': 7}, {'1': 0, '3': 0}),
+]
+
+REGION_CONFIGS = [
+    {'size': 100, 'inner': True, 'regions': {}},
+    {'size': 40, 'inner': False, 'regions': {}},
+    {'size': 100, 'inner': True, 'regions': {
+        '1': {'type': 'inner', 'x': 25, 'y': 25, 'width': 50, 'height': 50},
+        '2': {'type': 'outer', 'x': 10, 'y': 30, 'width': 40, 'height': 20},
+    }},
+]
+
+
+@pytest.mark.parametrize('mode', ['magnitude_phase', 'real_imag'])
+@pytest.mark.parametrize('weights_a, weights_b', WEIGHTS)
+@pytest.mark.parametrize('region_config', REGION_CONFIGS)
+def test_mix_matches_baseline(images, mode, weights_a, weights_b, region_config):
+    mixer = UnifiedMixer()
+    mixer.set_images_dict(images)
+    mixer.set_weights_a(weights_a)
+    mixer.set_weights_b(weights_b)
+    mixer.set_mode(mode)
+    mixer.set_region_config(region_config)
+    result, encoded = mixer.mix()
+
+    regions = region_config['regions']
+    if regions:
+        outer = {slot: r.get('type') == 'outer' for slot, r in regions.items()}
+    else:
+        outer = dict.fromkeys(images, not region_config['inner'])
+    expected = reference_mix(images, weights_a, weights_b, mode, mixer.get_masks(), outer)
+    scale = max(np.abs(expected).max(), 1.0)
+    np.testing.assert_allclose(result, expected, rtol=0, atol=1e-9 * scale)
+    assert encoded
+
+
+def test_mix_without_encoding_returns_same_array(images):
+    config = UnifiedMixer.get_default_region_config('basic')
+    encoded_result, encoded = UnifiedMixer.static_mix(images, {'1': 10}, {'2': 10}, 'magnitude_phase', config)
+    mixer = UnifiedMixer()
+    mixer.set_images_dict(images)
+    mixer.set_weights_a({'1': 10})
+    mixer.set_weights_b({'2': 10})
+    mixer.set_encode_result(False)
+    result, b64 = mixer.mix()
+    assert encoded and b64 is None
+    np.testing.assert_array_equal(result, encoded_result)
+
+
+def test_color_mix_matches_per_channel_gray_mix():
+    color = {str(i): ImageModel.from_array(make_image((32, 40, 3), seed=i)) for i in (1, 2)}
+    config = UnifiedMixer.get_default_region_config('basic')
+    result, _ = UnifiedMixer.static_mix(color, {'1': 10}, {'2': 10}, 'magnitude_phase', config)
+    assert result.shape == (32, 40, 3)
+    for channel in range(3):
+        gray = {slot: ImageModel.from_array(img.get_raw_data()[:, :, channel]) for slot, img in color.items()}
+        expected, _ = UnifiedMixer.static_mix(gray, {'1': 10}, {'2': 10}, 'magnitude_phase', config)
+        np.testing.assert_allclose(result[:, :, channel], expected, atol=1e-9)
+
+
+def test_progress_callback_reports_increasing_fractions(images):
+    fractions = []
+    UnifiedMixer.static_mix(images, {'1': 10, '2': 10}, {'1': 10}, 'magnitude_phase',
+                            UnifiedMixer.get_default_region_config('basic'),
+                            progress_callback=fractions.append)
+    assert fractions == sorted(fractions)
+    assert fractions[0] > 0 and fractions[-1] == 1.0
+
+
+def test_cancelled_token_stops_mix(images):
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(MixCancelled):
+        UnifiedMixer.static_mix(images, {'1': 10}, {'1': 10}, 'magnitude_phase',
+                                UnifiedMixer.get_default_region_config('basic'), token)
+
+
+def test_mask_cache_is_bounded_by_bytes():
+    mask_bytes = 16 * 16 * 4
+    cache = MaskCache(max_bytes=3 * mask_bytes)
+
+    @cache.cached
+    def build(value, size=16):
+        mask = np.full((size, size), value, dtype=np.float32)
+        mask.flags.writeable = False
+        return mask
+
+    first = build(0)
+    assert build(0) is first
+    for value in range(1, 6):
+        build(value)
+    assert build(5) is build(5)
+    # The oldest entries were evicted to stay within three masks
+    assert build(0) is not first
+    # A mask larger than the whole budget is returned but not kept
+    assert build(1, 64) is not build(1, 64)
@@ -0,0 +1,47 @@
+import time
+
+import numpy as np
+
+from backend.mixer import UnifiedMixer
+from backend.mixing_worker import MixingWorker
+
+
+def _wait_until_idle(worker, timeout=10.0):
+    deadline = time.time() + timeout
+    while worker.is_running() and time.time() < deadline:
+        time.sleep(0.005)
+    assert not worker.is_running()
+
+
+def test_mix_completes_with_monotonic_progress(images):
+    worker = MixingWorker(output_port=2)
+    progress = []
+    worker.set_progress_callback(progress.append)
+    config = UnifiedMixer.get_default_region_config('basic')
+    worker.start(images, {'1': 10}, {'2': 10}, 'magnitude_phase', config)
+    _wait_until_idle(worker)
+
+    expected, _ = UnifiedMixer.static_mix(images, {'1': 10}, {'2': 10}, 'magnitude_phase', config)
+    np.testing.assert_array_equal(worker.get_result_array(), expected)
+    assert worker.get_result()
+    assert progress == sorted(progress) and progress[-1] == 100
+
+
+def test_latest_request_wins(images):
+    worker = MixingWorker(output_port=2)
+    config = UnifiedMixer.get_default_region_config('basic')
+    for slot in '1234':
+        worker.start(images, {slot: 10}, {slot: 10}, 'magnitude_phase', config)
+    _wait_until_idle(worker)
+
+    expected, _ = UnifiedMixer.static_mix(images, {'4': 10}, {'4': 10}, 'magnitude_phase', config)
+    np.testing.assert_array_equal(worker.get_result_array(), expected)
+    assert worker.get_error_message() is None
+
+
+def test_no_images_finishes_with_empty_result():
+    worker = MixingWorker(output_port=2)
+    worker.start({'1': None}, {}, {}, 'magnitude_phase', UnifiedMixer.get_default_region_config('basic'))
+    _wait_until_idle(worker)
+    assert worker.get_progress() == 100
+    assert worker.get_result_array() is None
@@ -0,0 +1,126 @@
+import threading
+
+import numpy as np
+import pytest
+
+from beam_models import phased_array as pa
+from beam_models.phased_array import (
+    CurvilinearGeometry, GeometryStrategy, LinearGeometry, PhasedArray, parse_focal_point
+)
+
+
+def brute_force_profile(array, num_angles=1000):
+    """The original per-angle, per-element beam profile loop"""
+    angles = np.linspace(0, 2 * np.pi, num_angles)
+    k = array.calculate_wave_number()
+    response = []
+    for theta in angles:
+        phases = [k * (t.x_position * np.sin(theta) + t.y_position * np.cos(theta)) - i * array.phase_shift
+                  for i, t in enumerate(array.transmitters)]
+        response.append(abs(np.sum(np.exp(1j * np.array(phases)))))
+    response = np.array(response)
+    return angles, response / response.max()
+
+
+def _array(geometry, count, frequency=2.0, phase_shift=0.5, distance=0.5, radius=10.0):
+    array = PhasedArray(geometry())
+    array.configure(transmitter_count=count, frequency=frequency, phase_shift=phase_shift,
+                    distance=distance, radius=radius)
+    return array
+
+
+@pytest.mark.parametrize('count', [1, 4, 16, 64])
+@pytest.mark.parametrize('phase_shift', [0.0, 0.9, -2.0])
+def test_linear_fft_array_factor_matches_direct_sum(count, phase_shift):
+    geometry = LinearGeometry()
+    x, y, z = geometry.position_arrays(count, 0.7, 10.0)
+    phases = np.arange(count) * phase_shift
+    angles = np.linspace(0, 2 * np.pi, 1000)
+    k = 2 * np.pi * 1.3
+    fft = geometry.calculate_array_factor(x, y, phases, k, angles)
+    direct = GeometryStrategy.calculate_array_factor(geometry, x, y, phases, k, angles)
+    np.testing.assert_allclose(fft, direct, atol=5e-3 * count)
+
+
+@pytest.mark.parametrize('geometry', [LinearGeometry, CurvilinearGeometry])
+@pytest.mark.parametrize('count', [1, 8, 32])
+def test_beam_profile_matches_brute_force(geometry, count):
+    array = _array(geometry, count)
+    angles, response = array.calculate_beam_profile()
+    expected_angles, expected = brute_force_profile(array)
+    np.testing.assert_allclose(angles, expected_angles)
+    np.testing.assert_allclose(response, expected, atol=5e-3)
+
+
+def test_beam_profile_sweep_shape_and_values():
+    array = _array(CurvilinearGeometry, 8)
+    frequencies = np.array([0.5, 1.5, 3.0])
+    phase_shifts = np.array([-1.0, 0.0, 0.4, 2.0])
+    distances = np.array([0.3, 0.8])
+    angles, responses = array.calculate_beam_profile_sweep(frequencies, phase_shifts, distances, 360)
+    assert responses.shape == (3, 4, 2, 360)
+    assert responses.dtype == np.float32
+
+    for fi, fp in [(0, 1), (2, 3), (1, 0)]:
+        for di, distance in enumerate(distances):
+            probe = _array(CurvilinearGeometry, 8, frequency=frequencies[fi],
+                           phase_shift=phase_shifts[fp], distance=distance)
+            _, expected = probe.calculate_beam_profile(360)
+            np.testing.assert_allclose(responses[fi, fp, di], expected, atol=1e-5)
+
+
+def test_beam_profile_sweep_chunking_is_invisible():
+    array = _array(LinearGeometry, 6)
+    args = (np.linspace(0.5, 3, 7), np.linspace(-1, 1, 9), np.array([0.3, 0.6]), 200)
+    _, whole = array.calculate_beam_profile_sweep(*args)
+    # A tiny budget splits both the frequency and the phase-shift axes
+    _, chunked = array.calculate_beam_profile_sweep(*args, max_chunk_values=600)
+    np.testing.assert_array_equal(whole, chunked)
+
+
+@pytest.mark.parametrize('point, expected', [
+    ((1, 2), (1.0, 2.0, 0.0)),
+    ([1, 2, 3], (1.0, 2.0, 3.0)),
+    (None, None),
+])
+def test_parse_focal_point_accepts(point, expected):
+    assert parse_focal_point(point) == expected
+
+
+@pytest.mark.parametrize('point', [[1], [1, 2, 3, 4], 'ab', [1, float('nan')], [float('inf'), 0], 5])
+def test_parse_focal_point_rejects(point):
+    with pytest.raises(ValueError):
+        parse_focal_point(point)
+
+
+def test_focal_delays_vanish_only_at_center_of_curvature():
+    radius = 10.0
+    center = pa.focal_delay_table(CurvilinearGeometry, 16, 0.5, radius, (0.0, radius, 0.0))
+    off_center = pa.focal_delay_table(CurvilinearGeometry, 16, 0.5, radius, (radius / 2, radius, 0.0))
+    assert np.allclose(center, 0)
+    assert np.ptp(off_center) > 0.1
+
+
+def test_clone_is_independent():
+    array = _array(LinearGeometry, 4)
+    clone = array.clone()
+    clone.configure(transmitter_count=9, frequency=5.0)
+    assert len(array.transmitters) == 4 and array.current_frequency == 2.0
+    assert array.get_state_key() != clone.get_state_key()
+
+
+def test_get_executor_creates_one_pool_under_concurrency(monkeypatch):
+    monkeypatch.setattr(pa, '_executor', None)
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def first_request():
+        barrier.wait()
+        pools.append(pa.get_executor())
+
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(pool) for pool in pools}) == 1
@@ -0,0 +1,115 @@
+import io
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.routes import MAX_TRANSMITTERS, phased_array
+
+from conftest import make_image
+
+
+@pytest.fixture(autouse=True)
+def restore_phased_array():
+    params = phased_array.get_parameters()
+    yield
+    phased_array.set_parameters(params)
+
+
+@pytest.mark.parametrize('body', [
+    {'frequency': 1000},
+    {'frequency': 'fast'},
+    {'transmitter_count': 0},
+    {'transmitter_count': MAX_TRANSMITTERS + 1},
+    {'distance': -1},
+    {'geometry': 'Spherical'},
+    {'focal_point': [1]},
+    {'x_min': 'nan', 'x_max': 1, 'y_min': 0, 'y_max': 1},
+])
+def test_beamforming_state_rejects_bad_input(client, body):
+    before = phased_array.get_state_key()
+    assert client.post('/beamforming_state', json=body).status_code == 400
+    assert phased_array.get_state_key() == before
+
+
+def test_beamforming_state_applies_parameters(client):
+    response = client.post('/beamforming_state', json={
+        'frequency': 3, 'transmitter_count': 6, 'geometry': 'Linear', 'metrics_only': True,
+        'render': 'raster', 'width': 32, 'height': 32
+    })
+    assert response.status_code == 200
+    state = response.json['state']
+    assert state['current_frequency'] == 3 and state['transmitter_count'] == 6
+
+
+@pytest.mark.parametrize('body', [{'focal_point': [1]}, {'focal_point': 'ab'},
+                                  {'focal_point': [0, float('nan')]}, {'y': 2}])
+def test_focus_rejects_bad_points(client, body):
+    assert client.post('/focus', json=body).status_code == 400
+
+
+def test_focus_returns_profiles(client):
+    response = client.post('/focus', json={'x': 0.5, 'y': 3, 'samples': 21})
+    assert response.status_code == 200
+    assert response.json['success']
+
+
+def test_add_transmitter_is_capped(client):
+    phased_array.configure(transmitter_count=MAX_TRANSMITTERS)
+    assert client.post('/add_transmitter').status_code == 400
+    assert len(phased_array.transmitters) == MAX_TRANSMITTERS
+
+
+@pytest.mark.parametrize('query', [
+    'x_min=nan&x_max=nan&y_min=0&y_max=1',
+    'x_min=0&x_max=inf&y_min=0&y_max=1',
+    'x_min=2&x_max=1&y_min=0&y_max=1',
+    'z_plane=nan',
+])
+def test_wave_map_rejects_bad_viewport(client, query):
+    assert client.get(f'/wave_map?{query}').status_code == 400
+    assert client.get(f'/wave_animation?frames=1&{query}').status_code == 400
+
+
+def test_wave_animation_clamps_speed_and_size(client):
+    response = client.get('/wave_animation?frames=1&speed=1e-9&width=5000&height=5000&format=png')
+    assert response.status_code == 200
+    body = response.data
+    png = body[body.index(b'\r\n\r\n') + 4:body.rindex(b'\r\n')]
+    frame = cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_UNCHANGED)
+    assert max(frame.shape[:2]) <= 1024
+
+
+@pytest.mark.parametrize('body', [
+    {'distances': [-1, 0.5]},
+    {'distances': [1e6]},
+    {'frequencies': [0.5, float('nan')]},
+    {'phase_shifts': [[0, 1], [2, 3]]},
+    {'transmitter_count': 10000},
+    {'num_angles': 1},
+])
+def test_beam_sweep_rejects_bad_input(client, body):
+    assert client.post('/beam_sweep', json=body).status_code == 400
+
+
+def test_beam_sweep_returns_grid(client):
+    response = client.post('/beam_sweep', json={
+        'frequencies': {'start': 1, 'stop': 2, 'num': 3}, 'phase_shifts': [0, 1],
+        'distances': [0.5], 'num_angles': 90, 'transmitter_count': 4
+    })
+    assert response.status_code == 200
+    data = np.load(io.BytesIO(response.data))
+    assert data['responses'].shape == (3, 2, 1, 90)
+
+
+def test_tumor_ablation_focuses_off_center(client):
+    assert client.post('/load_scenario', json={'scenario': 'tumor_ablation'}).status_code == 200
+    assert np.ptp(phased_array.get_focal_delays()) > 0
+
+
+def test_upload_and_mix(client):
+    png = cv2.imencode('.png', make_image())[1].tobytes()
+    response = client.post('/upload', data={'slot_id': '1', 'image': (io.BytesIO(png), 'a.png')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert client.post('/mix', json={'wa1': 10, 'wb1': 10, 'target_output': 1}).status_code == 200
@@ -0,0 +1,74 @@
+import os
+import time
+
+import numpy as np
+
+from backend.spectrum_cache import SpectrumCache
+
+
+def _entry(value, size=32):
+    raw = np.full((size, size), value, dtype=np.uint8)
+    return raw, np.fft.fft2(raw)
+
+
+def _entry_bytes(size=32):
+    raw, fft = _entry(0, size)
+    return raw.nbytes + fft.nbytes
+
+
+def test_put_returns_read_only_arrays_and_get_hits():
+    cache = SpectrumCache()
+    key = cache.make_key('a', None, 'complex128')
+    raw, fft = cache.put(key, *_entry(1))
+    assert not raw.flags.writeable and not fft.flags.writeable
+    assert cache.get(key)[0] is raw
+    assert cache.get(cache.make_key('b', None, 'complex128')) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_lru_eviction_skips_pinned_entries():
+    cache = SpectrumCache(max_bytes=2 * _entry_bytes())
+    keys = [cache.make_key(str(i), None, 'complex128') for i in range(4)]
+    cache.put(keys[0], *_entry(0))
+    cache.acquire(keys[0])
+    for i in (1, 2, 3):
+        cache.put(keys[i], *_entry(i))
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[3]) is not None
+
+    cache.release(keys[0])
+    cache.put(keys[1], *_entry(1))
+    assert cache.get(keys[0]) is None
+    assert cache.stats()['bytes'] <= 2 * _entry_bytes()
+
+
+def test_disk_tier_survives_clear(tmp_path):
+    cache = SpectrumCache(disk_dir=str(tmp_path))
+    key = cache.make_key('a', (32, 32), 'complex128')
+    raw, fft = cache.put(key, *_entry(5))
+    cache.clear()
+    loaded = cache.get(key)
+    np.testing.assert_array_equal(loaded[0], raw)
+    np.testing.assert_array_equal(loaded[1], fft)
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_disk_tier_trims_oldest_files_but_keeps_pinned(tmp_path):
+    size = 64
+    pair_bytes = _entry_bytes(size) + 256  # .npy headers
+    cache = SpectrumCache(disk_dir=str(tmp_path), max_disk_bytes=3 * pair_bytes)
+    keys = [cache.make_key(str(i), None, 'complex128') for i in range(6)]
+    for i, key in enumerate(keys):
+        cache.put(key, *_entry(i, size))
+        if i == 0:
+            cache.acquire(key)
+        # mtime is the recency signal; keep the writes distinguishable
+        time.sleep(0.01)
+
+    names = set(os.listdir(tmp_path))
+    total = sum(os.path.getsize(os.path.join(tmp_path, name)) for name in names)
+    assert total <= 3 * pair_bytes
+    assert {'0_orig_complex128.raw.npy', '5_orig_complex128.raw.npy'} <= names
+    assert '1_orig_complex128.raw.npy' not in names
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from backend.imagemodel import ImageModel
+from backend.manager import ImageManager
+from backend.state_store import FileStateStore, MemoryStateStore, create_state_store
+
+from conftest import make_image
+
+
+@pytest.fixture(params=['memory', 'file'])
+def store(request, tmp_path):
+    return MemoryStateStore() if request.param == 'memory' else FileStateStore(str(tmp_path))
+
+
+def test_versions_change_on_every_write(store):
+    assert store.version('k') is None
+    first = store.set('k', {'a': 1})
+    assert store.get('k') == {'a': 1}
+    second = store.set('k', {'a': 2})
+    assert first != second
+    assert store.get_versioned('k') == ({'a': 2}, second)
+    store.delete('k')
+    assert store.get('k', 'missing') == 'missing'
+    assert store.version('k') is None
+
+
+def test_create_state_store(tmp_path):
+    assert not create_state_store({'STATE_STORE': 'memory'}).is_shared()
+    assert create_state_store({'STATE_STORE': 'file', 'STATE_DIR': str(tmp_path)}).is_shared()
+    with pytest.raises(ValueError):
+        create_state_store({'STATE_STORE': 'redis'})
+
+
+def test_managers_share_slots_through_file_store(tmp_path):
+    writer, reader = ImageManager(), ImageManager()
+    writer.set_state_store(FileStateStore(str(tmp_path)))
+    reader.set_state_store(FileStateStore(str(tmp_path)))
+
+    image = make_image((32, 40))
+    writer.set_input_image('1', ImageModel.from_array(image))
+    shared = reader.get_input_image('1')
+    np.testing.assert_array_equal(shared.get_raw_data(), image)
+    np.testing.assert_allclose(shared.get_fft_data(), writer.get_input_image('1').get_fft_data())
+
+    # A smaller upload resizes slot 1 in the writer; the reader follows
+    writer.set_input_image('2', ImageModel.from_array(make_image((16, 20), seed=2)))
+    assert reader.get_input_image('1').get_shape() == (16, 20)
+
+    writer.clear_input('1')
+    assert reader.get_input_image('1') is None
+
+
+def test_unchanged_store_costs_one_stat_per_read(tmp_path):
+    writer, reader = ImageManager(), ImageManager()
+    writer.set_state_store(FileStateStore(str(tmp_path)))
+    store = FileStateStore(str(tmp_path))
+    reader.set_state_store(store)
+    writer.set_input_image('1', ImageModel.from_array(make_image()))
+    reader.get_input_image('1')
+
+    checked = []
+    version = store.version
+    store.version = lambda key: checked.append(key) or version(key)
+    for _ in range(5):
+        reader.get_all_inputs()
+    assert checked == ['image.index'] * 5
@@ -0,0 +1,13 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Uses the production config unless MOIRE_CONFIG says otherwise; with more
+than one worker, set STATE_DIR to a directory all workers can reach.
+"""
+import os
+
+from app import create_app
+
+app = create_app(os.environ.get('MOIRE_CONFIG', 'production'))